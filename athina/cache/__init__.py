@@ -0,0 +1,10 @@
+from .eval_cache import EvalCache, InMemoryEvalCache, DiskEvalCache, TieredEvalCache
+from .embedding_cache import EmbeddingCache
+
+__all__ = [
+    "EvalCache",
+    "InMemoryEvalCache",
+    "DiskEvalCache",
+    "TieredEvalCache",
+    "EmbeddingCache",
+]
@@ -0,0 +1,182 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .eval_cache import EvalCache
+
+
+class EmbeddingCache:
+    """
+    Content-addressed on-disk cache of embedding vectors.
+
+    Vectors are stored as rows of a memory-mapped float32 matrix per model and
+    dimension, with a SQLite index from the hash of (model, text) to the row.
+    Cached vectors are returned as read-only numpy views of the matrix, so
+    lookups don't copy. The cache can be shared by processes on the same machine.
+
+    A process-wide cache is enabled with `EmbeddingCache.enable(...)`, after which
+    `AbstractLlmService.embeddings_batch` only embeds texts that aren't cached.
+    """
+
+    DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".athina", "embeddings")
+
+    _cache: Optional["EmbeddingCache"] = None
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or self.DEFAULT_PATH
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+        # Memory maps of each matrix file, remapped when the file grows
+        self._matrices: Dict[str, np.memmap] = {}
+        self._conn = sqlite3.connect(
+            os.path.join(self.path, "index.db"), check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, matrix TEXT NOT NULL, row INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS matrices ("
+            "name TEXT PRIMARY KEY, dimensions INTEGER NOT NULL, "
+            "rows INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def set_cache(cls, cache: Optional["EmbeddingCache"]):
+        EmbeddingCache._cache = cache
+
+    @classmethod
+    def get_cache(cls) -> Optional["EmbeddingCache"]:
+        return EmbeddingCache._cache
+
+    @classmethod
+    def enable(cls, path: Optional[str] = None) -> "EmbeddingCache":
+        cache = EmbeddingCache(path)
+        cls.set_cache(cache)
+        return cache
+
+    @classmethod
+    def disable(cls):
+        cls.set_cache(None)
+
+    @staticmethod
+    def make_key(model: Optional[str], text: str) -> str:
+        return EvalCache.make_key("embedding", model, text)
+
+    @staticmethod
+    def _matrix_name(model: Optional[str], dimensions: int) -> str:
+        model_hash = hashlib.md5(str(model).encode()).hexdigest()[:12]
+        return f"{model_hash}-{dimensions}"
+
+    def _matrix_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.f32")
+
+    def _matrix(self, name: str, dimensions: int, row: int) -> np.memmap:
+        """Returns a memory map of a matrix file that includes the given row."""
+        matrix = self._matrices.get(name)
+        if matrix is None or row >= matrix.shape[0]:
+            path = self._matrix_path(name)
+            rows = os.path.getsize(path) // (dimensions * 4)
+            matrix = np.memmap(
+                path, dtype=np.float32, mode="r", shape=(rows, dimensions)
+            )
+            self._matrices[name] = matrix
+        return matrix
+
+    def get_many(
+        self, model: Optional[str], texts: Sequence[str]
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Returns the cached vector of each text, as a read-only view, or None.
+        """
+        keys = [self.make_key(model, text) for text in texts]
+        locations: Dict[str, Tuple[str, int, int]] = {}
+        with self._lock:
+            # Look up in batches, within SQLite's limit on query parameters
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                rows = self._conn.execute(
+                    "SELECT e.key, e.matrix, e.row, m.dimensions "
+                    "FROM embeddings e JOIN matrices m ON e.matrix = m.name "
+                    f"WHERE e.key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, name, row, dimensions in rows:
+                    locations[key] = (name, row, dimensions)
+            vectors = []
+            for key in keys:
+                location = locations.get(key)
+                if location is None:
+                    vectors.append(None)
+                    continue
+                name, row, dimensions = location
+                vectors.append(self._matrix(name, dimensions, row)[row])
+        return vectors
+
+    def put_many(
+        self, model: Optional[str], texts: Sequence[str], vectors: Sequence[Sequence]
+    ):
+        """Stores the vectors of texts. Texts that are already cached are skipped."""
+        if not texts:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        dimensions = matrix.shape[1]
+        name = self._matrix_name(model, dimensions)
+        keys = [self.make_key(model, text) for text in texts]
+        with self._lock:
+            # Serializes writers across processes, so rows aren't given out twice
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO matrices (name, dimensions, rows) "
+                    "VALUES (?, ?, 0)",
+                    (name, dimensions),
+                )
+                next_row = self._conn.execute(
+                    "SELECT rows FROM matrices WHERE name = ?", (name,)
+                ).fetchone()[0]
+                new_rows = []
+                seen = set()
+                for index, key in enumerate(keys):
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    cached = self._conn.execute(
+                        "SELECT 1 FROM embeddings WHERE key = ?", (key,)
+                    ).fetchone()
+                    if cached is None:
+                        new_rows.append(index)
+                if new_rows:
+                    with open(self._matrix_path(name), "ab") as f:
+                        f.truncate(next_row * dimensions * 4)
+                        f.write(matrix[new_rows].tobytes())
+                    self._conn.executemany(
+                        "INSERT INTO embeddings (key, matrix, row) VALUES (?, ?, ?)",
+                        [
+                            (keys[index], name, next_row + offset)
+                            for offset, index in enumerate(new_rows)
+                        ],
+                    )
+                    self._conn.execute(
+                        "UPDATE matrices SET rows = ? WHERE name = ?",
+                        (next_row + len(new_rows), name),
+                    )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.execute("DELETE FROM matrices")
+            self._conn.commit()
+            for name in list(self._matrices):
+                del self._matrices[name]
+            for file_name in os.listdir(self.path):
+                if file_name.endswith(".f32"):
+                    os.remove(os.path.join(self.path, file_name))
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class EvalCache(ABC):
+    """
+    Content-addressed cache for evaluation results and judge responses.
+
+    A process-wide cache is configured with `EvalCache.set_cache(...)` (or
+    `EvalCache.enable(...)`), after which deterministic evaluators read from
+    it instead of calling the provider.
+    """
+
+    _cache: Optional["EvalCache"] = None
+
+    @classmethod
+    def set_cache(cls, cache: Optional["EvalCache"]):
+        EvalCache._cache = cache
+
+    @classmethod
+    def get_cache(cls) -> Optional["EvalCache"]:
+        return EvalCache._cache
+
+    @classmethod
+    def enable(
+        cls,
+        path: Optional[str] = None,
+        max_bytes: int = 1024 * 1024 * 1024,
+        max_age_seconds: Optional[float] = 7 * 24 * 60 * 60,
+        memory_max_entries: int = 10000,
+    ) -> "EvalCache":
+        """
+        Enables a two-tier cache: an in-process LRU in front of an on-disk SQLite cache.
+        """
+        cache = TieredEvalCache(
+            memory=InMemoryEvalCache(max_entries=memory_max_entries),
+            disk=DiskEvalCache(
+                path=path, max_bytes=max_bytes, max_age_seconds=max_age_seconds
+            ),
+        )
+        cls.set_cache(cache)
+        return cache
+
+    @classmethod
+    def disable(cls):
+        cls.set_cache(None)
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Returns a content hash for the given key parts.
+        """
+        return hashlib.sha256(
+            json.dumps(parts, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value for a key, or None."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """Stores a JSON-serializable value under a key."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Removes all entries."""
+        raise NotImplementedError
+
+
+class InMemoryEvalCache(EvalCache):
+    """
+    An in-process LRU cache. Values are stored serialized, so callers always
+    get their own copy back.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                return None
+            self._entries.move_to_end(key)
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        serialized = json.dumps(value, default=str)
+        with self._lock:
+            self._entries[key] = serialized
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskEvalCache(EvalCache):
+    """
+    An on-disk cache backed by SQLite, with size-based LRU and age-based eviction.
+    """
+
+    DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".athina", "eval_cache.db")
+    # Check the total cache size every this many writes
+    EVICTION_INTERVAL = 100
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: int = 1024 * 1024 * 1024,
+        max_age_seconds: Optional[float] = 7 * 24 * 60 * 60,
+    ):
+        self.path = path or self.DEFAULT_PATH
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS eval_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS eval_cache_accessed_at ON eval_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return (
+            self.max_age_seconds is not None
+            and now - created_at > self.max_age_seconds
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM eval_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._is_expired(created_at, now):
+                self._conn.execute("DELETE FROM eval_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE eval_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        serialized = json.dumps(value, default=str)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO eval_cache (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, serialized, len(serialized), now, now),
+            )
+            self._conn.commit()
+            self._writes += 1
+            if self._writes % self.EVICTION_INTERVAL == 0:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """
+        Removes expired entries, then least recently used entries until the cache fits in max_bytes.
+        """
+        if self.max_age_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM eval_cache WHERE created_at < ?",
+                (now - self.max_age_seconds,),
+            )
+        total_size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM eval_cache"
+        ).fetchone()[0]
+        if total_size > self.max_bytes:
+            excess = total_size - self.max_bytes
+            rows = self._conn.execute(
+                "SELECT key, size FROM eval_cache ORDER BY accessed_at ASC"
+            )
+            keys_to_delete = []
+            for key, size in rows:
+                if excess <= 0:
+                    break
+                keys_to_delete.append((key,))
+                excess -= size
+            self._conn.executemany("DELETE FROM eval_cache WHERE key = ?", keys_to_delete)
+        self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM eval_cache")
+            self._conn.commit()
+
+
+class TieredEvalCache(EvalCache):
+    """
+    An in-process LRU tier in front of an on-disk tier.
+    """
+
+    def __init__(self, memory: InMemoryEvalCache, disk: DiskEvalCache):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        value = self.disk.get(key)
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.disk.clear()
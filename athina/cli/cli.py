@@ -6,6 +6,7 @@ from athina.helpers.run_helper import RunHelper
 from athina.helpers.kwparser import KeyValueAction
 from athina.interfaces.model import Model
 from athina.loaders import LoadFormat
+from athina.runner.sharding import ShardedEvalRunner
 from typing import Optional
 
 
@@ -81,6 +82,22 @@ def main():
     # Set the default function to be called
     parser_run.set_defaults(func=run_delegator)
 
+    # athina worker [work_dir]
+    parser_worker = subparsers.add_parser(
+        "worker", help="Run shards of a sharded eval suite"
+    )
+    parser_worker.add_argument(
+        "work_dir",
+        type=str,
+        help="The work directory of the sharded run",
+    )
+    parser_worker.add_argument(
+        "--worker-id",
+        type=str,
+        help="A name for this worker (defaults to the hostname and process id)",
+    )
+    parser_worker.set_defaults(func=worker)
+
     # Parse the arguments
     args = parser.parse_args()
 
@@ -187,5 +204,13 @@ def run_datapoint(eval_name: str, model: str, **kwargs):
         return
 
 
+def worker(args):
+    """Runs shards of a sharded eval suite until none are left"""
+    if ConfigHelper.is_set():
+        RunHelper._set_keys()
+    completed = ShardedEvalRunner.run_worker(args.work_dir, args.worker_id)
+    print(f"Worker finished after completing {completed} shards")
+
+
 if __name__ == "__main__":
     main()
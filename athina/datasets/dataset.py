@@ -1,6 +1,12 @@
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Tuple
 from dataclasses import dataclass, field
 from athina.services.athina_api_service import AthinaApiService
+from athina.helpers.upload_helper import (
+    DATASET_ROWS_CHUNK_SIZE,
+    chunk_by_size,
+    idempotency_key,
+    upload_chunks,
+)
 
 
 @dataclass
@@ -37,19 +43,23 @@ class Dataset:
         - language_model_id (Optional[str]): An optional identifier for the language model associated with this dataset.
         - prompt_template (Optional[Any]): An optional template for prompts used in this dataset.
 
+        Rows are uploaded in chunks: the dataset is created with the first chunk,
+        and the remaining chunks are added one after another, in order.
+
         Returns:
         The newly created dataset object
 
         Raises:
         - Exception: If the dataset could not be created due to an error like invalid parameters, database errors, etc.
         """
+        chunks = chunk_by_size(rows or [], DATASET_ROWS_CHUNK_SIZE)
         dataset_data = {
             "source": "dev_sdk",
             "name": name,
             "description": description,
             "language_model_id": language_model_id,
             "prompt_template": prompt_template,
-            "dataset_rows": rows or [],
+            "dataset_rows": chunks[0][1] if chunks else [],
         }
 
         # Remove keys where the value is None
@@ -67,12 +77,14 @@ class Dataset:
             language_model_id=created_dataset_data["language_model_id"],
             prompt_template=created_dataset_data["prompt_template"],
         )
+        if len(chunks) > 1:
+            Dataset._upload_rows(dataset.id, chunks[1:])
         return dataset
 
     @staticmethod
     def add_rows(dataset_id: str, rows: List[DatasetRow]):
         """
-        Adds rows to a dataset in batches of 100.
+        Adds rows to a dataset in size-aware batches of up to 100 rows, uploaded in order.
 
         Parameters:
         - dataset_id (str): The ID of the dataset to add rows to.
@@ -81,13 +93,25 @@ class Dataset:
         Raises:
         - Exception: If the API returns an error or the limit of 1000 rows is exceeded.
         """
-        batch_size = 100
-        for i in range(0, len(rows), batch_size):
-            batch = rows[i : i + batch_size]
-            try:
-                AthinaApiService.add_dataset_rows(dataset_id, batch)
-            except Exception as e:
-                raise
+        Dataset._upload_rows(dataset_id, chunk_by_size(rows, DATASET_ROWS_CHUNK_SIZE))
+
+    @staticmethod
+    def _upload_rows(dataset_id: str, chunks: List[Tuple[int, List[Any]]]):
+        """
+        Uploads chunks of rows one at a time, retrying each chunk independently.
+        Eval results are matched to dataset rows by position, so chunks are sent
+        sequentially to keep the rows in order. Every chunk has an idempotency key,
+        so a retried chunk is not added twice by servers that support it.
+        """
+
+        def upload(offset: int, chunk: List[Any]):
+            return AthinaApiService.add_dataset_rows(
+                dataset_id,
+                chunk,
+                idempotency_key=idempotency_key(dataset_id, offset, chunk),
+            )
+
+        upload_chunks(upload, chunks)
 
     @staticmethod
     def fetch_dataset_rows(dataset_id: str, number_of_rows: Optional[int] = None):
@@ -24,3 +24,17 @@ class NoAthinaApiKeyException(CustomException):
 class NoOpenAiApiKeyException(CustomException):
     def __init__(self, message: str = AthinaMessages.NO_OPENAI_API_KEY):
         super().__init__(message)
+
+
+class BudgetExhaustedException(CustomException):
+    def __init__(self, message: str = "Budget exhausted"):
+        super().__init__(message)
+
+
+class CassetteMissException(CustomException):
+    def __init__(
+        self,
+        message: str = "No recorded response for this request in replay mode",
+        extra_info: Optional[dict] = None,
+    ):
+        super().__init__(message, extra_info)
@@ -1,16 +1,47 @@
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Optional, Dict
+import asyncio
+from collections import Counter
+from contextlib import nullcontext
+from functools import partial
+from typing import (
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Dict,
+    Tuple,
+    Type,
+    Union,
+)
 from athina.helpers.logger import logger
+from athina.helpers.batch_helper import bounded_map, abounded_map
+from athina.helpers.checkpoint import CheckpointStore
+from athina.helpers.run_stats import EvalRunStats, EvalTrace
+from athina.helpers.early_stopping import EarlyStopping, PassRateMonitor
+from athina.llms.budget import Budget
+from athina.errors.exceptions import BudgetExhaustedException
+from athina.helpers.process_helper import (
+    DEFAULT_CHUNK_SIZE,
+    EXECUTOR_THREAD,
+    chunked,
+    create_process_pool,
+    default_process_workers,
+    evaluate_chunk,
+    use_process_pool,
+)
+from athina.cache.eval_cache import EvalCache
 from athina.helpers.athina_logging_helper import AthinaLoggingHelper
 from athina.helpers.dataset_helper import (
     generate_unique_dataset_name,
     generate_eval_display_name,
+    hash_datapoint,
 )
 from athina.interfaces.data import DataPoint
 from athina.interfaces.result import BatchRunResult, EvalResult, GuardResult
 from athina.services.athina_api_service import AthinaApiService
 from athina.datasets import Dataset
+import time
 import traceback
 
 
@@ -57,9 +88,90 @@ class BaseEvaluator(ABC):
         """The method that performs the evaluation."""
         pass
 
+    async def _aevaluate(self, **kwargs) -> EvalResult:
+        """
+        Async variant of _evaluate. Evaluators with an async-native implementation
+        override this; by default _evaluate runs in a worker thread.
+        """
+        return await asyncio.to_thread(self._cached_evaluate, **kwargs)
+
     def to_config(self) -> Optional[Dict]:
         return None
 
+    @property
+    def resource_key(self) -> str:
+        """
+        The resource that bounds this evaluator's throughput, used to limit concurrency
+        when evaluators share a scheduler. One of "llm:<provider>:<model>",
+        "http:<host>" or "cpu:<evaluator class>".
+        """
+        return f"cpu:{self.__class__.__name__}"
+
+    @property
+    def cost_class(self) -> int:
+        """
+        The relative cost of an evaluation, from its resource kind: 0 for local
+        computation, 1 for HTTP APIs and 2 for LLM calls.
+        The scheduler dispatches cheaper evaluators first.
+        """
+        kind = self.resource_key.split(":", 1)[0]
+        return {"cpu": 0, "http": 1, "llm": 2}.get(kind, 1)
+
+    @property
+    def is_deterministic(self) -> bool:
+        """
+        Whether the evaluator always returns the same result for the same input.
+        Results of deterministic evaluators are served from the EvalCache, if one is enabled.
+        """
+        return False
+
+    @property
+    def supports_process_pool(self) -> bool:
+        """
+        Whether the evaluator is CPU-bound and can be rebuilt in a worker process
+        from `_worker_spec()`, to run batches in a process pool.
+        """
+        return False
+
+    def _worker_spec(self) -> Tuple[Type["BaseEvaluator"], Dict]:
+        """
+        Returns the evaluator class and the constructor kwargs used to rebuild
+        this evaluator in a worker process.
+        """
+        return type(self), (self.to_config() or {})
+
+    def _result_cache_key(self, **kwargs) -> Optional[str]:
+        """
+        Returns the EvalCache key for the result of evaluating kwargs, or None if
+        the result should not be cached.
+        """
+        if not self.is_deterministic:
+            return None
+        return EvalCache.make_key(
+            "eval_result",
+            self.name,
+            self.to_config(),
+            getattr(self, "_model", None),
+            kwargs,
+        )
+
+    def _cached_evaluate(self, **kwargs) -> EvalResult:
+        """
+        Runs _evaluate, serving the result from the EvalCache when possible.
+        """
+        cache = EvalCache.get_cache()
+        key = self._result_cache_key(**kwargs) if cache is not None else None
+        if key is not None:
+            cached_eval_result = cache.get(key)
+            if cached_eval_result is not None:
+                EvalTrace.record_cache_hit()
+                return cached_eval_result
+
+        eval_result = self._evaluate(**kwargs)
+        if key is not None and eval_result is not None:
+            cache.set(key, eval_result)
+        return eval_result
+
     # Common methods
     def _examples_str(self) -> str:
         return "" if self.examples is None else "\n".join(map(str, self.examples))
@@ -131,7 +243,7 @@ class BaseEvaluator(ABC):
         """
         AthinaApiService.log_usage(eval_name=self.name, run_type="batch")
         eval_request = self._log_evaluation_request(kwargs)
-        eval_result = self._evaluate(**kwargs)
+        eval_result = self._cached_evaluate(**kwargs)
         self._log_evaluation_results(
             eval_request_id=eval_request["eval_request"]["id"],
             eval_results=[eval_result],
@@ -144,40 +256,257 @@ class BaseEvaluator(ABC):
             eval_results=[eval_result],
         )
 
-    def guard(self, **kwargs):
+    def guard(self, budget: Optional[Budget] = None, **kwargs):
         """
         Guard
+
+        If a budget is given and it runs out, the guard fails closed: it returns
+        a failed GuardResult with a "Budget exhausted" reason instead of raising.
         """
-        eval_result = self._evaluate(**kwargs)
+        try:
+            with budget.activate() if budget is not None else nullcontext():
+                eval_result = self._cached_evaluate(**kwargs)
+        except BudgetExhaustedException as e:
+            return GuardResult(passed=False, reason=str(e), runtime=0)
         passed = not eval_result["failure"]
         reason = eval_result["reason"]
         runtime = eval_result["runtime"]
         return GuardResult(passed=passed, reason=reason, runtime=runtime)
 
+    def _evaluate_batch_entry(
+        self,
+        entry: DataPoint,
+        stats: Optional[EvalRunStats] = None,
+        submitted_at: Optional[float] = None,
+    ) -> Optional[EvalResult]:
+        """
+        Evaluates a single entry of a batch, logging errors instead of raising them.
+        If stats are given, the evaluation is recorded in them; `submitted_at` is the
+        perf_counter time at which the entry was dispatched.
+
+        Once the active Budget is exhausted, LLM evaluators return a "budget exhausted"
+        result without evaluating the entry.
+        """
+        if self._budget_exhausted():
+            return Budget.exhausted_result(self, entry)
+        started_at = time.perf_counter()
+        with EvalTrace.start() as trace:
+            try:
+                eval_result = self._cached_evaluate(**entry)
+            except BudgetExhaustedException:
+                eval_result = Budget.exhausted_result(self, entry)
+            except Exception as e:
+                logger.error(f"Error evaluating entry {entry}: {e}")
+                traceback.print_exc()
+                eval_result = None
+        if stats is not None:
+            stats.record(
+                eval_result,
+                trace,
+                queue_seconds=(
+                    started_at - submitted_at if submitted_at is not None else None
+                ),
+                eval_seconds=time.perf_counter() - started_at,
+            )
+        return eval_result
+
+    def _budget_exhausted(self) -> bool:
+        budget = Budget.current()
+        return (
+            budget is not None
+            and budget.exhausted
+            and self.resource_key.startswith("llm:")
+        )
+
+    def _evaluate_dispatched_entry(
+        self, dispatched: Tuple[DataPoint, float], stats: Optional[EvalRunStats]
+    ) -> Optional[EvalResult]:
+        entry, submitted_at = dispatched
+        return self._evaluate_batch_entry(entry, stats, submitted_at)
+
+    def run_batch_stream(
+        self,
+        data: Iterable[DataPoint],
+        max_parallel_evals: int = 5,
+        ordered: bool = True,
+        max_in_flight: Optional[int] = None,
+        executor: str = EXECUTOR_THREAD,
+        stats: Optional[EvalRunStats] = None,
+    ) -> Iterator[Tuple[int, Optional[EvalResult]]]:
+        """
+        Runs the evaluator on any iterable of data points and yields
+        `(index, eval_result)` pairs as evaluations complete.
+
+        Only a bounded window of evaluations is kept in flight, so memory stays
+        flat regardless of the dataset size. Results are not logged to Athina.
+
+        Args:
+            data: An iterable of data points. It is consumed lazily.
+            max_parallel_evals: Number of evaluations to run concurrently.
+            ordered: If True, results are yielded in input order.
+            max_in_flight: Maximum number of pending evaluations. Defaults to 2 * max_parallel_evals.
+            executor: "thread", "process" or "auto". CPU-bound evaluators (see
+                `supports_process_pool`) can run in a process pool with one worker per core.
+            stats: Optional EvalRunStats to record every evaluation in.
+        """
+        if use_process_pool(self, executor):
+            for index, eval_result in self._run_batch_stream_in_processes(
+                data, ordered=ordered
+            ):
+                if stats is not None:
+                    stats.record(eval_result)
+                yield index, eval_result
+            return
+
+        if max_parallel_evals <= 1:
+            for index, entry in enumerate(data):
+                yield index, self._evaluate_batch_entry(entry, stats)
+            return
+
+        # Entries are stamped when they are pulled from the iterator, i.e. when they are submitted
+        for index, _, future in bounded_map(
+            partial(self._evaluate_dispatched_entry, stats=stats),
+            ((entry, time.perf_counter()) for entry in data),
+            max_workers=max_parallel_evals,
+            max_in_flight=max_in_flight,
+            ordered=ordered,
+        ):
+            yield index, future.result()
+
+    def _run_batch_stream_in_processes(
+        self,
+        data: Iterable[DataPoint],
+        ordered: bool = True,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[Tuple[int, Optional[EvalResult]]]:
+        """
+        Runs the evaluator in a process pool. Data points are sent to the workers in
+        chunks, and each worker rebuilds the evaluator once from `_worker_spec()`.
+        """
+        max_workers = default_process_workers()
+        with create_process_pool(max_workers) as pool:
+            for chunk_index, _, future in bounded_map(
+                partial(evaluate_chunk, self._worker_spec()),
+                chunked(data, chunk_size),
+                max_workers=max_workers,
+                ordered=ordered,
+                executor=pool,
+            ):
+                # Every chunk but the last is full, so the row index follows from the chunk index
+                for offset, eval_result in enumerate(future.result()):
+                    yield chunk_index * chunk_size + offset, eval_result
+
     def _run_batch_generator_async(
-        self, data: List[DataPoint], max_parallel_evals: int
-    ):
-        with ThreadPoolExecutor(max_workers=max_parallel_evals) as executor:
-            # Submit all tasks to the executor and store them with their original index
-            future_to_index = {
-                executor.submit(self._evaluate, **entry): i
-                for i, entry in enumerate(data)
-            }
-
-            # Create a list to store results in the original order
-            results = [None] * len(data)
-
-            for future in as_completed(future_to_index):
-                index = future_to_index[future]
-                try:
-                    results[index] = future.result()
-                except Exception as e:
-                    entry = data[index]
-                    logger.error(f"Error running batch async {entry}: {e}")
-                    traceback.print_exc()
-                    results[index] = None
-
-            return results
+        self, data: Iterable[DataPoint], max_parallel_evals: int
+    ) -> List[Optional[EvalResult]]:
+        return [
+            eval_result
+            for _, eval_result in self.run_batch_stream(
+                data, max_parallel_evals=max_parallel_evals, ordered=True
+            )
+        ]
+
+    async def _aevaluate_batch_entry(
+        self,
+        entry: DataPoint,
+        stats: Optional[EvalRunStats] = None,
+        submitted_at: Optional[float] = None,
+    ) -> Optional[EvalResult]:
+        """
+        Async variant of _evaluate_batch_entry.
+        """
+        if self._budget_exhausted():
+            return Budget.exhausted_result(self, entry)
+        started_at = time.perf_counter()
+        with EvalTrace.start() as trace:
+            try:
+                eval_result = await self._aevaluate(**entry)
+            except BudgetExhaustedException:
+                eval_result = Budget.exhausted_result(self, entry)
+            except Exception as e:
+                logger.error(f"Error evaluating entry {entry}: {e}")
+                traceback.print_exc()
+                eval_result = None
+        if stats is not None:
+            stats.record(
+                eval_result,
+                trace,
+                queue_seconds=(
+                    started_at - submitted_at if submitted_at is not None else None
+                ),
+                eval_seconds=time.perf_counter() - started_at,
+            )
+        return eval_result
+
+    async def arun_batch_stream(
+        self,
+        data: Iterable[DataPoint],
+        max_parallel_evals: int = 100,
+        ordered: bool = True,
+        max_in_flight: Optional[int] = None,
+        stats: Optional[EvalRunStats] = None,
+    ) -> AsyncIterator[Tuple[int, Optional[EvalResult]]]:
+        """
+        Async variant of run_batch_stream. Concurrency is limited by a semaphore
+        rather than a thread pool, so a single event loop can keep hundreds of
+        evaluations in flight.
+        """
+
+        async def evaluate(dispatched: Tuple[DataPoint, float]):
+            entry, submitted_at = dispatched
+            return await self._aevaluate_batch_entry(entry, stats, submitted_at)
+
+        async for index, _, task in abounded_map(
+            evaluate,
+            ((entry, time.perf_counter()) for entry in data),
+            max_concurrency=max_parallel_evals,
+            max_in_flight=max_in_flight,
+            ordered=ordered,
+        ):
+            yield index, task.result()
+
+    async def arun_batch(
+        self,
+        data: List[DataPoint],
+        max_parallel_evals: int = 100,
+        budget: Optional[Budget] = None,
+    ) -> BatchRunResult:
+        """
+        Runs the evaluator on a batch of data without blocking the event loop.
+        With a budget, rows evaluated after it is exhausted get a "budget exhausted"
+        result, and the ledger is in `result.budget`.
+        """
+        # Log usage to Athina for analytics
+        await asyncio.to_thread(
+            AthinaApiService.log_usage, eval_name=self.name, run_type="batch"
+        )
+
+        # Run the evaluations
+        stats = EvalRunStats(self.display_name)
+        with budget.activate() if budget is not None else nullcontext():
+            eval_results = [
+                eval_result
+                async for _, eval_result in self.arun_batch_stream(
+                    data,
+                    max_parallel_evals=max_parallel_evals,
+                    ordered=True,
+                    stats=stats,
+                )
+            ]
+
+        # Create the Dataset
+        dataset = await asyncio.to_thread(self._log_dataset_to_athina, data)
+        if dataset:
+            await asyncio.to_thread(
+                self._log_eval_results_to_athina, eval_results, dataset.id
+            )
+            print(f"You can view your dataset at: {Dataset.dataset_link(dataset.id)}")
+
+        return BatchRunResult(
+            eval_results=eval_results,
+            stats=stats,
+            budget=budget.summary() if budget is not None else None,
+        )
 
     def _run_batch_generator(self, data: List[DataPoint]):
         """
@@ -186,7 +515,7 @@ class BaseEvaluator(ABC):
         """
         for entry in data:
             try:
-                yield self._evaluate(**entry)
+                yield self._cached_evaluate(**entry)
             except Exception as e:
                 logger.error(f"Error evaluating entry {entry}: {e}")
                 traceback.print_exc()
@@ -230,20 +559,236 @@ class BaseEvaluator(ABC):
             print(f"Error logging eval results to Athina: {e}")
             pass
 
+    def _run_batch_with_checkpoint(
+        self,
+        data: List[DataPoint],
+        max_parallel_evals: int,
+        checkpoint: CheckpointStore,
+        executor: str = EXECUTOR_THREAD,
+        stats: Optional[EvalRunStats] = None,
+    ) -> List[Optional[EvalResult]]:
+        """
+        Runs the evaluator on the rows that are not in the checkpoint yet, and
+        writes each completed result to the checkpoint as it arrives.
+        """
+        eval_key = CheckpointStore.eval_key(self)
+        row_hashes = [hash_datapoint(entry) for entry in data]
+        eval_results = [checkpoint.get(eval_key, row_hash) for row_hash in row_hashes]
+        pending_indices = [i for i, result in enumerate(eval_results) if result is None]
+        if len(pending_indices) < len(data):
+            print(
+                f"Resuming from checkpoint: {len(data) - len(pending_indices)} of {len(data)} rows already evaluated"
+            )
+
+        for i, eval_result in self.run_batch_stream(
+            (data[index] for index in pending_indices),
+            max_parallel_evals=max_parallel_evals,
+            ordered=False,
+            executor=executor,
+            stats=stats,
+        ):
+            index = pending_indices[i]
+            eval_results[index] = eval_result
+            checkpoint.put(eval_key, row_hashes[index], eval_result)
+        return eval_results
+
+    def _run_batch_sampled(
+        self,
+        data: List[DataPoint],
+        weights: List[int],
+        max_parallel_evals: int,
+        early_stopping: EarlyStopping,
+        checkpoint: Optional[CheckpointStore] = None,
+        executor: str = EXECUTOR_THREAD,
+        stats: Optional[EvalRunStats] = None,
+    ) -> Tuple[List[Optional[EvalResult]], Dict]:
+        """
+        Evaluates rows in random order, and stops dispatching new rows once the
+        pass rate is settled. Returns the results (None for rows that were not
+        evaluated) and a summary of the pass rate estimate.
+        """
+        monitor = PassRateMonitor(early_stopping)
+        eval_results: List[Optional[EvalResult]] = [None] * len(data)
+        order = early_stopping.shuffled(range(len(data)))
+
+        if checkpoint is not None:
+            eval_key = CheckpointStore.eval_key(self)
+            row_hashes = [hash_datapoint(entry) for entry in data]
+            for index in order:
+                eval_results[index] = checkpoint.get(eval_key, row_hashes[index])
+                monitor.add(eval_results[index], weights[index])
+            order = [index for index in order if eval_results[index] is None]
+
+        if not monitor.should_stop():
+            stream = self.run_batch_stream(
+                (data[index] for index in order),
+                max_parallel_evals=max_parallel_evals,
+                ordered=False,
+                executor=executor,
+                stats=stats,
+            )
+            try:
+                for i, eval_result in stream:
+                    index = order[i]
+                    eval_results[index] = eval_result
+                    if checkpoint is not None:
+                        checkpoint.put(eval_key, row_hashes[index], eval_result)
+                    monitor.add(eval_result, weights[index])
+                    if monitor.should_stop():
+                        break
+            finally:
+                # Cancels the evaluations that have not started yet
+                stream.close()
+        return eval_results, monitor.summary()
+
+    def _dedup_key(self, entry: DataPoint) -> str:
+        """
+        Returns the key identifying entries that evaluate to the same result:
+        a hash of the entry's required arguments (or of the whole entry, if the
+        evaluator has no required arguments).
+        """
+        if self.required_args:
+            entry = {arg: entry.get(arg) for arg in self.required_args}
+        return hash_datapoint(entry)
+
+    def _deduplicate(self, data: List[DataPoint]) -> List[int]:
+        """
+        Returns, for each entry, the index of the first entry with the same dedup key.
+        """
+        first_index_by_key: Dict[str, int] = {}
+        return [
+            first_index_by_key.setdefault(self._dedup_key(entry), index)
+            for index, entry in enumerate(data)
+        ]
+
+    @staticmethod
+    def _fan_out_result(
+        eval_result: Optional[EvalResult],
+        entry: DataPoint,
+        representative_entry: DataPoint,
+    ) -> Optional[EvalResult]:
+        """
+        Copies the result of a representative entry for a duplicate entry.
+        """
+        if eval_result is None:
+            return None
+        eval_result = dict(eval_result)
+        if eval_result.get("data") == representative_entry:
+            eval_result["data"] = entry
+        return eval_result
+
+    def _run_unique_rows(
+        self,
+        unique_data: List[DataPoint],
+        unique_indices: List[int],
+        representatives: List[int],
+        max_parallel_evals: int,
+        checkpoint: Optional[CheckpointStore],
+        executor: str,
+        early_stopping: Optional[EarlyStopping],
+        stats: EvalRunStats,
+    ) -> Tuple[List[Optional[EvalResult]], Optional[Dict]]:
+        """
+        Runs the evaluator on the unique rows of a batch. Returns the results and,
+        with early stopping, the pass rate estimate.
+        """
+        if early_stopping is not None:
+            # Each unique row stands for all of its duplicates
+            duplicates = Counter(representatives)
+            return self._run_batch_sampled(
+                unique_data,
+                [duplicates[i] for i in unique_indices],
+                max_parallel_evals,
+                early_stopping,
+                checkpoint,
+                executor,
+                stats,
+            )
+        if checkpoint is not None:
+            eval_results = self._run_batch_with_checkpoint(
+                unique_data, max_parallel_evals, checkpoint, executor, stats
+            )
+            return eval_results, None
+        eval_results = [
+            eval_result
+            for _, eval_result in self.run_batch_stream(
+                unique_data,
+                max_parallel_evals=max_parallel_evals,
+                ordered=True,
+                executor=executor,
+                stats=stats,
+            )
+        ]
+        return eval_results, None
+
     def run_batch(
-        self, data: List[DataPoint], max_parallel_evals: int = 5
+        self,
+        data: List[DataPoint],
+        max_parallel_evals: int = 5,
+        checkpoint: Optional[Union[str, CheckpointStore]] = None,
+        deduplicate: bool = True,
+        executor: str = EXECUTOR_THREAD,
+        early_stopping: Optional[EarlyStopping] = None,
+        budget: Optional[Budget] = None,
     ) -> BatchRunResult:
         """
         Runs the evaluator on a batch of data.
+
+        Args:
+            data: A list of data points.
+            max_parallel_evals: Number of evaluations to run concurrently.
+            checkpoint: Optional path to a JSONL checkpoint file (or a CheckpointStore).
+                Completed results are written to it as they arrive, and rows that are
+                already in it are skipped, so an interrupted run can be resumed.
+            deduplicate: If True, rows with identical required arguments are evaluated
+                once and the result is shared between them.
+            executor: "thread", "process" or "auto". With "process", the evaluator runs in
+                a process pool with one worker per core, which only CPU-bound evaluators
+                support; "auto" picks the process pool when the evaluator supports it.
+            early_stopping: Optional EarlyStopping settings. Rows are then evaluated in
+                random order until the pass rate is known precisely enough; rows that were
+                not evaluated get a None result, and the estimate is in `result.early_stopping`.
+            budget: Optional Budget limiting the cost of the run's LLM calls. Once it is
+                exhausted, the remaining rows get a "budget exhausted" result instead of
+                being evaluated, and the ledger is in `result.budget`.
         """
         # Log usage to Athina for analytics
         AthinaApiService.log_usage(eval_name=self.name, run_type="batch")
 
-        # Run the evaluations
-        if max_parallel_evals > 1:
-            eval_results = self._run_batch_generator_async(data, max_parallel_evals)
+        if deduplicate:
+            representatives = self._deduplicate(data)
+            unique_indices = [i for i, rep in enumerate(representatives) if rep == i]
+            unique_data = [data[i] for i in unique_indices]
         else:
-            eval_results = list(self._run_batch_generator(data))
+            representatives = list(range(len(data)))
+            unique_indices = representatives
+            unique_data = data
+
+        # Run the evaluations
+        stats = EvalRunStats(self.display_name)
+        budget_context = budget.activate() if budget is not None else nullcontext()
+        with CheckpointStore.open(checkpoint) as checkpoint_store, budget_context:
+            eval_results, early_stopping_summary = self._run_unique_rows(
+                unique_data,
+                unique_indices,
+                representatives,
+                max_parallel_evals,
+                checkpoint_store,
+                executor,
+                early_stopping,
+                stats,
+            )
+
+        if deduplicate and len(unique_data) < len(data):
+            result_by_index = dict(zip(unique_indices, eval_results))
+            eval_results = [
+                (
+                    result_by_index[i]
+                    if rep == i
+                    else self._fan_out_result(result_by_index[rep], data[i], data[rep])
+                )
+                for i, rep in enumerate(representatives)
+            ]
 
         # Create the Dataset
         dataset = self._log_dataset_to_athina(data)
@@ -253,4 +798,7 @@ class BaseEvaluator(ABC):
 
         return BatchRunResult(
             eval_results=eval_results,
+            stats=stats,
+            early_stopping=early_stopping_summary,
+            budget=budget.summary() if budget is not None else None,
         )
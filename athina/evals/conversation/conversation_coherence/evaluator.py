@@ -50,8 +50,8 @@ class ConversationCoherence(LlmEvaluator):
     def examples(self):
         return []
 
-    def _user_message(self, **kwargs) -> str:
-        return self._user_message_template.format(**kwargs)
+    def _user_message(self, messages: List[str], **kwargs) -> str:
+        return self._user_message_template.format(messages="\n".join(messages))
 
     def is_failure(self, score) -> Optional[bool]:
         return (
@@ -83,22 +83,16 @@ class ConversationCoherence(LlmEvaluator):
         else:
             return "All messages were coherent."
 
-    def _evaluate(self, messages: List[str]) -> EvalResult:
+    def _eval_result(
+        self,
+        chat_completion_response_json: dict,
+        start_time: float,
+        messages: List[str],
+        **kwargs,
+    ) -> EvalResult:
         """
-        Run the LLM evaluator.
+        Builds the EvalResult from the LLM's JSON response.
         """
-        start_time = time.perf_counter()
-
-        # Construct Prompt
-        prompt_messages = self._prompt_messages(messages="\n".join(messages))
-
-        # Run the LLM Completion
-        chat_completion_response_json: dict = self.llm_service.json_completion(
-            model=self._model,
-            messages=prompt_messages,
-            temperature=self.TEMPERATURE,
-        )
-
         metrics = []
         try:
             messages_with_coherence_status = chat_completion_response_json["details"]
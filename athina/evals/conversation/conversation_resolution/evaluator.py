@@ -57,8 +57,8 @@ class ConversationResolution(LlmEvaluator):
             else None
         )
 
-    def _user_message(self, **kwargs) -> str:
-        return self._user_message_template.format(**kwargs)
+    def _user_message(self, messages: List[str], **kwargs) -> str:
+        return self._user_message_template.format(messages="\n".join(messages))
 
     def reason(self, messages_with_resolution_status: List[dict]) -> str:
         unresolved_messages = [
@@ -74,22 +74,16 @@ class ConversationResolution(LlmEvaluator):
             unresolved_messages
         )
 
-    def _evaluate(self, messages: List[str]) -> EvalResult:
+    def _eval_result(
+        self,
+        chat_completion_response_json: dict,
+        start_time: float,
+        messages: List[str],
+        **kwargs,
+    ) -> EvalResult:
         """
-        Run the LLM evaluator.
+        Builds the EvalResult from the LLM's JSON response.
         """
-        start_time = time.perf_counter()
-
-        # Construct Prompt
-        prompt_messages = self._prompt_messages(messages="\n".join(messages))
-
-        # Run the LLM Completion
-        chat_completion_response_json: dict = self.llm_service.json_completion(
-            model=self._model,
-            messages=prompt_messages,
-            temperature=self.TEMPERATURE,
-        )
-
         metrics = []
         try:
             messages_with_resolution_status = chat_completion_response_json["details"]
@@ -1,12 +1,14 @@
 from typing import Optional, List
 from athina.metrics.metric_type import MetricType
 import time
-from typing import Optional, Dict
+from urllib.parse import urlparse
+from typing import Optional, Dict, Tuple, Type
 from athina.interfaces.result import EvalResult, EvalResultMetric
 from athina.helpers.logger import logger
 from athina.interfaces.athina import AthinaExperiment
 from ..base_evaluator import BaseEvaluator
 from .functions import operations
+from athina.evals.eval_type import FunctionEvalTypeId
 
 
 class FunctionEvaluator(BaseEvaluator):
@@ -46,6 +48,34 @@ class FunctionEvaluator(BaseEvaluator):
     def examples(self):
         return None
 
+    @property
+    def resource_key(self) -> str:
+        url = (self._function_arguments or {}).get("url")
+        if url:
+            return f"http:{urlparse(url).netloc}"
+        return f"cpu:{self.__class__.__name__}"
+
+    @property
+    def is_deterministic(self) -> bool:
+        # These functions depend on external services
+        return self._function_name not in (
+            FunctionEvalTypeId.API_CALL.value,
+            FunctionEvalTypeId.NO_INVALID_LINKS.value,
+            FunctionEvalTypeId.CONTAINS_VALID_LINK.value,
+        )
+
+    @property
+    def supports_process_pool(self) -> bool:
+        return self.is_deterministic
+
+    def _worker_spec(self) -> Tuple[Type[BaseEvaluator], Dict]:
+        # The wrapper classes only fill in the function name and arguments
+        return FunctionEvaluator, {
+            "function_name": self._function_name,
+            "function_arguments": self._function_arguments,
+            "display_name": self._display_name,
+        }
+
     def validate_args(self, **kwargs) -> None:
         return
 
@@ -1,4 +1,5 @@
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple, Type
+from athina.evals.grounded import similarity
 from athina.evals.grounded.similarity import Comparator
 from athina.metrics.metric_type import MetricType
 import time
@@ -22,6 +23,22 @@ class GroundedEvaluator(BaseEvaluator):
     def _model(self):
         return None
 
+    @property
+    def is_deterministic(self) -> bool:
+        return True
+
+    @property
+    def supports_process_pool(self) -> bool:
+        return True
+
+    def _worker_spec(self) -> Tuple[Type[BaseEvaluator], Dict]:
+        config = self.to_config()
+        comparator_class = getattr(similarity, config["similarity_function"])
+        return type(self), {
+            "comparator": comparator_class(),
+            "failure_threshold": config.get("failure_threshold"),
+        }
+
     @property
     def name(self):
         return self._comparator.__class__.__name__
@@ -2,7 +2,7 @@
 # https://hub.guardrailsai.com/validator/scb-10x/correct_language
 
 import time
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple, Type
 from athina.interfaces.result import EvalResult, EvalResultMetric
 from athina.helpers.logger import logger
 from ...base_evaluator import BaseEvaluator
@@ -54,6 +54,16 @@ class CorrectLanguage(BaseEvaluator):
     def to_config(self) -> Optional[Dict]:
         return None
 
+    @property
+    def supports_process_pool(self) -> bool:
+        return True
+
+    def _worker_spec(self) -> Tuple[Type[BaseEvaluator], Dict]:
+        return type(self), {
+            "expected_language_iso": self._expected_language_iso,
+            "threshold": self._threshold,
+        }
+
     def is_failure(self, result: bool) -> bool:
         return not (bool(result))
 
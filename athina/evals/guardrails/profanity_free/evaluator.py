@@ -45,6 +45,10 @@ class ProfanityFree(BaseEvaluator):
     def to_config(self) -> Optional[Dict]:
         return None
 
+    @property
+    def supports_process_pool(self) -> bool:
+        return True
+
     def is_failure(self, result: bool) -> bool:
         return not (bool(result))
 
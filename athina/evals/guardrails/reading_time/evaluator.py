@@ -2,7 +2,7 @@
 # https://hub.guardrailsai.com/validator/guardrails/profanity_free
 
 import time
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Type
 from athina.helpers.logger import logger
 from ...base_evaluator import BaseEvaluator
 from athina.metrics.metric_type import MetricType
@@ -14,6 +14,7 @@ class ReadingTime(BaseEvaluator):
     def __init__(self, reading_time: float):  # Time in seconds
         from guardrails.hub import ReadingTime as GuardrailsReadingTime
 
+        self._reading_time = reading_time
         # Initialize Validator
         self.validator = GuardrailsReadingTime(
             reading_time=reading_time,
@@ -43,6 +44,13 @@ class ReadingTime(BaseEvaluator):
     def to_config(self) -> Optional[Dict]:
         return None
 
+    @property
+    def supports_process_pool(self) -> bool:
+        return True
+
+    def _worker_spec(self) -> Tuple[Type[BaseEvaluator], Dict]:
+        return type(self), {"reading_time": self._reading_time}
+
     def is_failure(self, result: bool) -> bool:
         return not (bool(result))
 
@@ -2,7 +2,7 @@
 # https://hub.guardrailsai.com/validator/guardrails/nsfw_text
 
 import time
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple, Type
 from athina.helpers.logger import logger
 from ...base_evaluator import BaseEvaluator
 from athina.metrics.metric_type import MetricType
@@ -53,6 +53,16 @@ class SafeForWorkText(BaseEvaluator):
     def to_config(self) -> Optional[Dict]:
         return None
 
+    @property
+    def supports_process_pool(self) -> bool:
+        return True
+
+    def _worker_spec(self) -> Tuple[Type[BaseEvaluator], Dict]:
+        return type(self), {
+            "validation_method": self._validation_method,
+            "threshold": self._threshold,
+        }
+
     def is_failure(self, result: bool) -> bool:
         return not (bool(result))
 
@@ -2,7 +2,7 @@
 # https://hub.guardrailsai.com/validator/guardrails/toxic_language
 
 import time
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Type
 from athina.helpers.logger import logger
 from ...base_evaluator import BaseEvaluator
 from athina.metrics.metric_type import MetricType
@@ -56,6 +56,16 @@ class ToxicLanguage(BaseEvaluator):
     def to_config(self) -> Optional[Dict]:
         return None
 
+    @property
+    def supports_process_pool(self) -> bool:
+        return True
+
+    def _worker_spec(self) -> Tuple[Type[BaseEvaluator], Dict]:
+        return type(self), {
+            "validation_method": self._validation_method,
+            "threshold": self._threshold,
+        }
+
     def is_failure(self, result: bool) -> bool:
         return not (bool(result))
 
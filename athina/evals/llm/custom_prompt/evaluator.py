@@ -146,29 +146,41 @@ class CustomPrompt(LlmEvaluator):
                     "- explanation: An explanation of the label.\n"
                 )
 
-    def _evaluate(self, **kwargs) -> EvalResult:
+    @staticmethod
+    def _eval_error(e: Exception) -> Exception:
         """
-        Run the LLM evaluator.
+        Returns the error to raise when the LLM completion fails, or its response
+        can't be parsed.
         """
+        logger.error(f"Error occurred during eval: {e}")
+        if isinstance(e, (ValueError, KeyError)):
+            return ValueError(
+                "LLM evals must return a result/score/label and explanation. The LLM response did not return the correct structure for parsing evaluation results."
+            )
+        return e
 
-        start_time = time.time()
-        # Validate that correct args were passed
-        self.validate_args(**kwargs)
+    def _json_completion(self, messages: List[dict]) -> dict:
+        try:
+            return super()._json_completion(messages)
+        except Exception as e:
+            raise self._eval_error(e)
 
-        # Construct Prompt
-        messages = self._prompt_messages(**kwargs)
+    async def _ajson_completion(self, messages: List[dict]) -> dict:
+        try:
+            return await super()._ajson_completion(messages)
+        except Exception as e:
+            raise self._eval_error(e)
 
+    def _eval_result(
+        self, chat_completion_response_json: dict, start_time: float, **kwargs
+    ) -> EvalResult:
+        """
+        Builds the EvalResult from the LLM's JSON response, based on the output type.
+        """
         metrics = []
         failure = None
         explanation = "No explanation provided."  # Default value for explanation
         try:
-            # Run the LLM Completion
-            chat_completion_response_json: dict = self.llm_service.json_completion(
-                model=self._model,
-                messages=messages,
-                temperature=self.TEMPERATURE,
-            )
-
             if self._output_type == "boolean":
                 result = chat_completion_response_json["result"]
                 explanation = chat_completion_response_json["explanation"]
@@ -189,15 +201,9 @@ class CustomPrompt(LlmEvaluator):
                 failure = None
 
         except Exception as e:
-            logger.error(f"Error occurred during eval: {e}")
-            if isinstance(e, (ValueError, KeyError)):
-                raise ValueError(
-                    "LLM evals must return a result/score/label and explanation. The LLM response did not return the correct structure for parsing evaluation results."
-                )
-            else:
-                raise e
+            raise self._eval_error(e)
 
-        end_time = time.time()
+        end_time = time.perf_counter()
         eval_runtime_ms = int((end_time - start_time) * 1000)
         llm_eval_result = EvalResult(
             name=self.name,
@@ -94,24 +94,12 @@ class Groundedness(LlmEvaluator):
 
         return datapoint_field_annotations
 
-    def _evaluate(self, **kwargs) -> EvalResult:
+    def _eval_result(
+        self, chat_completion_response_json: dict, start_time: float, **kwargs
+    ) -> EvalResult:
         """
-        Run the LLM evaluator.
+        Builds the EvalResult from the LLM's JSON response.
         """
-        start_time = time.perf_counter()
-        # Validate that correct args were passed
-        self.validate_args(**kwargs)
-
-        # Construct Prompt
-        messages = self._prompt_messages(**kwargs)
-
-        # Run the LLM Completion
-        chat_completion_response_json: dict = self.llm_service.json_completion(
-            model=self._model,
-            messages=messages,
-            temperature=self.TEMPERATURE,
-        )
-
         metrics = []
         try:
             result = chat_completion_response_json[
@@ -1,3 +1,4 @@
+import copy
 import traceback
 from abc import ABC, abstractmethod
 import time
@@ -11,9 +12,16 @@ from athina.interfaces.data import DataPoint
 from athina.services.athina_api_service import AthinaApiService
 from athina.metrics.metric_type import MetricType
 from athina.llms.abstract_llm_service import AbstractLlmService
+from athina.llms.batch_responses import BatchResponses
+from athina.cache.eval_cache import EvalCache
+from athina.helpers.single_flight import SingleFlight
+from athina.helpers.run_stats import EvalTrace
 from .example import FewShotExample
 from ..base_evaluator import BaseEvaluator
 
+# Coalesces identical in-flight judge requests across threads
+_completion_flights = SingleFlight()
+
 
 class LlmEvaluator(BaseEvaluator):
     llm_service: AbstractLlmService
@@ -87,6 +95,122 @@ class LlmEvaluator(BaseEvaluator):
         """The default model for the evaluator."""
         pass
 
+    @property
+    def resource_key(self) -> str:
+        return f"llm:{self.llm_service.__class__.__name__}:{self._model}"
+
+    @property
+    def is_deterministic(self) -> bool:
+        return self.TEMPERATURE == 0
+
+    def _result_cache_key(self, **kwargs) -> Optional[str]:
+        # LLM evaluators cache the judge response keyed on the rendered prompt instead
+        return None
+
+    def _completion_cache_key(self, messages: List[dict]) -> Optional[str]:
+        """
+        Returns the content hash identifying a judge request, or None if the
+        request is not deterministic.
+        """
+        if not self.is_deterministic:
+            return None
+        return EvalCache.make_key(
+            "llm_completion",
+            self.name,
+            self.to_config(),
+            self._model,
+            messages,
+            self.TEMPERATURE,
+        )
+
+    def _json_completion(self, messages: List[dict]) -> dict:
+        """
+        Runs the judge completion. Deterministic completions are served from the
+        EvalCache when possible, and identical concurrent requests share one call.
+        Responses collected by a batch job are used when active.
+        """
+        batch_response = BatchResponses.get(self._model, messages, self.TEMPERATURE)
+        if batch_response is not None:
+            return batch_response
+        key = self._completion_cache_key(messages)
+        if key is None:
+            return self.llm_service.json_completion(
+                model=self._model,
+                messages=messages,
+                temperature=self.TEMPERATURE,
+            )
+        led = []
+
+        def complete():
+            led.append(True)
+            return self._cached_json_completion(key, messages)
+
+        chat_completion_response_json = _completion_flights.do(key, complete)
+        if not led:
+            # Served by an identical in-flight call
+            EvalTrace.record_cache_hit()
+        # Coalesced callers share the response, so each gets its own copy
+        return copy.deepcopy(chat_completion_response_json)
+
+    def _cached_json_completion(self, key: str, messages: List[dict]) -> dict:
+        cache = EvalCache.get_cache()
+        if cache is not None:
+            cached_response = cache.get(key)
+            if cached_response is not None:
+                EvalTrace.record_cache_hit()
+                return cached_response
+
+        chat_completion_response_json = self.llm_service.json_completion(
+            model=self._model,
+            messages=messages,
+            temperature=self.TEMPERATURE,
+        )
+        if cache is not None:
+            cache.set(key, chat_completion_response_json)
+        return chat_completion_response_json
+
+    async def _ajson_completion(self, messages: List[dict]) -> dict:
+        """
+        Async variant of _json_completion.
+        """
+        batch_response = BatchResponses.get(self._model, messages, self.TEMPERATURE)
+        if batch_response is not None:
+            return batch_response
+        key = self._completion_cache_key(messages)
+        if key is None:
+            return await self.llm_service.ajson_completion(
+                model=self._model,
+                messages=messages,
+                temperature=self.TEMPERATURE,
+            )
+        led = []
+
+        async def complete():
+            led.append(True)
+            return await self._acached_json_completion(key, messages)
+
+        chat_completion_response_json = await _completion_flights.ado(key, complete)
+        if not led:
+            EvalTrace.record_cache_hit()
+        return copy.deepcopy(chat_completion_response_json)
+
+    async def _acached_json_completion(self, key: str, messages: List[dict]) -> dict:
+        cache = EvalCache.get_cache()
+        if cache is not None:
+            cached_response = cache.get(key)
+            if cached_response is not None:
+                EvalTrace.record_cache_hit()
+                return cached_response
+
+        chat_completion_response_json = await self.llm_service.ajson_completion(
+            model=self._model,
+            messages=messages,
+            temperature=self.TEMPERATURE,
+        )
+        if cache is not None:
+            cache.set(key, chat_completion_response_json)
+        return chat_completion_response_json
+
     def __str__(self):
         formatted_args = [str(value) for value in self.required_args]
         return f"Docstring: {self.__doc__}\nRequired Arguments: {formatted_args}"
@@ -110,20 +234,42 @@ class LlmEvaluator(BaseEvaluator):
         """
         Run the LLM evaluator.
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         # Validate that correct args were passed
         self.validate_args(**kwargs)
 
         # Construct Prompt
         messages = self._prompt_messages(**kwargs)
+
         # Run the LLM Completion
+        chat_completion_response_json = self._json_completion(messages)
+        return self._eval_result(chat_completion_response_json, start_time, **kwargs)
 
-        chat_completion_response_json: dict = self.llm_service.json_completion(
-            model=self._model,
-            messages=messages,
-            temperature=self.TEMPERATURE,
-        )
+    async def _aevaluate(self, **kwargs) -> EvalResult:
+        """
+        Run the LLM evaluator without blocking the event loop.
+        """
+        if type(self)._evaluate is not LlmEvaluator._evaluate:
+            # Subclasses with their own _evaluate don't have an async-native path
+            return await super()._aevaluate(**kwargs)
+
+        start_time = time.perf_counter()
+        # Validate that correct args were passed
+        self.validate_args(**kwargs)
+
+        # Construct Prompt
+        messages = self._prompt_messages(**kwargs)
+
+        # Run the LLM Completion
+        chat_completion_response_json = await self._ajson_completion(messages)
+        return self._eval_result(chat_completion_response_json, start_time, **kwargs)
 
+    def _eval_result(
+        self, chat_completion_response_json: dict, start_time: float, **kwargs
+    ) -> EvalResult:
+        """
+        Builds the EvalResult from the LLM's JSON response.
+        """
         metrics = []
         try:
             result = chat_completion_response_json["result"]
@@ -138,7 +284,7 @@ class LlmEvaluator(BaseEvaluator):
             logger.error(f"Error occurred during eval: {e}")
             raise e
 
-        end_time = time.time()
+        end_time = time.perf_counter()
         eval_runtime_ms = int((end_time - start_time) * 1000)
         llm_eval_result = EvalResult(
             name=self.name,
@@ -43,6 +43,10 @@ class RagasEvaluator(BaseEvaluator):
     def default_model(self) -> str:
         return Model.GPT35_TURBO.value
 
+    @property
+    def resource_key(self) -> str:
+        return f"llm:{self._provider}:{self._model}"
+
     def generate_data_to_evaluate(self, **kwargs):
         pass
 
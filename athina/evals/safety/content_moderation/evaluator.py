@@ -30,6 +30,10 @@ class OpenAiContentModeration(BaseEvaluator):
     def examples(self):
         return None
 
+    @property
+    def resource_key(self) -> str:
+        return "http:api.openai.com"
+
     def __init__(self, open_ai_api_key: Optional[str] = None):
         if open_ai_api_key is None:
             if OpenAiApiKey.get_key() is None:
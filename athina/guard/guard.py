@@ -1,17 +1,18 @@
 import time
-from typing import List
+from typing import List, Optional
 from ..evals import BaseEvaluator
+from ..llms.budget import Budget
 from .exception import AthinaGuardException
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
-def guard(suite: List[BaseEvaluator], **kwargs):
+def guard(suite: List[BaseEvaluator], budget: Optional[Budget] = None, **kwargs):
     # Define the maximum number of threads to use
     max_workers = 10  # Adjust based on your needs and environment
     start_time = time.perf_counter()
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # Submit all evaluation functions to the executor
-        future_to_eval = {executor.submit(eval.guard, **kwargs): eval for eval in suite}
+        future_to_eval = {executor.submit(eval.guard, budget=budget, **kwargs): eval for eval in suite}
 
         for future in as_completed(future_to_eval):
             eval = future_to_eval[future]
@@ -10,11 +10,24 @@ from athina.interfaces.athina import (
 )
 from athina.interfaces.result import EvalResult
 from athina.services.athina_api_service import AthinaApiService
+from athina.services.background_uploader import BackgroundUploader
 from athina.keys import AthinaApiKey
 from athina.constants.messages import AthinaMessages
+from athina.helpers.upload_helper import (
+    EVAL_RESULTS_CHUNK_SIZE,
+    chunk_by_size,
+    idempotency_key,
+)
 
 
 class AthinaLoggingHelper:
+    @staticmethod
+    def flush(timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until all eval results queued for upload have been sent to Athina.
+        """
+        return BackgroundUploader.get().flush(timeout)
+
     @staticmethod
     def log_eval_performance_report(*args, **kwargs):
         """
@@ -121,7 +134,9 @@ class AthinaLoggingHelper:
                 athina_eval_result_create_many_request.append(
                     athina_eval_result_create_request_dict
                 )
-            AthinaApiService.log_eval_results(athina_eval_result_create_many_request)
+            AthinaApiService.enqueue_eval_results(
+                athina_eval_result_create_many_request
+            )
 
         except Exception as e:
             print(
@@ -138,11 +153,11 @@ class AthinaLoggingHelper:
                 return {k: v for k, v in data.items() if v is not None}
 
             eval_results = eval_results_with_config.get("eval_results", [])
-            # Limit to the first 1000 items
-            sliced_eval_results = eval_results[:1000]
             cleaned_eval_results = []
 
-            for eval_result in sliced_eval_results:
+            for eval_result in eval_results:
+                # Keep failed rows as empty results, so that results stay aligned with dataset rows
+                eval_result = eval_result or {}
                 cleaned_eval_result = {
                     "metrics": eval_result.get("metrics"),
                     "reason": eval_result.get("reason"),
@@ -153,13 +168,23 @@ class AthinaLoggingHelper:
                 eval_results_with_config.get("development_eval_config", {})
             )
 
-            cleaned_results = {
-                "dataset_id": dataset_id,
-                "eval_results": cleaned_eval_results,
-                "development_eval_config": development_eval_config,
-            }
-
-            # Replace with your logging mechanism
-            AthinaApiService.log_eval_results_with_config(cleaned_results)
+            # Upload in chunks, in order, so that results stay aligned with rows
+            chunks = chunk_by_size(cleaned_eval_results, EVAL_RESULTS_CHUNK_SIZE)
+            AthinaApiService.enqueue_eval_results_with_config(
+                [
+                    {
+                        "dataset_id": dataset_id,
+                        "eval_results": chunk,
+                        "development_eval_config": development_eval_config,
+                    }
+                    for _, chunk in chunks
+                ],
+                idempotency_keys=[
+                    idempotency_key(
+                        dataset_id, development_eval_config, row_offset, chunk
+                    )
+                    for row_offset, chunk in chunks
+                ],
+            )
         except Exception as e:
             raise
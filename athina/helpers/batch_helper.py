@@ -0,0 +1,171 @@
+import asyncio
+import contextvars
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    FIRST_COMPLETED,
+    wait,
+)
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+)
+
+
+def bounded_map(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int,
+    max_in_flight: Optional[int] = None,
+    ordered: bool = True,
+    executor: Optional[Executor] = None,
+) -> Iterator[Tuple[int, Any, Future]]:
+    """
+    Runs `fn` over `items` with a bounded number of pending futures, and yields
+    `(index, item, future)` as each future completes.
+
+    Unlike submitting every item up front, at most `max_in_flight` items are
+    held in memory at any time (including completed results that are waiting
+    to be yielded in order), so memory stays flat for arbitrarily large inputs.
+
+    Args:
+        fn: The function to run on every item.
+        items: Any iterable. It is consumed lazily.
+        max_workers: Number of worker threads.
+        max_in_flight: Maximum number of pending items. Defaults to 2 * max_workers.
+        ordered: If True, results are yielded in input order. Otherwise they are
+            yielded as soon as they complete.
+        executor: An optional executor to use instead of a new thread pool.
+
+    With a thread pool, `fn` runs in a copy of the caller's context, so context
+    variables (e.g. an active Budget) are visible to it, like with asyncio.to_thread.
+    """
+    if max_in_flight is None:
+        max_in_flight = max(1, 2 * max_workers)
+    max_in_flight = max(max_in_flight, 1)
+
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    copy_context = isinstance(executor, ThreadPoolExecutor)
+
+    iterator = enumerate(items)
+    pending: Dict[Future, Tuple[int, Any]] = {}
+    # Submission order, used to yield results in order
+    order: deque = deque()
+    completed: Dict[int, Tuple[Any, Future]] = {}
+    exhausted = False
+
+    try:
+        while True:
+            # Top up the window
+            while not exhausted and len(pending) + len(completed) < max_in_flight:
+                try:
+                    index, item = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if copy_context:
+                    future = executor.submit(
+                        contextvars.copy_context().run, fn, item
+                    )
+                else:
+                    future = executor.submit(fn, item)
+                pending[future] = (index, item)
+                if ordered:
+                    order.append(index)
+
+            if not pending:
+                break
+
+            done, _ = wait(pending.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                index, item = pending.pop(future)
+                if ordered:
+                    completed[index] = (item, future)
+                else:
+                    yield index, item, future
+
+            # Release completed results in input order
+            while ordered and order and order[0] in completed:
+                index = order.popleft()
+                item, future = completed.pop(index)
+                yield index, item, future
+    finally:
+        for future in pending:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def abounded_map(
+    fn: Callable[[Any], Awaitable[Any]],
+    items: Iterable[Any],
+    max_concurrency: int,
+    max_in_flight: Optional[int] = None,
+    ordered: bool = True,
+) -> AsyncIterator[Tuple[int, Any, "asyncio.Task"]]:
+    """
+    Async counterpart of `bounded_map`. Runs the coroutine function `fn` over
+    `items`, with at most `max_concurrency` coroutines running at once (enforced
+    by a semaphore) and at most `max_in_flight` tasks created at a time.
+
+    Yields `(index, item, task)` as each task completes.
+    """
+    if max_in_flight is None:
+        max_in_flight = max(1, 2 * max_concurrency)
+    max_in_flight = max(max_in_flight, max_concurrency, 1)
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+    async def _run(item):
+        async with semaphore:
+            return await fn(item)
+
+    iterator = enumerate(items)
+    pending: Dict[asyncio.Task, Tuple[int, Any]] = {}
+    order: deque = deque()
+    completed: Dict[int, Tuple[Any, asyncio.Task]] = {}
+    exhausted = False
+
+    try:
+        while True:
+            while not exhausted and len(pending) + len(completed) < max_in_flight:
+                try:
+                    index, item = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                task = asyncio.ensure_future(_run(item))
+                pending[task] = (index, item)
+                if ordered:
+                    order.append(index)
+
+            if not pending:
+                break
+
+            done, _ = await asyncio.wait(
+                pending.keys(), return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                index, item = pending.pop(task)
+                if ordered:
+                    completed[index] = (item, task)
+                else:
+                    yield index, item, task
+
+            while ordered and order and order[0] in completed:
+                index = order.popleft()
+                item, task = completed.pop(index)
+                yield index, item, task
+    finally:
+        for task in pending:
+            task.cancel()
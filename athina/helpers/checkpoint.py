@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple, Union
+from athina.interfaces.result import EvalResult
+from athina.llms.budget import Budget
+
+
+class CheckpointStore:
+    """
+    An append-only JSONL file of completed eval results, used to resume
+    interrupted batch and suite runs without re-running finished rows.
+
+    Results are keyed by the evaluator (name, config and model) and the hash
+    of the datapoint. Failed evaluations, and rows skipped because the budget
+    ran out, are not checkpointed, so they are retried on the next run.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._results: Dict[Tuple[str, str], EvalResult] = {}
+        self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+        if self._ends_with_partial_line():
+            self._file.write("\n")
+
+    @staticmethod
+    @contextmanager
+    def open(
+        checkpoint: Union[str, "CheckpointStore", None]
+    ) -> Iterator[Optional["CheckpointStore"]]:
+        """
+        Yields a CheckpointStore for a path, and closes it on exit. A store that is
+        passed in is yielded as is, and left open for the caller to close.
+        """
+        if checkpoint is None or isinstance(checkpoint, CheckpointStore):
+            yield checkpoint
+            return
+        store = CheckpointStore(checkpoint)
+        try:
+            yield store
+        finally:
+            store.close()
+
+    @staticmethod
+    def eval_key(eval) -> str:
+        """
+        Returns the key identifying an evaluator's configuration.
+        """
+        key_data = {
+            "name": eval.name,
+            "config": eval.to_config(),
+            "model": getattr(eval, "_model", None),
+        }
+        return hashlib.md5(
+            json.dumps(key_data, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A partially written line from an interrupted run
+                    continue
+                self._results[(record["eval_key"], record["row_hash"])] = record[
+                    "eval_result"
+                ]
+
+    def _ends_with_partial_line(self) -> bool:
+        if os.path.getsize(self.path) == 0:
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def get(self, eval_key: str, row_hash: str) -> Optional[EvalResult]:
+        return self._results.get((eval_key, row_hash))
+
+    def put(self, eval_key: str, row_hash: str, eval_result: Optional[EvalResult]):
+        """
+        Appends a completed eval result to the checkpoint file.
+        """
+        if eval_result is None or Budget.is_exhausted_result(eval_result):
+            return
+        record = {
+            "eval_key": eval_key,
+            "row_hash": row_hash,
+            "eval_result": eval_result,
+        }
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._results[(eval_key, row_hash)] = eval_result
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def __len__(self):
+        return len(self._results)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -1,4 +1,6 @@
 from datetime import datetime, timezone
+import hashlib
+import json
 import random
 import string
 
@@ -34,3 +36,32 @@ def generate_eval_display_name(eval_display_name: str) -> str:
     eval_display_name = f"{eval_display_name}_{timestamp}_{random_suffix}"
 
     return eval_display_name
+
+
+def hash_datapoint(datapoint: dict) -> str:
+    """Returns a stable hash of a datapoint, based on its sorted JSON serialization.
+
+    Args:
+        datapoint (dict): The datapoint to hash.
+
+    Returns:
+        str: The md5 hex digest of the datapoint.
+    """
+    return hashlib.md5(
+        json.dumps(datapoint, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def shard_for_datapoint(datapoint: dict, num_shards: int) -> int:
+    """Returns the shard a datapoint is assigned to, from its hash.
+
+    The assignment is deterministic, so every process and machine agrees on it.
+
+    Args:
+        datapoint (dict): The datapoint to assign.
+        num_shards (int): The number of shards.
+
+    Returns:
+        int: The shard index, between 0 and num_shards - 1.
+    """
+    return int(hash_datapoint(datapoint), 16) % num_shards
@@ -0,0 +1,144 @@
+import math
+import random
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+from athina.metrics.metric_type import MetricType
+
+
+@dataclass
+class EarlyStopping:
+    """
+    Settings for sequential sampling: rows are evaluated in random order, and
+    an evaluator stops once the Wilson confidence interval on its pass rate is
+    narrower than `target_width`, or lies entirely above or below `threshold`.
+
+    At least one of `target_width` and `threshold` must be set.
+    """
+
+    target_width: Optional[float] = None
+    threshold: Optional[float] = None
+    confidence: float = 0.95
+    min_samples: int = 30
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.target_width is None and self.threshold is None:
+            raise ValueError("EarlyStopping needs a target_width or a threshold")
+        if not 0 < self.confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+
+    def shuffled(self, indices: List[int]) -> List[int]:
+        """Returns the indices in a random order (reproducible if a seed is set)."""
+        indices = list(indices)
+        random.Random(self.seed).shuffle(indices)
+        return indices
+
+
+def wilson_interval(
+    passes: float, n: float, confidence: float = 0.95
+) -> Tuple[float, float]:
+    """
+    Returns the Wilson score interval for a pass rate of passes / n.
+    """
+    if n <= 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    p = passes / n
+    denominator = 1 + z**2 / n
+    center = (p + z**2 / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def passed_value(eval_result: Optional[dict]) -> Optional[bool]:
+    """
+    Returns whether an eval result passed, from its "passed" metric or else its
+    failure flag. Returns None if the result has neither.
+    """
+    if not eval_result:
+        return None
+    for metric in eval_result.get("metrics") or []:
+        if metric.get("id") == MetricType.PASSED.value:
+            try:
+                return bool(float(metric["value"]))
+            except (TypeError, ValueError):
+                return None
+    if eval_result.get("failure") is not None:
+        return not eval_result["failure"]
+    return None
+
+
+class PassRateMonitor:
+    """
+    Running pass rate of one evaluator, with its confidence interval.
+
+    Each result can be weighted, e.g. by the number of duplicate rows it stands
+    for. Weights only shift the pass rate estimate: `min_samples` and the width of
+    the interval count each evaluated result once, since duplicates of a row add
+    no information about the pass rate.
+    """
+
+    def __init__(self, early_stopping: EarlyStopping):
+        self.early_stopping = early_stopping
+        # Evaluated results, each counted once
+        self.n = 0
+        # Rows the results stand for, and how many of those passed
+        self.weight = 0.0
+        self.passes = 0.0
+        self.stopped = False
+        self.reason: Optional[str] = None
+
+    def add(self, eval_result: Optional[dict], weight: float = 1.0):
+        passed = passed_value(eval_result)
+        if passed is None:
+            return
+        self.n += 1
+        self.weight += weight
+        self.passes += weight if passed else 0
+
+    @property
+    def pass_rate(self) -> Optional[float]:
+        return self.passes / self.weight if self.weight else None
+
+    @property
+    def interval(self) -> Tuple[float, float]:
+        pass_rate = self.pass_rate or 0.0
+        return wilson_interval(
+            pass_rate * self.n, self.n, self.early_stopping.confidence
+        )
+
+    def should_stop(self) -> bool:
+        """
+        Returns True once the pass rate is known precisely enough. Sticky.
+        """
+        if self.stopped:
+            return True
+        if self.n < self.early_stopping.min_samples:
+            return False
+        low, high = self.interval
+        target_width = self.early_stopping.target_width
+        threshold = self.early_stopping.threshold
+        if target_width is not None and high - low <= target_width:
+            self.reason = f"interval narrower than {target_width}"
+        elif threshold is not None and low > threshold:
+            self.reason = f"pass rate above {threshold}"
+        elif threshold is not None and high < threshold:
+            self.reason = f"pass rate below {threshold}"
+        else:
+            return False
+        self.stopped = True
+        return True
+
+    def summary(self) -> Dict:
+        low, high = self.interval
+        return {
+            "evaluated": self.n,
+            "rows_represented": self.weight,
+            "pass_rate": self.pass_rate,
+            "ci_low": low,
+            "ci_high": high,
+            "confidence": self.early_stopping.confidence,
+            "stopped_early": self.stopped,
+            "reason": self.reason,
+        }
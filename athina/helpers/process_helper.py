@@ -0,0 +1,75 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+EXECUTOR_AUTO = "auto"
+EXECUTORS = (EXECUTOR_THREAD, EXECUTOR_PROCESS, EXECUTOR_AUTO)
+
+DEFAULT_CHUNK_SIZE = 64
+
+# Evaluators rebuilt in this worker process, keyed by their spec
+_worker_evaluators: Dict[Tuple[str, str, str], Any] = {}
+
+
+def default_process_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def create_process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=max_workers or default_process_workers())
+
+
+def use_process_pool(evaluator, executor: str, strict: bool = True) -> bool:
+    """
+    Returns whether an evaluator should run in a process pool for the given executor mode.
+
+    "auto" uses a process pool for evaluators that support it. "process" does too,
+    and if `strict` is set, raises for evaluators that cannot run in a process pool.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(
+            f"Invalid executor: {executor}. Must be one of {', '.join(EXECUTORS)}"
+        )
+    if executor == EXECUTOR_THREAD:
+        return False
+    if strict and executor == EXECUTOR_PROCESS and not evaluator.supports_process_pool:
+        raise ValueError(
+            f"{evaluator.display_name} cannot run in a process pool. Use executor='thread' or 'auto'."
+        )
+    return evaluator.supports_process_pool
+
+
+def chunked(items: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _worker_evaluator(spec: Tuple[type, Dict]):
+    evaluator_class, init_kwargs = spec
+    key = (
+        evaluator_class.__module__,
+        evaluator_class.__qualname__,
+        json.dumps(init_kwargs, sort_keys=True, default=str),
+    )
+    evaluator = _worker_evaluators.get(key)
+    if evaluator is None:
+        evaluator = evaluator_class(**init_kwargs)
+        _worker_evaluators[key] = evaluator
+    return evaluator
+
+
+def evaluate_chunk(spec: Tuple[type, Dict], entries: List[Dict]) -> List[Optional[Dict]]:
+    """
+    Runs in a worker process: rebuilds the evaluator from its spec (once per
+    process) and evaluates a chunk of entries.
+    """
+    evaluator = _worker_evaluator(spec)
+    return [evaluator._evaluate_batch_entry(entry) for entry in entries]
@@ -0,0 +1,238 @@
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+
+@dataclass
+class EvalTrace:
+    """
+    Per-evaluation counters, filled in by the LLM services and caches while
+    an evaluation runs. The trace of the running evaluation is held in a
+    context variable, so nothing has to be threaded through call signatures.
+    """
+
+    attempts: int = 0
+    llm_calls: int = 0
+    cache_hits: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    provider_seconds: float = 0.0
+
+    @staticmethod
+    def current() -> Optional["EvalTrace"]:
+        return _current_trace.get()
+
+    @staticmethod
+    @contextmanager
+    def start() -> Iterator["EvalTrace"]:
+        trace = EvalTrace()
+        token = _current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            _current_trace.reset(token)
+
+    @staticmethod
+    def record_attempt():
+        """Records a request sent to an LLM provider, including retried requests."""
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.attempts += 1
+
+    @staticmethod
+    def record_llm_call(
+        prompt_tokens: int,
+        completion_tokens: int,
+        cost_usd: float,
+        provider_seconds: float,
+    ):
+        """Records a successful LLM provider call."""
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.llm_calls += 1
+            trace.prompt_tokens += prompt_tokens or 0
+            trace.completion_tokens += completion_tokens or 0
+            trace.cost_usd += cost_usd or 0.0
+            trace.provider_seconds += provider_seconds
+
+    @staticmethod
+    def record_cache_hit():
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.cache_hits += 1
+
+
+_current_trace: contextvars.ContextVar[Optional[EvalTrace]] = contextvars.ContextVar(
+    "athina_eval_trace", default=None
+)
+
+
+class LatencySummary:
+    """
+    Streaming latency summary. Keeps the count, mean and max exactly, and
+    estimates percentiles from a fixed-size uniform reservoir sample.
+    """
+
+    def __init__(self, reservoir_size: int = 10000):
+        self.reservoir_size = reservoir_size
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples: List[float] = []
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        if len(self._samples) < self.reservoir_size:
+            self._samples.append(value)
+        else:
+            index = random.randrange(self.count)
+            if index < self.reservoir_size:
+                self._samples[index] = value
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        index = min(len(samples) - 1, max(0, int(round(q / 100 * len(samples))) - 1))
+        return samples[index]
+
+    def summary(self) -> Optional[Dict[str, float]]:
+        if self.count == 0:
+            return None
+        return {
+            "p50": round(self.percentile(50), 2),
+            "p90": round(self.percentile(90), 2),
+            "p99": round(self.percentile(99), 2),
+            "mean": round(self.total / self.count, 2),
+            "max": round(self.max, 2),
+        }
+
+
+class EvalRunStats:
+    """
+    Performance and cost statistics for one evaluator over a run, updated
+    incrementally as results arrive. Thread-safe.
+
+    Latencies are in milliseconds:
+    - queue: time from dispatch until the evaluation started
+    - provider: time spent waiting on the LLM provider
+    - parse: the rest of the evaluation (prompt building, parsing, scoring)
+    - total: queue + evaluation
+    """
+
+    def __init__(self, evaluator: str):
+        self.evaluator = evaluator
+        self.count = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.llm_calls = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.latency_ms = {
+            "queue": LatencySummary(),
+            "provider": LatencySummary(),
+            "parse": LatencySummary(),
+            "total": LatencySummary(),
+        }
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        eval_result: Optional[dict],
+        trace: Optional[EvalTrace] = None,
+        queue_seconds: Optional[float] = None,
+        eval_seconds: Optional[float] = None,
+    ):
+        """
+        Records one evaluation. When the trace has no LLM calls (e.g. for results
+        computed in another process, or LLM services that don't report to the
+        trace), usage and cost are taken from the result's metadata.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = now - (queue_seconds or 0) - (eval_seconds or 0)
+            self._finished_at = now
+            self.count += 1
+            if eval_result is None:
+                self.errors += 1
+
+            provider_seconds = 0.0
+            if trace is not None:
+                self.cache_hits += trace.cache_hits
+                self.retries += max(0, trace.attempts - trace.llm_calls)
+            if trace is not None and trace.llm_calls:
+                self.llm_calls += trace.llm_calls
+                self.prompt_tokens += trace.prompt_tokens
+                self.completion_tokens += trace.completion_tokens
+                self.cost_usd += trace.cost_usd
+                provider_seconds = trace.provider_seconds
+            elif trace is None or not trace.cache_hits:
+                # The LLM service doesn't report to the trace
+                provider_seconds = self._record_metadata(eval_result)
+
+            if queue_seconds is not None:
+                self.latency_ms["queue"].add(queue_seconds * 1000)
+            if eval_seconds is not None:
+                if provider_seconds:
+                    self.latency_ms["provider"].add(provider_seconds * 1000)
+                self.latency_ms["parse"].add(
+                    max(0.0, eval_seconds - provider_seconds) * 1000
+                )
+                self.latency_ms["total"].add(
+                    ((queue_seconds or 0) + eval_seconds) * 1000
+                )
+
+    def _record_metadata(self, eval_result: Optional[dict]) -> float:
+        metadata = (eval_result or {}).get("metadata") or {}
+        if not isinstance(metadata, dict) or "usage" not in metadata:
+            return 0.0
+        usage = metadata.get("usage") or {}
+        self.llm_calls += 1
+        self.prompt_tokens += usage.get("prompt_tokens") or 0
+        self.completion_tokens += usage.get("completion_tokens") or 0
+        self.cost_usd += (metadata.get("cost") or {}).get("total_cost_usd_dollar") or 0
+        return (metadata.get("response_time") or 0) / 1000
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """Evaluations per second, over the wall time of the run so far."""
+        if self._started_at is None or self._finished_at <= self._started_at:
+            return None
+        return self.count / (self._finished_at - self._started_at)
+
+    def summary(self) -> Dict:
+        with self._lock:
+            throughput = self.throughput
+            return {
+                "evaluator": self.evaluator,
+                "count": self.count,
+                "errors": self.errors,
+                "cache_hits": self.cache_hits,
+                "llm_calls": self.llm_calls,
+                "retries": self.retries,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "cost_usd": round(self.cost_usd, 6),
+                "throughput_per_second": (
+                    round(throughput, 2) if throughput is not None else None
+                ),
+                "latency_ms": {
+                    name: latency.summary()
+                    for name, latency in self.latency_ms.items()
+                },
+            }
+
+    def __repr__(self) -> str:
+        return f"EvalRunStats({self.summary()})"
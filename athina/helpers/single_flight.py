@@ -0,0 +1,92 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.exception: BaseException = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key, so that only one of them runs
+    and the others wait for (and share) its result.
+
+    Unlike a cache, nothing is kept once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[Any, Dict[str, asyncio.Future]] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Runs fn, unless a call with the same key is already in flight, in which
+        case waits for that call and returns its result (or raises its exception).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not is_leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async variant of do. Calls are coalesced within the running event loop.
+        If the caller making the call is cancelled, a waiting caller retries it.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            calls = self._async_calls.setdefault(loop, {})
+            future = calls.get(key)
+            if future is None:
+                break
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    # This caller was cancelled, not the call it was waiting for
+                    raise
+                # The caller making the call was cancelled, so one of the callers
+                # waiting for it makes the call instead
+
+        future = loop.create_future()
+        calls[key] = future
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case there are no waiters
+            future.exception()
+            raise
+        finally:
+            del calls[key]
+            if not calls:
+                self._async_calls.pop(loop, None)
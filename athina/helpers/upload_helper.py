@@ -0,0 +1,77 @@
+import hashlib
+import json
+import random
+import time
+from typing import Any, Callable, List, Tuple
+
+# The Athina API accepts at most 1000 eval results per request
+EVAL_RESULTS_CHUNK_SIZE = 1000
+DATASET_ROWS_CHUNK_SIZE = 100
+MAX_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def chunk_by_size(
+    items: List[Any],
+    max_items: int,
+    max_bytes: int = MAX_CHUNK_BYTES,
+) -> List[Tuple[int, List[Any]]]:
+    """
+    Splits items into chunks of at most `max_items` items and (approximately)
+    `max_bytes` bytes of JSON. Returns `(offset, chunk)` pairs, where offset is
+    the index of the chunk's first item.
+    """
+    chunks: List[Tuple[int, List[Any]]] = []
+    chunk: List[Any] = []
+    chunk_bytes = 0
+    offset = 0
+    for index, item in enumerate(items):
+        item_bytes = len(json.dumps(item, default=str))
+        if chunk and (
+            len(chunk) >= max_items or chunk_bytes + item_bytes > max_bytes
+        ):
+            chunks.append((offset, chunk))
+            chunk, chunk_bytes, offset = [], 0, index
+        chunk.append(item)
+        chunk_bytes += item_bytes
+    if chunk:
+        chunks.append((offset, chunk))
+    return chunks
+
+
+def idempotency_key(*parts: Any) -> str:
+    """
+    Returns a stable key for a chunk, so that the server can ignore a chunk
+    that is sent again after a retry.
+    """
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def upload_chunks(
+    upload_fn: Callable[[int, List[Any]], Any],
+    chunks: List[Tuple[int, List[Any]]],
+    max_attempts: int = 3,
+    backoff_base_seconds: float = 0.5,
+) -> List[Any]:
+    """
+    Calls `upload_fn(offset, chunk)` for every chunk, one at a time and in order.
+    Each chunk is retried on its own, so a failed chunk does not cause the
+    others to be sent again.
+
+    Returns the result of every upload, in chunk order. Raises the last error
+    if a chunk still fails after `max_attempts` attempts, without sending the
+    chunks after it.
+    """
+
+    def upload_with_retry(offset: int, chunk: List[Any]):
+        for attempt in range(max_attempts):
+            try:
+                return upload_fn(offset, chunk)
+            except Exception:
+                if attempt == max_attempts - 1:
+                    raise
+                backoff = backoff_base_seconds * 2**attempt
+                time.sleep(backoff * (0.5 + random.random() / 2))
+
+    return [upload_with_retry(offset, chunk) for offset, chunk in chunks]
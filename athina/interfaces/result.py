@@ -2,6 +2,7 @@ import pandas as pd
 from dataclasses import dataclass, field
 from typing import TypedDict, List, Optional
 from athina.interfaces.data import DataPoint
+from athina.helpers.run_stats import EvalRunStats
 from pydantic import BaseModel
 from typing import Union
 
@@ -50,48 +51,63 @@ class BatchRunResult:
 
     eval_results: List[Optional[EvalResult]]
     eval_request_id: Optional[str] = field(default=None)
+    stats: Optional[EvalRunStats] = field(default=None)
+    early_stopping: Optional[dict] = field(default=None)
+    budget: Optional[dict] = field(default=None)
 
     def to_df(self):
         """
         Converts the batch run result to a Pandas DataFrame, including data and dynamic metrics.
+        The DataFrame is built column by column.
         """
-        pd.set_option("display.max_colwidth", 500)
+        _set_display_options()
+        df = self._build_df()
+        if self.stats is not None:
+            df.attrs["eval_stats"] = self.stats.summary()
+        return df
 
-        df_data = []
-        for item in self.eval_results:
+    def _build_df(self) -> pd.DataFrame:
+        results = self.eval_results
+        inputs = pd.DataFrame([item["data"] if item else {} for item in results])
+        columns = {name: inputs[name] for name in inputs.columns}
+        fields = {
+            "display_name": "display_name",
+            "failed": "failure",
+            "grade_reason": "reason",
+            "runtime": "runtime",
+            "model": "model",
+        }
+        for column_name, key in fields.items():
+            columns[column_name] = [
+                item.get(key) if item else None for item in results
+            ]
+        # One column per metric
+        for row_index, item in enumerate(results):
             if item is None:
-                # Add a representation for None entries
-                entry = {
-                    "display_name": None,
-                    "failed": None,
-                    "grade_reason": None,
-                    "runtime": None,
-                    "model": None,
-                    # Add more fields as None or with a placeholder as necessary
-                }
-            else:
-                # Start with dynamic fields from the 'data' dictionary
-                entry = {key: value for key, value in item["data"].items()}
-
-                # Add fixed fields
-                entry.update(
-                    {
-                        "display_name": item["display_name"],
-                        "failed": item.get("failure"),
-                        "grade_reason": item["reason"],
-                        "runtime": item["runtime"],
-                        "model": item.get("model"),
-                    }
-                )
-
-                # Add dynamic metrics
-                for metric in item["metrics"]:
-                    entry[metric["id"]] = metric["value"]
-
-            df_data.append(entry)
-
-        df = pd.DataFrame(df_data)
-        return df
+                continue
+            for metric in item["metrics"]:
+                column = columns.get(metric["id"])
+                if column is None:
+                    column = columns[metric["id"]] = [None] * len(results)
+                elif not isinstance(column, list):
+                    # A metric with the same name as a data field replaces its value
+                    column = columns[metric["id"]] = list(column)
+                column[row_index] = metric["value"]
+        return pd.DataFrame(columns, index=inputs.index, copy=False)
+
+
+_display_options_set = False
+
+
+def _set_display_options():
+    """
+    Shows long values (such as grade reasons) in full when displaying DataFrames.
+    Set on the first conversion only, rather than on every call.
+    """
+    global _display_options_set
+    if not _display_options_set:
+        pd.set_option("display.max_colwidth", 500)
+        _display_options_set = True
 
 
 class EvalPerformanceReport(TypedDict):
@@ -1,4 +1,14 @@
+import asyncio
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+from athina.cache.embedding_cache import EmbeddingCache
+
+# Statuses of a batch job
+BATCH_IN_PROGRESS = "in_progress"
+BATCH_COMPLETED = "completed"
+BATCH_FAILED = "failed"
 
 
 class AbstractLlmService(ABC):
@@ -6,6 +16,14 @@ class AbstractLlmService(ABC):
     Abstract class for different Language Learning Model (LLM) Providers.
     """
 
+    # Embedding model used when none is given
+    DEFAULT_EMBEDDING_MODEL: Optional[str] = None
+    # Limits of a single embeddings request; services whose API embeds several
+    # inputs per request raise them and override `_embed_chunk`
+    EMBEDDINGS_MAX_INPUTS = 1
+    EMBEDDINGS_MAX_TOKENS: Optional[int] = None
+    EMBEDDINGS_MAX_WORKERS = 4
+
     @abstractmethod
     def embeddings(self, text: str) -> list:
         """
@@ -45,3 +63,126 @@ class AbstractLlmService(ABC):
         to interact with the specific LLM provider's chat completion API in streaming mode.
         """
         raise NotImplementedError
+
+    async def achat_completion(self, messages, model, **kwargs):
+        """
+        Async variant of chat_completion. Subclasses should override this with a native
+        async implementation; by default the blocking call runs in a worker thread.
+        """
+        return await asyncio.to_thread(
+            self.chat_completion, messages=messages, model=model, **kwargs
+        )
+
+    async def ajson_completion(self, messages, model, **kwargs):
+        """
+        Async variant of json_completion. Subclasses should override this with a native
+        async implementation; by default the blocking call runs in a worker thread.
+        """
+        return await asyncio.to_thread(
+            self.json_completion, messages=messages, model=model, **kwargs
+        )
+
+    @property
+    def supports_batch(self) -> bool:
+        """
+        Whether the service can run chat completions as an offline batch job
+        (see `submit_batch`).
+        """
+        return False
+
+    def submit_batch(self, requests: List[dict], path: str) -> str:
+        """
+        Submits a batch job of JSON chat completions, and returns its id.
+        Each request is a dict with a `custom_id`, `model`, `messages` and
+        `temperature`. `path` is a file the service may write the job to.
+        """
+        raise NotImplementedError
+
+    def batch_status(self, batch_id: str) -> str:
+        """
+        Returns the status of a batch job: "in_progress", "completed" or "failed".
+        """
+        raise NotImplementedError
+
+    def batch_results(self, batch_id: str) -> Dict[str, Optional[dict]]:
+        """
+        Returns the responses of a completed batch job by custom id, in the format
+        of `json_completion`, or None for requests that failed.
+        """
+        raise NotImplementedError
+
+    def _embed_chunk(self, texts: List[str], model: Optional[str]) -> List[list]:
+        """
+        Embeds the texts of one request. By default, each text is embedded
+        with its own `embeddings` call.
+        """
+        if model is None:
+            return [self.embeddings(text) for text in texts]
+        return [self.embeddings(text, model) for text in texts]
+
+    def _pack_embedding_inputs(self, texts: List[str]) -> List[List[str]]:
+        """Packs texts into chunks that fit in one embeddings request."""
+        chunks: List[List[str]] = []
+        chunk: List[str] = []
+        chunk_tokens = 0
+        for text in texts:
+            # A conservative estimate of ~3 characters per token
+            tokens = len(text) // 3 + 1
+            if chunk and (
+                len(chunk) >= self.EMBEDDINGS_MAX_INPUTS
+                or (
+                    self.EMBEDDINGS_MAX_TOKENS is not None
+                    and chunk_tokens + tokens > self.EMBEDDINGS_MAX_TOKENS
+                )
+            ):
+                chunks.append(chunk)
+                chunk, chunk_tokens = [], 0
+            chunk.append(text)
+            chunk_tokens += tokens
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def embeddings_batch(
+        self, texts: List[str], model: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Embeds many texts, and returns their vectors as rows of a float32 matrix.
+
+        Texts are packed up to the provider's per-request limits, and the requests
+        run concurrently. If an `EmbeddingCache` is enabled, only texts that are not
+        cached are embedded, and their vectors are added to the cache.
+        """
+        model = model or self.DEFAULT_EMBEDDING_MODEL
+        texts = list(texts)
+        cache = EmbeddingCache.get_cache()
+        vectors = (
+            cache.get_many(model, texts) if cache is not None else [None] * len(texts)
+        )
+        missing = list(
+            dict.fromkeys(
+                text for text, vector in zip(texts, vectors) if vector is None
+            )
+        )
+        if missing:
+            chunks = self._pack_embedding_inputs(missing)
+            with ThreadPoolExecutor(
+                max_workers=min(self.EMBEDDINGS_MAX_WORKERS, len(chunks))
+            ) as executor:
+                embedded = [
+                    vector
+                    for chunk_vectors in executor.map(
+                        lambda chunk: self._embed_chunk(chunk, model), chunks
+                    )
+                    for vector in chunk_vectors
+                ]
+            if cache is not None:
+                cache.put_many(model, missing, embedded)
+            by_text = dict(zip(missing, embedded))
+            vectors = [
+                by_text[text] if vector is None else vector
+                for text, vector in zip(texts, vectors)
+            ]
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.asarray(vectors, dtype=np.float32)
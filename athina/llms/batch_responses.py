@@ -0,0 +1,66 @@
+import contextvars
+import copy
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from athina.cache.eval_cache import EvalCache
+from athina.helpers.run_stats import EvalTrace
+
+
+class BatchResponses:
+    """
+    Judge responses collected from a batch job, keyed by request. While they are
+    active, LLM evaluators use them instead of calling their LLM service.
+    """
+
+    def __init__(self, responses: Dict[str, Optional[dict]]):
+        self.responses = responses
+
+    @staticmethod
+    def request_key(model: str, messages: List[dict], temperature: Any) -> str:
+        return EvalCache.make_key("batch_completion", model, messages, temperature)
+
+    @staticmethod
+    def current() -> Optional["BatchResponses"]:
+        """Returns the batch responses active in the current context, if any."""
+        return _current_batch_responses.get()
+
+    @contextmanager
+    def activate(self) -> Iterator["BatchResponses"]:
+        """
+        Makes the responses available to LLM evaluators in this context, including
+        worker threads and tasks started from it.
+        """
+        token = _current_batch_responses.set(self)
+        try:
+            yield self
+        finally:
+            _current_batch_responses.reset(token)
+
+    @staticmethod
+    def get(model: str, messages: List[dict], temperature: Any) -> Optional[dict]:
+        """
+        Returns a copy of the active batch response to a request, or None if there
+        is none (the request then goes to the LLM service as usual).
+        """
+        batch_responses = _current_batch_responses.get()
+        if batch_responses is None:
+            return None
+        response = batch_responses.responses.get(
+            BatchResponses.request_key(model, messages, temperature)
+        )
+        if response is None:
+            return None
+        metadata = response.get("metadata") or {}
+        usage = metadata.get("usage") or {}
+        EvalTrace.record_llm_call(
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            cost_usd=(metadata.get("cost") or {}).get("total_cost_usd_dollar") or 0.0,
+            provider_seconds=0.0,
+        )
+        return copy.deepcopy(response)
+
+
+_current_batch_responses: contextvars.ContextVar[Optional[BatchResponses]] = (
+    contextvars.ContextVar("athina_batch_responses", default=None)
+)
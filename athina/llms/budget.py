@@ -0,0 +1,202 @@
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from litellm import cost_per_token
+from athina.errors.exceptions import BudgetExhaustedException
+from .rate_limiter import RateLimiter
+
+# A reservation of (cost in USD, tokens)
+Reservation = Tuple[float, int]
+
+
+class Budget:
+    """
+    A spending limit for an eval run, in USD and/or tokens, shared by every
+    LLM call made while the budget is active (see `activate()`).
+
+    Before each call, the estimated cost of the call (from its prompt tokens and
+    expected completion tokens) is reserved; once the call completes, the
+    reservation is replaced by the actual cost. If a call does not fit in the
+    budget, it is made with `fallback_model` instead when one is set. Otherwise
+    the budget is marked exhausted and the call raises BudgetExhaustedException.
+
+    The ledger is guarded by a lock that is never held across an await, so it is
+    safe to share between threads and coroutines.
+    """
+
+    # Completion tokens to reserve for calls without max_tokens
+    DEFAULT_COMPLETION_TOKENS = 256
+
+    def __init__(
+        self,
+        max_cost_usd: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        fallback_model: Optional[str] = None,
+    ):
+        if max_cost_usd is None and max_tokens is None:
+            raise ValueError("Budget needs a max_cost_usd or a max_tokens limit")
+        self.max_cost_usd = max_cost_usd
+        self.max_tokens = max_tokens
+        self.fallback_model = fallback_model
+        self.spent_cost_usd = 0.0
+        self.spent_tokens = 0
+        self.calls = 0
+        self.fallback_calls = 0
+        self.rejected_calls = 0
+        self.exhausted = False
+        self._reserved_cost_usd = 0.0
+        self._reserved_tokens = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def current() -> Optional["Budget"]:
+        """Returns the budget active in the current context, if any."""
+        return _current_budget.get()
+
+    @contextmanager
+    def activate(self) -> Iterator["Budget"]:
+        """
+        Makes this the budget for LLM calls made in this context, including
+        worker threads and tasks started from it.
+        """
+        token = _current_budget.set(self)
+        try:
+            yield self
+        finally:
+            _current_budget.reset(token)
+
+    @staticmethod
+    def estimate(
+        model: str, messages: List[dict], max_tokens: Optional[int] = None
+    ) -> Reservation:
+        """
+        Estimates the cost and tokens of a chat completion before making it.
+        The cost is 0 for models that litellm has no pricing for.
+        """
+        prompt_tokens = RateLimiter.estimate_tokens(messages, model)
+        completion_tokens = max_tokens or Budget.DEFAULT_COMPLETION_TOKENS
+        try:
+            prompt_cost, completion_cost = cost_per_token(
+                model=model,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+            )
+            cost = prompt_cost + completion_cost
+        except Exception:
+            cost = 0.0
+        return cost, prompt_tokens + completion_tokens
+
+    def _try_reserve(self, reservation: Reservation) -> bool:
+        cost, tokens = reservation
+        with self._lock:
+            if self.exhausted:
+                return False
+            if (
+                self.max_cost_usd is not None
+                and self.spent_cost_usd + self._reserved_cost_usd + cost
+                > self.max_cost_usd
+            ):
+                return False
+            if (
+                self.max_tokens is not None
+                and self.spent_tokens + self._reserved_tokens + tokens
+                > self.max_tokens
+            ):
+                return False
+            self._reserved_cost_usd += cost
+            self._reserved_tokens += tokens
+            self.calls += 1
+            return True
+
+    def reserve(
+        self, model: str, messages: List[dict], max_tokens: Optional[int] = None
+    ) -> Tuple[str, Reservation]:
+        """
+        Reserves the estimated cost of a call. Returns the model to call (the
+        fallback model if the call only fits with it) and the reservation.
+
+        Raises BudgetExhaustedException if the call doesn't fit in the budget.
+        """
+        reservation = Budget.estimate(model, messages, max_tokens)
+        if self._try_reserve(reservation):
+            return model, reservation
+        if self.fallback_model is not None and self.fallback_model != model:
+            reservation = Budget.estimate(self.fallback_model, messages, max_tokens)
+            if self._try_reserve(reservation):
+                with self._lock:
+                    self.fallback_calls += 1
+                return self.fallback_model, reservation
+        with self._lock:
+            self.exhausted = True
+            self.rejected_calls += 1
+        raise BudgetExhaustedException(
+            f"Budget exhausted: spent ${self.spent_cost_usd:.4f} and {self.spent_tokens} tokens"
+        )
+
+    def settle(
+        self,
+        reservation: Reservation,
+        actual_cost_usd: Optional[float],
+        actual_tokens: Optional[int],
+    ):
+        """
+        Replaces a reservation with the actual cost of the call. When the actual
+        cost is unknown, the estimate is kept.
+        """
+        cost, tokens = reservation
+        with self._lock:
+            self._reserved_cost_usd -= cost
+            self._reserved_tokens -= tokens
+            self.spent_cost_usd += cost if actual_cost_usd is None else actual_cost_usd
+            self.spent_tokens += tokens if actual_tokens is None else actual_tokens
+
+    def release(self, reservation: Reservation):
+        """Releases the reservation of a call that failed."""
+        cost, tokens = reservation
+        with self._lock:
+            self._reserved_cost_usd -= cost
+            self._reserved_tokens -= tokens
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                "max_cost_usd": self.max_cost_usd,
+                "max_tokens": self.max_tokens,
+                "spent_cost_usd": round(self.spent_cost_usd, 6),
+                "spent_tokens": self.spent_tokens,
+                "calls": self.calls,
+                "fallback_calls": self.fallback_calls,
+                "rejected_calls": self.rejected_calls,
+                "exhausted": self.exhausted,
+            }
+
+    @staticmethod
+    def exhausted_result(evaluator, entry: dict) -> dict:
+        """
+        The result recorded for a row that was not evaluated because the budget ran out.
+        """
+        eval_result = {
+            "name": evaluator.name,
+            "display_name": evaluator.display_name,
+            "data": entry,
+            "reason": "Budget exhausted",
+            "runtime": 0,
+            "model": getattr(evaluator, "_model", None),
+            "metrics": [],
+            "metadata": {"budget_exhausted": True},
+        }
+        return {k: v for k, v in eval_result.items() if v is not None}
+
+    @staticmethod
+    def is_exhausted_result(eval_result: Optional[dict]) -> bool:
+        return bool(
+            eval_result
+            and isinstance(eval_result.get("metadata"), dict)
+            and eval_result["metadata"].get("budget_exhausted")
+        )
+
+
+_current_budget: contextvars.ContextVar[Optional[Budget]] = contextvars.ContextVar(
+    "athina_budget", default=None
+)
@@ -0,0 +1,109 @@
+import json
+import time
+from typing import Dict, List, Optional
+from athina.helpers.run_stats import EvalTrace, LatencySummary
+
+
+class ChatStream:
+    """
+    Assembles a streamed chat completion in the OpenAI format, which litellm also
+    uses, into the JSON chunks of `OpenAiService.chat_stream_completion`.
+
+    Create it just before the request is sent, so latencies include the wait
+    for the first token.
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.end_time: Optional[float] = None
+        self.first_token_time: Optional[float] = None
+        self.last_token_time: Optional[float] = None
+        self.inter_token_ms = LatencySummary()
+        self.finish_reason: Optional[str] = None
+        self.usage = None
+        self.tool_calls: Dict[int, Dict[str, str]] = {}
+
+    def add(self, chunk) -> List[str]:
+        """Reads a chunk of the stream, and returns the JSON chunks to yield."""
+        if getattr(chunk, "usage", None) is not None:
+            # Usage is sent in an extra chunk at the end of the stream
+            self.usage = chunk.usage
+        if not chunk.choices:
+            return []
+        choice = chunk.choices[0]
+        self.finish_reason = choice.finish_reason or self.finish_reason
+        delta = choice.delta
+        if delta is None or not (delta.content or delta.tool_calls):
+            return []
+        now = time.perf_counter()
+        if self.first_token_time is None:
+            self.first_token_time = now
+        else:
+            self.inter_token_ms.add((now - self.last_token_time) * 1000)
+        self.last_token_time = now
+        outputs = []
+        if delta.content:
+            outputs.append(json.dumps({"current_response": delta.content}))
+        for tool_call in delta.tool_calls or []:
+            fragment = {
+                "index": tool_call.index,
+                "id": tool_call.id,
+                "name": tool_call.function.name if tool_call.function else None,
+                "arguments": (
+                    tool_call.function.arguments if tool_call.function else None
+                ),
+            }
+            call = self.tool_calls.setdefault(
+                tool_call.index, {"name": "", "arguments": ""}
+            )
+            call["name"] += fragment["name"] or ""
+            call["arguments"] += fragment["arguments"] or ""
+            outputs.append(json.dumps({"tool_call_delta": fragment}))
+        return outputs
+
+    def finish(self):
+        """Marks the end of the stream."""
+        self.end_time = time.perf_counter()
+
+    @property
+    def total_tokens(self) -> Optional[int]:
+        return self.usage.total_tokens if self.usage else None
+
+    def final_chunk(self, cost_usd: Optional[float]) -> str:
+        """
+        Records the call to the EvalTrace, and returns the final JSON chunk.
+        """
+        usage = self.usage
+        EvalTrace.record_llm_call(
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            cost_usd=cost_usd or 0.0,
+            provider_seconds=self.end_time - self.start_time,
+        )
+        return json.dumps(
+            {
+                "usage": (
+                    {
+                        "prompt_tokens": usage.prompt_tokens,
+                        "completion_tokens": usage.completion_tokens,
+                        "total_tokens": usage.total_tokens,
+                    }
+                    if usage
+                    else {}
+                ),
+                "cost": {"total_cost_usd_dollar": cost_usd},
+                "finish_reason": self.finish_reason,
+                "tool_calls": [
+                    self.tool_calls[index] for index in sorted(self.tool_calls)
+                ],
+                "latency": {
+                    "ttft_ms": (
+                        (self.first_token_time - self.start_time) * 1000
+                        if self.first_token_time is not None
+                        else None
+                    ),
+                    "inter_token_ms": self.inter_token_ms.summary(),
+                    "total_ms": (self.end_time - self.start_time) * 1000,
+                },
+            }
+        )
@@ -0,0 +1,177 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, Callable, Dict, Optional, Tuple
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+try:
+    import h2  # noqa: F401
+
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+
+class ClientRegistry:
+    """
+    A process-wide registry of long-lived API clients, keyed by provider,
+    credentials and base URL, so that every LLM service, step and evaluator
+    reuses the same warm connections instead of opening new ones.
+
+    All clients share one connection pool (one per event loop for async clients),
+    with limits that can be tuned once, e.g.
+    `ClientRegistry.configure(max_connections=200, http2=True)`.
+    HTTP/2 is used by default when the `h2` package is installed.
+    """
+
+    DEFAULT_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+
+    _settings: Dict[str, Any] = {
+        "max_connections": 1000,
+        "max_keepalive_connections": 100,
+        "keepalive_expiry": 30.0,
+        "http2": HAS_H2,
+        "timeout": DEFAULT_TIMEOUT,
+    }
+    _http_client: Optional[httpx.Client] = None
+    _owned_http_clients: "weakref.WeakSet" = weakref.WeakSet()
+    _clients: Dict[Tuple, Any] = {}
+    # Async connections can't be shared across event loops, so async clients
+    # are kept per loop
+    _async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _lock = threading.RLock()
+
+    @classmethod
+    def configure(
+        cls,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Sets the connection pool limits. Existing clients are closed, and are
+        recreated with the new limits on next use.
+        """
+        if http2 and not HAS_H2:
+            raise ImportError(
+                "The h2 package is required for HTTP/2. "
+                "Install it with `pip install httpx[http2]`."
+            )
+        settings = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "keepalive_expiry": keepalive_expiry,
+            "http2": http2,
+            "timeout": httpx.Timeout(timeout, connect=5.0) if timeout else None,
+        }
+        with cls._lock:
+            cls._settings.update(
+                {key: value for key, value in settings.items() if value is not None}
+            )
+        cls.reset()
+
+    @classmethod
+    def reset(cls):
+        """Closes all pooled connections and forgets all clients."""
+        with cls._lock:
+            http_client = cls._http_client
+            cls._http_client = None
+            cls._clients = {}
+            cls._async_clients = weakref.WeakKeyDictionary()
+        if http_client is not None:
+            http_client.close()
+
+    @classmethod
+    def _client_options(cls) -> Dict[str, Any]:
+        return {
+            "limits": httpx.Limits(
+                max_connections=cls._settings["max_connections"],
+                max_keepalive_connections=cls._settings["max_keepalive_connections"],
+                keepalive_expiry=cls._settings["keepalive_expiry"],
+            ),
+            "http2": cls._settings["http2"],
+            "timeout": cls._settings["timeout"],
+            "follow_redirects": True,
+        }
+
+    @classmethod
+    def http_client(cls) -> httpx.Client:
+        """Returns the shared HTTP client."""
+        with cls._lock:
+            if cls._http_client is None:
+                cls._http_client = httpx.Client(**cls._client_options())
+                cls._owned_http_clients.add(cls._http_client)
+            return cls._http_client
+
+    @classmethod
+    def owns(cls, http_client: Any) -> bool:
+        """
+        Whether an HTTP client was created by the registry, including clients
+        that were closed by `reset()`.
+        """
+        return http_client in cls._owned_http_clients
+
+    @staticmethod
+    def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+    @classmethod
+    def _get(cls, key: Tuple, create: Callable[[], Any]) -> Any:
+        """
+        Returns the client for a key, creating it on first use. Async clients
+        are kept per running event loop.
+        """
+        async_client = key[0].startswith("async_")
+        loop = cls._running_loop() if async_client else None
+        if async_client and loop is None:
+            # Not in an event loop: a client for whichever loop uses it
+            return create()
+        with cls._lock:
+            if loop is None:
+                clients = cls._clients
+            else:
+                clients = cls._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = clients[key] = create()
+            return client
+
+    @classmethod
+    def async_http_client(cls) -> httpx.AsyncClient:
+        """Returns the shared async HTTP client of the running event loop."""
+        return cls._get(
+            ("async_http",), lambda: httpx.AsyncClient(**cls._client_options())
+        )
+
+    @classmethod
+    def openai(cls, api_key: str, base_url: Optional[str] = None) -> OpenAI:
+        """Returns the shared OpenAI client for an API key and base URL."""
+        return cls._get(
+            ("openai", api_key, base_url),
+            lambda: OpenAI(
+                api_key=api_key, base_url=base_url, http_client=cls.http_client()
+            ),
+        )
+
+    @classmethod
+    def async_openai(
+        cls, api_key: str, base_url: Optional[str] = None
+    ) -> AsyncOpenAI:
+        """
+        Returns the shared async OpenAI client for an API key and base URL,
+        in the running event loop.
+        """
+        return cls._get(
+            ("async_openai", api_key, base_url),
+            lambda: AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=cls.async_http_client(),
+            ),
+        )
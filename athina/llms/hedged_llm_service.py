@@ -0,0 +1,228 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Deque, Dict, Optional
+from .abstract_llm_service import AbstractLlmService
+
+
+class HedgedLlmService(AbstractLlmService):
+    """
+    Wraps an LLM service to cut the tail latency of judge calls with hedged
+    requests.
+
+    If a `json_completion` has not returned after the `percentile` of the recent
+    latency of its model, a duplicate request is sent to `hedge_llm_service`
+    (the wrapped service itself by default) and whichever returns first is used.
+    With a LitellmService backed by a router, the duplicate goes to another
+    deployment of the model, since the router accounts for the call in flight.
+
+    Hedging starts once `min_samples` calls of a model have completed, and at
+    most `max_hedge_rate` of calls are hedged, so the extra spend stays bounded.
+    The async variant cancels the losing request. A blocking call can't be
+    interrupted, so the sync variant lets the loser finish in the background
+    and discards its response.
+
+    Other calls are passed through to the wrapped service.
+    """
+
+    def __init__(
+        self,
+        llm_service: AbstractLlmService,
+        hedge_llm_service: Optional[AbstractLlmService] = None,
+        percentile: float = 95,
+        max_hedge_rate: float = 0.05,
+        min_samples: int = 20,
+        window: int = 500,
+        max_workers: int = 32,
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError(f"percentile must be between 0 and 100, got {percentile}")
+        if not 0 <= max_hedge_rate <= 1:
+            raise ValueError(
+                f"max_hedge_rate must be between 0 and 1, got {max_hedge_rate}"
+            )
+        self.llm_service = llm_service
+        self.hedge_llm_service = hedge_llm_service or llm_service
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = min_samples
+        self.window = window
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        # Latencies of the most recent calls, by model
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="athina-hedge"
+        )
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """
+        Seconds to wait for a call to a model before hedging it, or None until
+        enough of its calls have completed.
+        """
+        with self._lock:
+            latencies = self._latencies.get(model)
+            if latencies is None or len(latencies) < self.min_samples:
+                return None
+            samples = sorted(latencies)
+        index = min(len(samples) - 1, int(self.percentile / 100 * len(samples)))
+        return samples[index]
+
+    def _record_latency(self, model: str, seconds: float):
+        with self._lock:
+            latencies = self._latencies.get(model)
+            if latencies is None:
+                latencies = self._latencies[model] = deque(maxlen=self.window)
+            latencies.append(seconds)
+
+    def _start_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def _try_hedge(self) -> bool:
+        """Counts a hedge, unless it would exceed the hedge rate."""
+        with self._lock:
+            if self.hedges + 1 > self.max_hedge_rate * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def _record_hedge_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedge_rate": self.hedges / self.requests if self.requests else 0.0,
+            }
+
+    def _timed_json_completion(self, llm_service, messages, model, **kwargs):
+        start_time = time.perf_counter()
+        response = llm_service.json_completion(messages, model, **kwargs)
+        self._record_latency(model, time.perf_counter() - start_time)
+        return response
+
+    def _submit(self, llm_service, messages, model, **kwargs):
+        # Each request runs in a copy of the caller's context, so the active
+        # Budget and EvalTrace apply to it
+        context = contextvars.copy_context()
+        return self._executor.submit(
+            context.run,
+            self._timed_json_completion,
+            llm_service,
+            messages,
+            model,
+            **kwargs,
+        )
+
+    def json_completion(self, messages, model, **kwargs):
+        self._start_request()
+        delay = self.hedge_delay(model)
+        if delay is None:
+            return self._timed_json_completion(
+                self.llm_service, messages, model, **kwargs
+            )
+        primary = self._submit(self.llm_service, messages, model, **kwargs)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._try_hedge():
+            return primary.result()
+        hedge = self._submit(self.hedge_llm_service, messages, model, **kwargs)
+        pending = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None or not pending:
+                    if future is hedge and future.exception() is None:
+                        self._record_hedge_win()
+                    for loser in pending:
+                        loser.cancel()
+                    return future.result()
+
+    async def _atimed_json_completion(self, llm_service, messages, model, **kwargs):
+        start_time = time.perf_counter()
+        response = await llm_service.ajson_completion(messages, model, **kwargs)
+        self._record_latency(model, time.perf_counter() - start_time)
+        return response
+
+    async def ajson_completion(self, messages, model, **kwargs):
+        self._start_request()
+        delay = self.hedge_delay(model)
+        if delay is None:
+            return await self._atimed_json_completion(
+                self.llm_service, messages, model, **kwargs
+            )
+        primary = asyncio.ensure_future(
+            self._atimed_json_completion(self.llm_service, messages, model, **kwargs)
+        )
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done or not self._try_hedge():
+                return await primary
+            hedge = asyncio.ensure_future(
+                self._atimed_json_completion(
+                    self.hedge_llm_service, messages, model, **kwargs
+                )
+            )
+            pending = {primary, hedge}
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None or not pending:
+                        if task is hedge and task.exception() is None:
+                            self._record_hedge_win()
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def close(self):
+        """Stops the worker threads, once the requests in flight have finished."""
+        self._executor.shutdown(wait=False)
+
+    def embeddings(self, text: str, model: Optional[str] = None) -> list:
+        if model is None:
+            return self.llm_service.embeddings(text)
+        return self.llm_service.embeddings(text, model)
+
+    def embeddings_batch(self, texts, model: Optional[str] = None):
+        return self.llm_service.embeddings_batch(texts, model)
+
+    def chat_completion(self, messages, model, **kwargs):
+        return self.llm_service.chat_completion(messages, model, **kwargs)
+
+    def chat_completion_json(self, messages, model, **kwargs):
+        return self.llm_service.chat_completion_json(messages, model, **kwargs)
+
+    async def achat_completion(self, messages, model, **kwargs):
+        return await self.llm_service.achat_completion(messages, model, **kwargs)
+
+    async def chat_stream_completion(self, messages, model, **kwargs):
+        async for chunk in self.llm_service.chat_stream_completion(
+            messages, model, **kwargs
+        ):
+            yield chunk
+
+    @property
+    def supports_batch(self) -> bool:
+        return self.llm_service.supports_batch
+
+    def submit_batch(self, requests, path: str) -> str:
+        return self.llm_service.submit_batch(requests, path)
+
+    def batch_status(self, batch_id: str) -> str:
+        return self.llm_service.batch_status(batch_id)
+
+    def batch_results(self, batch_id: str):
+        return self.llm_service.batch_results(batch_id)
@@ -0,0 +1,177 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from .rate_limiter import RateLimiter
+
+# Weight of the latest call in the moving average of a deployment's latency
+LATENCY_SMOOTHING = 0.2
+# Seconds a deployment is skipped after a failed call
+FAILURE_COOLDOWN_SECONDS = 30.0
+# Floor on headroom, so a deployment close to its limits still gets a share
+MIN_HEADROOM = 0.05
+
+
+@dataclass
+class Deployment:
+    """
+    A deployment serving a model, e.g. `gpt-4o` on an Azure resource.
+
+    `model` is the name callers use, and `litellm_model` the name litellm calls
+    the deployment by (e.g. "azure/my-gpt-4o"). `params` are passed to litellm
+    with every call to the deployment (e.g. api_key, api_base, api_version).
+    """
+
+    model: str
+    litellm_model: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+
+    # Observed state, updated by the router
+    latency_seconds: Optional[float] = None
+    in_flight: int = 0
+    # Fraction of the provider's rate limits left, from its response headers
+    reported_headroom: Optional[float] = None
+    cooldown_until: float = 0.0
+    limiter: Optional[RateLimiter] = None
+
+    def __post_init__(self):
+        if self.requests_per_minute or self.tokens_per_minute:
+            self.limiter = RateLimiter(
+                self.requests_per_minute, self.tokens_per_minute
+            )
+
+    def headroom(self) -> float:
+        """Fraction of the deployment's rate limits left, from 0 to 1."""
+        headroom = 1.0
+        if self.limiter is not None:
+            headroom = min(headroom, self.limiter.headroom())
+        if self.reported_headroom is not None:
+            headroom = min(headroom, self.reported_headroom)
+        return max(headroom, MIN_HEADROOM)
+
+
+class LitellmRouter:
+    """
+    Load-balances calls to a model across several deployments of it, for use
+    with `LitellmService(router=...)`.
+
+    Each call goes to the deployment with the lowest expected wait: its moving
+    average latency, scaled up by the calls it already has in flight, divided by
+    the headroom left under its rate limits. Headroom is taken from the
+    deployment's configured limits and from the rate-limit headers its provider
+    returns. Deployments that have not been called yet are tried first, and a
+    deployment whose call fails is skipped for FAILURE_COOLDOWN_SECONDS.
+
+    Models without deployments are called directly by litellm.
+    """
+
+    def __init__(self, deployments: List[Deployment]):
+        self._lock = threading.Lock()
+        self._deployments: Dict[str, List[Deployment]] = {}
+        for deployment in deployments:
+            self._deployments.setdefault(deployment.model, []).append(deployment)
+
+    def has_model(self, model: str) -> bool:
+        return model in self._deployments
+
+    def deployments(self, model: str) -> List[Deployment]:
+        return list(self._deployments.get(model, []))
+
+    @staticmethod
+    def _score(deployment: Deployment) -> float:
+        if deployment.latency_seconds is None:
+            return deployment.in_flight * 1e-3
+        return (
+            deployment.latency_seconds
+            * (1 + deployment.in_flight)
+            / deployment.headroom()
+        )
+
+    def acquire(self, model: str) -> Deployment:
+        """
+        Picks the deployment for a call to a model, and counts the call as in
+        flight until it is released. If every deployment is cooling down after a
+        failure, the one that recovers first is picked.
+        """
+        with self._lock:
+            deployments = self._deployments[model]
+            now = time.monotonic()
+            available = [d for d in deployments if d.cooldown_until <= now]
+            if available:
+                deployment = min(available, key=self._score)
+            else:
+                deployment = min(deployments, key=lambda d: d.cooldown_until)
+            deployment.in_flight += 1
+            return deployment
+
+    def release(
+        self,
+        deployment: Deployment,
+        latency_seconds: Optional[float] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        failed: bool = False,
+    ):
+        """Records the outcome of a call to a deployment."""
+        with self._lock:
+            deployment.in_flight = max(0, deployment.in_flight - 1)
+            if failed:
+                deployment.cooldown_until = time.monotonic() + FAILURE_COOLDOWN_SECONDS
+                return
+            if latency_seconds is not None:
+                if deployment.latency_seconds is None:
+                    deployment.latency_seconds = latency_seconds
+                else:
+                    deployment.latency_seconds += LATENCY_SMOOTHING * (
+                        latency_seconds - deployment.latency_seconds
+                    )
+            reported_headroom = self._headroom_from_headers(headers or {})
+            if reported_headroom is not None:
+                deployment.reported_headroom = reported_headroom
+
+    @staticmethod
+    def _headroom_from_headers(headers: Dict[str, Any]) -> Optional[float]:
+        """
+        Returns the fraction of the rate limits left, from `x-ratelimit-*`
+        response headers (litellm may prefix them with the provider's name).
+        """
+        values = {}
+        for name, value in headers.items():
+            name = str(name).lower()
+            for header in (
+                "x-ratelimit-remaining-requests",
+                "x-ratelimit-limit-requests",
+                "x-ratelimit-remaining-tokens",
+                "x-ratelimit-limit-tokens",
+            ):
+                if name.endswith(header):
+                    try:
+                        values[header] = float(value)
+                    except (TypeError, ValueError):
+                        pass
+        headroom = None
+        for kind in ("requests", "tokens"):
+            remaining = values.get(f"x-ratelimit-remaining-{kind}")
+            limit = values.get(f"x-ratelimit-limit-{kind}")
+            if remaining is not None and limit:
+                fraction = remaining / limit
+                headroom = fraction if headroom is None else min(headroom, fraction)
+        return headroom
+
+    def summary(self) -> Dict[str, List[Dict]]:
+        """Observed latency, load and headroom of each deployment, by model."""
+        with self._lock:
+            return {
+                model: [
+                    {
+                        "litellm_model": d.litellm_model,
+                        "latency_seconds": d.latency_seconds,
+                        "in_flight": d.in_flight,
+                        "headroom": d.headroom(),
+                        "cooling_down": d.cooldown_until > time.monotonic(),
+                    }
+                    for d in deployments
+                ]
+                for model, deployments in self._deployments.items()
+            }
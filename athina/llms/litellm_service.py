@@ -1,25 +1,72 @@
+import asyncio
+import threading
+import time
 import litellm
 from retrying import retry
 from timeout_decorator import timeout
 from athina.helpers.json import JsonHelper
+from athina.helpers.run_stats import EvalTrace
 from athina.keys import OpenAiApiKey
 from athina.interfaces.model import Model
-from athina.errors.exceptions import NoOpenAiApiKeyException
+from athina.errors.exceptions import (
+    BudgetExhaustedException,
+    NoOpenAiApiKeyException,
+)
 from .abstract_llm_service import AbstractLlmService
-from typing import List, Dict, Any, Optional, Union, cast
+from .budget import Budget
+from .chat_stream import ChatStream
+from .client_registry import ClientRegistry
+from .litellm_router import Deployment, LitellmRouter
+from .openai_service import OpenAiService
+from .rate_limiter import RateLimiter
+from typing import List, Dict, Any, Optional, Tuple, Union, cast
+
+DEFAULT_TEMPERATURE = 0.0
+RATE_LIMITER_PROVIDER = "litellm"
+RETRY_ATTEMPTS = 3
+RETRY_WAIT_MS = 2000
 
 
 class LitellmService(AbstractLlmService):
-    _instance = None
+    """
+    An LLM service for any provider supported by litellm (Azure, Bedrock,
+    Anthropic, OpenAI-compatible servers, ...).
+
+    Responses have the same format and usage/cost metadata as OpenAiService, and
+    calls go through the active Budget and the "litellm" RateLimiter. With a
+    LitellmRouter, calls to a model are load-balanced across its deployments.
+    """
+
+    # One instance per API key and router, so that services with different keys
+    # don't overwrite each other's key
+    _instances: Dict[
+        Tuple[Optional[str], Optional[LitellmRouter]], "LitellmService"
+    ] = {}
+    _instances_lock = threading.Lock()
     _api_key = None
+    router: Optional[LitellmRouter] = None
 
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super(LitellmService, cls).__new__(cls)
-        return cls._instance
+    def __new__(cls, api_key=None, router=None, *args, **kwargs):
+        with cls._instances_lock:
+            key = (api_key, router)
+            if key not in cls._instances:
+                cls._instances[key] = super(LitellmService, cls).__new__(cls)
+            return cls._instances[key]
 
-    def __init__(self, api_key):
+    def __init__(self, api_key=None, router: Optional[LitellmRouter] = None):
         self._api_key = api_key
+        self.router = router
+
+    @staticmethod
+    def _share_http_client():
+        """
+        Has litellm use the pooled HTTP connections shared by the LLM services,
+        unless it was given a client session of its own.
+        """
+        if litellm.client_session is None or ClientRegistry.owns(
+            litellm.client_session
+        ):
+            litellm.client_session = ClientRegistry.http_client()
 
     def embeddings(self, text: str) -> list:
         """
@@ -27,7 +74,178 @@ class LitellmService(AbstractLlmService):
         """
         raise NotImplementedError
 
-    @retry(stop_max_attempt_number=3, wait_fixed=2000)
+    def _deployment(self, model: str) -> Optional[Deployment]:
+        """Picks the router's deployment for a call to a model, if it has any."""
+        if self.router is not None and self.router.has_model(model):
+            return self.router.acquire(model)
+        return None
+
+    def _call_kwargs(
+        self, deployment: Optional[Deployment], model, messages, kwargs
+    ) -> dict:
+        """Returns the arguments of the litellm call to a deployment or model."""
+        if deployment is None:
+            return {
+                "api_key": self._api_key,
+                "model": model,
+                "messages": messages,
+                **kwargs,
+            }
+        return {
+            **deployment.params,
+            "model": deployment.litellm_model,
+            "messages": messages,
+            **kwargs,
+        }
+
+    def _rate_limiters(
+        self, deployment: Optional[Deployment], model: str
+    ) -> List[RateLimiter]:
+        rate_limiters = [RateLimiter.get(RATE_LIMITER_PROVIDER, model)]
+        if deployment is not None:
+            rate_limiters.append(deployment.limiter)
+        return [rate_limiter for rate_limiter in rate_limiters if rate_limiter]
+
+    def _finish_call(
+        self,
+        deployment: Optional[Deployment],
+        rate_limiters: List[RateLimiter],
+        estimated_tokens: int,
+        response,
+        start_time: float,
+    ):
+        """Reports a completed call to the router and rate limiters."""
+        total_tokens = response.usage.total_tokens if response.usage else None
+        for rate_limiter in rate_limiters:
+            rate_limiter.reconcile(estimated_tokens, total_tokens)
+        if deployment is not None:
+            hidden_params = getattr(response, "_hidden_params", None) or {}
+            self.router.release(
+                deployment,
+                latency_seconds=time.time() - start_time,
+                headers=hidden_params.get("additional_headers"),
+            )
+
+    def _completion(self, model, messages, **kwargs) -> dict:
+        """
+        Makes one litellm call, and returns its value and metadata in the format
+        of OpenAiService. If a Budget is active, the estimated cost is reserved first.
+        """
+        self._share_http_client()
+        budget = Budget.current()
+        reservation = None
+        if budget is not None:
+            model, reservation = budget.reserve(
+                model, messages, kwargs.get("max_tokens")
+            )
+        deployment = self._deployment(model)
+        try:
+            rate_limiters = self._rate_limiters(deployment, model)
+            estimated_tokens = 0
+            if rate_limiters:
+                estimated_tokens = RateLimiter.estimate_tokens(
+                    messages, model, kwargs.get("max_tokens")
+                )
+                for rate_limiter in rate_limiters:
+                    rate_limiter.acquire(estimated_tokens)
+            EvalTrace.record_attempt()
+            start_time = time.time()
+            response = litellm.completion(
+                **self._call_kwargs(deployment, model, messages, kwargs)
+            )
+        except Exception:
+            if reservation is not None:
+                budget.release(reservation)
+            if deployment is not None:
+                self.router.release(deployment, failed=True)
+            raise
+        self._finish_call(
+            deployment, rate_limiters, estimated_tokens, response, start_time
+        )
+        cost_model = deployment.litellm_model if deployment is not None else model
+        if reservation is not None:
+            OpenAiService._settle_budget(
+                budget, reservation, response.usage, cost_model
+            )
+        return OpenAiService._process_response(response, start_time, cost_model)
+
+    async def _acompletion(self, model, messages, **kwargs) -> dict:
+        """
+        Async variant of _completion, with retries.
+        """
+        self._share_http_client()
+        budget = Budget.current()
+        for attempt in range(RETRY_ATTEMPTS):
+            reservation = None
+            deployment = None
+            call_model = model
+            try:
+                if budget is not None:
+                    call_model, reservation = budget.reserve(
+                        model, messages, kwargs.get("max_tokens")
+                    )
+                deployment = self._deployment(call_model)
+                rate_limiters = self._rate_limiters(deployment, call_model)
+                estimated_tokens = 0
+                if rate_limiters:
+                    estimated_tokens = RateLimiter.estimate_tokens(
+                        messages, call_model, kwargs.get("max_tokens")
+                    )
+                    for rate_limiter in rate_limiters:
+                        await rate_limiter.aacquire(estimated_tokens)
+                EvalTrace.record_attempt()
+                start_time = time.time()
+                response = await litellm.acompletion(
+                    **self._call_kwargs(deployment, call_model, messages, kwargs)
+                )
+                self._finish_call(
+                    deployment, rate_limiters, estimated_tokens, response, start_time
+                )
+                cost_model = (
+                    deployment.litellm_model if deployment is not None else call_model
+                )
+                deployment = None
+                if reservation is not None:
+                    OpenAiService._settle_budget(
+                        budget, reservation, response.usage, cost_model
+                    )
+                    reservation = None
+                return OpenAiService._process_response(
+                    response, start_time, cost_model
+                )
+            except BudgetExhaustedException:
+                raise
+            except Exception:
+                if reservation is not None:
+                    budget.release(reservation)
+                if deployment is not None:
+                    self.router.release(deployment, failed=True)
+                if attempt == RETRY_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(RETRY_WAIT_MS / 1000)
+
+    def _supports_json_mode(self, model: str) -> bool:
+        """
+        Whether the model, or every deployment of it, supports JSON mode.
+        """
+        if self.router is not None and self.router.has_model(model):
+            return all(
+                self._supports_json_mode(deployment.litellm_model)
+                for deployment in self.router.deployments(model)
+            )
+        if Model.supports_json_mode(model):
+            return True
+        try:
+            supported_params = litellm.get_supported_openai_params(model=model)
+        except Exception:
+            return False
+        return "response_format" in (supported_params or [])
+
+    @retry(
+        stop_max_attempt_number=RETRY_ATTEMPTS,
+        wait_fixed=RETRY_WAIT_MS,
+        retry_on_exception=lambda e: not isinstance(e, BudgetExhaustedException),
+    )
     def chat_completion(
         self, messages: List[Dict[str, str]], model: str, **kwargs
     ) -> str:
@@ -35,53 +253,159 @@ class LitellmService(AbstractLlmService):
         Fetches response from Litellm's Completion API.
         """
         try:
-            response = litellm.completion(
-                api_key=self._api_key, model=model, messages=messages, **kwargs
-            )
-            if not response:
-                raise ValueError("Empty response from LLM")
-
-            # Convert response to dict if it's not already
-            if not isinstance(response, dict):
-                response = cast(Dict[str, Any], response.__dict__)
-
-            # Handle different response formats
-            if "choices" in response and response["choices"]:
-                return str(response["choices"][0]["message"]["content"])
-            elif "content" in response:
-                return str(response["content"])
-            else:
-                return str(response)
+            result = self._completion(model=model, messages=messages, **kwargs)
+            return result["value"]
         except Exception as e:
             print(f"Error in ChatCompletion: {e}")
             raise e
 
-    @retry(stop_max_attempt_number=3, wait_fixed=2000)
+    @retry(
+        stop_max_attempt_number=RETRY_ATTEMPTS,
+        wait_fixed=RETRY_WAIT_MS,
+        retry_on_exception=lambda e: not isinstance(e, BudgetExhaustedException),
+    )
     def chat_completion_json(
         self, messages: List[Dict[str, str]], model: str, **kwargs
     ) -> str:
-        raise NotImplementedError
+        """
+        Fetches response from Litellm's Completion API using JSON mode.
+        """
+        try:
+            return self._completion(
+                model=model,
+                messages=messages,
+                response_format={"type": "json_object"},
+                **kwargs,
+            )["value"]
+        except Exception as e:
+            print(f"Error in JSON ChatCompletion: {e}")
+            raise e
+
+    @retry(
+        stop_max_attempt_number=RETRY_ATTEMPTS,
+        wait_fixed=RETRY_WAIT_MS,
+        retry_on_exception=lambda e: not isinstance(e, BudgetExhaustedException),
+    )
+    def _json_completion_result(self, messages, model, **kwargs) -> dict:
+        if self._supports_json_mode(model):
+            kwargs["response_format"] = {"type": "json_object"}
+        return self._completion(model=model, messages=messages, **kwargs)
 
     def json_completion(
         self, messages: List[Dict[str, str]], model: str, **kwargs
+    ) -> dict:
+        """
+        Fetches a JSON object from Litellm's Completion API, using JSON mode if
+        the model supports it, with the call's usage and cost as `metadata`.
+        """
+        if "temperature" not in kwargs:
+            kwargs["temperature"] = DEFAULT_TEMPERATURE
+        try:
+            return OpenAiService._json_response(
+                self._json_completion_result(messages, model, **kwargs)
+            )
+        except Exception as e:
+            print(f"Error in ChatCompletion: {e}")
+            raise e
+
+    async def achat_completion(
+        self, messages: List[Dict[str, str]], model: str, **kwargs
     ) -> str:
-        raise NotImplementedError
+        """
+        Fetches response from Litellm's Completion API without blocking the event loop.
+        """
+        try:
+            result = await self._acompletion(model=model, messages=messages, **kwargs)
+            return result["value"]
+        except Exception as e:
+            print(f"Error in ChatCompletion: {e}")
+            raise e
+
+    async def ajson_completion(
+        self, messages: List[Dict[str, str]], model: str, **kwargs
+    ) -> dict:
+        """
+        Async variant of json_completion.
+        """
+        if "temperature" not in kwargs:
+            kwargs["temperature"] = DEFAULT_TEMPERATURE
+        if self._supports_json_mode(model):
+            kwargs["response_format"] = {"type": "json_object"}
+        try:
+            return OpenAiService._json_response(
+                await self._acompletion(model=model, messages=messages, **kwargs)
+            )
+        except Exception as e:
+            print(f"Error in ChatCompletion: {e}")
+            raise e
 
     async def chat_stream_completion(
         self, messages: List[Dict[str, str]], model: str, **kwargs
     ) -> Any:
         """
-        Fetches a streaming response from Litellm's Completion API.
+        Streams a response from Litellm's Completion API, yielding JSON chunks in
+        the format of OpenAiService.chat_stream_completion.
         """
+        self._share_http_client()
+        kwargs.pop("stream", None)
+        kwargs["stream_options"] = {
+            **(kwargs.get("stream_options") or {}),
+            "include_usage": True,
+        }
+        budget = Budget.current()
+        reservation = None
+        if budget is not None:
+            model, reservation = budget.reserve(
+                model, messages, kwargs.get("max_tokens")
+            )
+        deployment = self._deployment(model)
+        chat_stream = None
+        finished = False
+        failed = False
         try:
-            response = litellm.completion(
-                api_key=self._api_key,
-                model=model,
-                messages=messages,
-                stream=True,
-                **kwargs,
+            rate_limiters = self._rate_limiters(deployment, model)
+            estimated_tokens = 0
+            if rate_limiters:
+                estimated_tokens = RateLimiter.estimate_tokens(
+                    messages, model, kwargs.get("max_tokens")
+                )
+                for rate_limiter in rate_limiters:
+                    await rate_limiter.aacquire(estimated_tokens)
+            EvalTrace.record_attempt()
+            chat_stream = ChatStream()
+            stream = await litellm.acompletion(
+                stream=True, **self._call_kwargs(deployment, model, messages, kwargs)
             )
-            return response
+            async for chunk in stream:
+                for output in chat_stream.add(chunk):
+                    yield output
+            chat_stream.finish()
+            finished = True
         except Exception as e:
+            failed = True
             print(f"Error in ChatStreamCompletion: {e}")
             raise e
+        finally:
+            if not finished:
+                # The call failed, or the consumer stopped reading the stream
+                if reservation is not None:
+                    if failed or chat_stream is None:
+                        budget.release(reservation)
+                    else:
+                        # The tokens generated before the stream was closed are billed
+                        budget.settle(reservation, None, None)
+                if deployment is not None:
+                    self.router.release(deployment, failed=failed)
+        for rate_limiter in rate_limiters:
+            rate_limiter.reconcile(estimated_tokens, chat_stream.total_tokens)
+        if deployment is not None:
+            self.router.release(
+                deployment,
+                latency_seconds=chat_stream.end_time - chat_stream.start_time,
+            )
+        cost_model = deployment.litellm_model if deployment is not None else model
+        costs = OpenAiService._token_costs(chat_stream.usage, cost_model)
+        cost_usd = sum(costs) if costs is not None else None
+        if reservation is not None:
+            budget.settle(reservation, cost_usd, chat_stream.total_tokens)
+        yield chat_stream.final_chunk(cost_usd)
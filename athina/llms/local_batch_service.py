@@ -0,0 +1,91 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from .abstract_llm_service import (
+    AbstractLlmService,
+    BATCH_COMPLETED,
+    BATCH_FAILED,
+)
+
+
+class LocalBatchLlmService(AbstractLlmService):
+    """
+    A local stand-in for a provider's batch endpoint: wraps an LLM service and
+    runs batch jobs by calling its `json_completion` for each request, with
+    `max_workers` requests in flight.
+
+    Jobs run to completion when they are submitted, and their responses are
+    written next to the job file, so a collected job can be read again after a
+    restart. Other calls are passed through to the wrapped service.
+    """
+
+    def __init__(self, llm_service: AbstractLlmService, max_workers: int = 10):
+        self.llm_service = llm_service
+        self.max_workers = max_workers
+
+    @property
+    def supports_batch(self) -> bool:
+        return True
+
+    def _complete(self, request: dict) -> Optional[dict]:
+        try:
+            return self.llm_service.json_completion(
+                messages=request["messages"],
+                model=request["model"],
+                temperature=request.get("temperature"),
+            )
+        except Exception as e:
+            print(f"Error in batch request {request['custom_id']}: {e}")
+            return None
+
+    def submit_batch(self, requests: List[dict], path: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            for request in requests:
+                f.write(json.dumps(request) + "\n")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            responses = list(executor.map(self._complete, requests))
+        results_path = path + ".results.jsonl"
+        with open(results_path + ".tmp", "w", encoding="utf-8") as f:
+            for request, response in zip(requests, responses):
+                f.write(
+                    json.dumps({"custom_id": request["custom_id"], "response": response})
+                    + "\n"
+                )
+        os.replace(results_path + ".tmp", results_path)
+        return results_path
+
+    def batch_status(self, batch_id: str) -> str:
+        return BATCH_COMPLETED if os.path.exists(batch_id) else BATCH_FAILED
+
+    def batch_results(self, batch_id: str) -> Dict[str, Optional[dict]]:
+        results = {}
+        with open(batch_id, "r", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                results[record["custom_id"]] = record["response"]
+        return results
+
+    def embeddings(self, text: str, model: Optional[str] = None) -> list:
+        return self.llm_service.embeddings(text, model)
+
+    def chat_completion(self, messages, model, **kwargs):
+        return self.llm_service.chat_completion(messages, model, **kwargs)
+
+    def chat_completion_json(self, messages, model, **kwargs):
+        return self.llm_service.chat_completion_json(messages, model, **kwargs)
+
+    def json_completion(self, messages, model, **kwargs):
+        return self.llm_service.json_completion(messages, model, **kwargs)
+
+    async def achat_completion(self, messages, model, **kwargs):
+        return await self.llm_service.achat_completion(messages, model, **kwargs)
+
+    async def ajson_completion(self, messages, model, **kwargs):
+        return await self.llm_service.ajson_completion(messages, model, **kwargs)
+
+    async def chat_stream_completion(self, messages, model, **kwargs):
+        async for chunk in self.llm_service.chat_stream_completion(
+            messages, model, **kwargs
+        ):
+            yield chunk
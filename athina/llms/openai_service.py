@@ -1,21 +1,53 @@
-from openai import OpenAI
+import asyncio
+from typing import Optional, Tuple
+from openai import OpenAI, AsyncOpenAI
+from openai.types import CompletionUsage
 from retrying import retry
 from timeout_decorator import timeout
 from athina.helpers.json import JsonHelper
+from athina.helpers.run_stats import EvalTrace
 from athina.keys import OpenAiApiKey
 from athina.interfaces.model import Model
-from athina.errors.exceptions import NoOpenAiApiKeyException
-from .abstract_llm_service import AbstractLlmService
+from athina.errors.exceptions import (
+    BudgetExhaustedException,
+    NoOpenAiApiKeyException,
+)
+from .abstract_llm_service import (
+    AbstractLlmService,
+    BATCH_COMPLETED,
+    BATCH_FAILED,
+    BATCH_IN_PROGRESS,
+)
+from .client_registry import ClientRegistry
+from .rate_limiter import RateLimiter
+from .budget import Budget
+from .chat_stream import ChatStream
 import json
+import random
 import time
 from litellm import cost_per_token
 
 DEFAULT_TEMPERATURE = 0.0
+RATE_LIMITER_PROVIDER = "openai"
+RETRY_ATTEMPTS = 5
+RETRY_WAIT_MULTIPLIER_MS = 1000
+RETRY_WAIT_MAX_MS = 30000
+RETRY_JITTER_MAX_MS = 1000
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+# Batch API requests are billed at half the price
+BATCH_PRICE_MULTIPLIER = 0.5
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
 
 
 class OpenAiService(AbstractLlmService):
     _instance = None
 
+    DEFAULT_EMBEDDING_MODEL = DEFAULT_EMBEDDING_MODEL
+    # Limits of the Embeddings API per request, with headroom on tokens
+    EMBEDDINGS_MAX_INPUTS = 2048
+    EMBEDDINGS_MAX_TOKENS = 250000
+
     def __new__(cls):
         if not cls._instance:
             cls._instance = super(OpenAiService, cls).__new__(cls)
@@ -25,9 +57,26 @@ class OpenAiService(AbstractLlmService):
         openai_api_key = OpenAiApiKey.get_key()
         if openai_api_key is None:
             raise NoOpenAiApiKeyException()
-        self.openai = OpenAI(api_key=openai_api_key)
+        self._api_key = openai_api_key
+
+    # Clients are looked up in the registry on each call, so that warm connections
+    # are shared across services, and clients closed by ClientRegistry.configure()
+    # or reset() are replaced
+    @property
+    def openai(self) -> OpenAI:
+        """The shared client for the API key."""
+        return ClientRegistry.openai(self._api_key)
+
+    @property
+    def async_openai(self) -> AsyncOpenAI:
+        """The shared async client of the running event loop."""
+        return ClientRegistry.async_openai(self._api_key)
+
+    def __reduce__(self):
+        # The API clients can't be pickled, so a worker process creates its own
+        return (OpenAiService, ())
 
-    def embeddings(self, text: str, model: str) -> list:
+    def embeddings(self, text: str, model: str = DEFAULT_EMBEDDING_MODEL) -> list:
         """
         Fetches response from OpenAI's Embeddings API.
         """
@@ -40,15 +89,41 @@ class OpenAiService(AbstractLlmService):
             print(f"Error in Embeddings: {e}")
             raise e
 
-    def _process_response(self, response, start_time, model):
+    @retry(
+        stop_max_attempt_number=RETRY_ATTEMPTS,
+        wait_exponential_multiplier=RETRY_WAIT_MULTIPLIER_MS,
+        wait_exponential_max=RETRY_WAIT_MAX_MS,
+        wait_jitter_max=RETRY_JITTER_MAX_MS,
+    )
+    def _embed_chunk(self, texts, model):
+        """
+        Embeds up to EMBEDDINGS_MAX_INPUTS texts with one Embeddings API request.
+        """
+        try:
+            response = self.openai.embeddings.create(
+                model=model, input=texts, encoding_format="float"
+            )
+            return [
+                item.embedding
+                for item in sorted(response.data, key=lambda item: item.index)
+            ]
+        except Exception as e:
+            print(f"Error in Embeddings: {e}")
+            raise e
+
+    @staticmethod
+    def _process_response(response, start_time, model):
         end_time = time.time()
         completion_time = (end_time - start_time) * 1000
+        # Calls to models without known pricing (e.g. custom deployment names) cost 0
         prompt_tokens_cost_usd_dollar, completion_tokens_cost_usd_dollar = (
-            cost_per_token(
-                model=model,
-                prompt_tokens=response.usage.prompt_tokens,
-                completion_tokens=response.usage.completion_tokens,
-            )
+            OpenAiService._token_costs(response.usage, model) or (0.0, 0.0)
+        )
+        EvalTrace.record_llm_call(
+            prompt_tokens=response.usage.prompt_tokens,
+            completion_tokens=response.usage.completion_tokens,
+            cost_usd=prompt_tokens_cost_usd_dollar + completion_tokens_cost_usd_dollar,
+            provider_seconds=end_time - start_time,
         )
         metadata = json.dumps(
             {
@@ -101,7 +176,87 @@ class OpenAiService(AbstractLlmService):
                     }
             return {"value": prompt_response, "metadata": metadata}
 
-    @retry(stop_max_attempt_number=3, wait_fixed=2000)
+    @staticmethod
+    def _token_costs(usage, model) -> Optional[Tuple[float, float]]:
+        """
+        Returns the cost in USD of the prompt and completion tokens of a call's
+        usage, or None if the usage or the model's pricing is unknown.
+        """
+        if usage is None:
+            return None
+        try:
+            return cost_per_token(
+                model=model,
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+            )
+        except Exception:
+            return None
+
+    @staticmethod
+    def _settle_budget(budget, reservation, usage, model):
+        """Settles a budget reservation with the actual cost and tokens of a call."""
+        costs = OpenAiService._token_costs(usage, model)
+        budget.settle(
+            reservation,
+            sum(costs) if costs is not None else None,
+            usage.total_tokens if usage else None,
+        )
+
+    def _create_completion(self, model, messages, **kwargs):
+        """
+        Calls the ChatCompletion API, waiting for rate limit capacity if a limit is configured for the model.
+        If a Budget is active, the estimated cost is reserved first.
+        """
+        budget = Budget.current()
+        if budget is not None:
+            model, reservation = budget.reserve(
+                model, messages, kwargs.get("max_tokens")
+            )
+            try:
+                response, start_time = self._create_completion_with_rate_limit(
+                    model, messages, **kwargs
+                )
+            except Exception:
+                budget.release(reservation)
+                raise
+            self._settle_budget(budget, reservation, response.usage, model)
+        else:
+            response, start_time = self._create_completion_with_rate_limit(
+                model, messages, **kwargs
+            )
+        return self._process_response(response, start_time, model)
+
+    def _create_completion_with_rate_limit(self, model, messages, **kwargs):
+        """
+        Returns the ChatCompletion response and the time the request was sent.
+        """
+        rate_limiter = RateLimiter.get(RATE_LIMITER_PROVIDER, model)
+        estimated_tokens = 0
+        if rate_limiter is not None:
+            estimated_tokens = RateLimiter.estimate_tokens(
+                messages, model, kwargs.get("max_tokens")
+            )
+            rate_limiter.acquire(estimated_tokens)
+        EvalTrace.record_attempt()
+        start_time = time.time()
+        response = self.openai.chat.completions.create(
+            model=model, messages=messages, **kwargs
+        )
+        if rate_limiter is not None:
+            rate_limiter.reconcile(
+                estimated_tokens,
+                response.usage.total_tokens if response.usage else None,
+            )
+        return response, start_time
+
+    @retry(
+        stop_max_attempt_number=RETRY_ATTEMPTS,
+        wait_exponential_multiplier=RETRY_WAIT_MULTIPLIER_MS,
+        wait_exponential_max=RETRY_WAIT_MAX_MS,
+        wait_jitter_max=RETRY_JITTER_MAX_MS,
+        retry_on_exception=lambda e: not isinstance(e, BudgetExhaustedException),
+    )
     def chat_completion(self, messages, model, **kwargs) -> str:
         """
         Fetches response from OpenAI's ChatCompletion API.
@@ -109,16 +264,18 @@ class OpenAiService(AbstractLlmService):
         if "temperature" not in kwargs:
             kwargs["temperature"] = DEFAULT_TEMPERATURE
         try:
-            start_time = time.time()
-            response = self.openai.chat.completions.create(
-                model=model, messages=messages, **kwargs
-            )
-            return self._process_response(response, start_time, model)
+            return self._create_completion(model=model, messages=messages, **kwargs)
         except Exception as e:
             print(f"Error in ChatCompletion: {e}")
             raise e
 
-    @retry(stop_max_attempt_number=3, wait_fixed=2000)
+    @retry(
+        stop_max_attempt_number=RETRY_ATTEMPTS,
+        wait_exponential_multiplier=RETRY_WAIT_MULTIPLIER_MS,
+        wait_exponential_max=RETRY_WAIT_MAX_MS,
+        wait_jitter_max=RETRY_JITTER_MAX_MS,
+        retry_on_exception=lambda e: not isinstance(e, BudgetExhaustedException),
+    )
     def chat_completion_json(self, messages, model, **kwargs) -> str:
         """
         Fetches response from OpenAI's ChatCompletion API using JSON mode.
@@ -126,32 +283,101 @@ class OpenAiService(AbstractLlmService):
         if "temperature" not in kwargs:
             kwargs["temperature"] = DEFAULT_TEMPERATURE
         try:
-            start_time = time.time()
-            response = self.openai.chat.completions.create(
+            return self._create_completion(
                 model=model,
                 messages=messages,
                 response_format={"type": "json_object"},
                 **kwargs,
             )
-            return self._process_response(response, start_time, model)
         except Exception as e:
             print(f"Error in JSON ChatCompletion: {e}")
             raise e
 
     async def chat_stream_completion(self, messages, model, **kwargs):
         """
-        Fetches a streaming response from OpenAI's ChatCompletion API.
+        Streams a response from OpenAI's ChatCompletion API, yielding JSON chunks
+        as they arrive:
+
+        - `{"current_response": "..."}` for each content delta.
+        - `{"tool_call_delta": {"index", "id", "name", "arguments"}}` for each
+          fragment of a tool call.
+        - A final chunk with the `usage`, `cost`, `finish_reason`, the assembled
+          `tool_calls`, and the `latency` of the stream: time to first token,
+          inter-token latency and total time, in milliseconds.
         """
         if "temperature" not in kwargs:
             kwargs["temperature"] = DEFAULT_TEMPERATURE
+        kwargs.pop("stream", None)
+        # Usage is sent in an extra chunk at the end of the stream
+        kwargs["stream_options"] = {
+            **(kwargs.get("stream_options") or {}),
+            "include_usage": True,
+        }
+        budget = Budget.current()
+        reservation = None
+        chat_stream = None
+        stream = None
+        finished = False
+        failed = False
         try:
-            response = self.openai.chat.completions.create(
+            if budget is not None:
+                model, reservation = budget.reserve(
+                    model, messages, kwargs.get("max_tokens")
+                )
+            rate_limiter = RateLimiter.get(RATE_LIMITER_PROVIDER, model)
+            estimated_tokens = 0
+            if rate_limiter is not None:
+                estimated_tokens = RateLimiter.estimate_tokens(
+                    messages, model, kwargs.get("max_tokens")
+                )
+                await rate_limiter.aacquire(estimated_tokens)
+            EvalTrace.record_attempt()
+            chat_stream = ChatStream()
+            stream = await self.async_openai.chat.completions.create(
                 model=model, messages=messages, stream=True, **kwargs
             )
-            return self._process_response(response, start_time, model)
+            async for chunk in stream:
+                for output in chat_stream.add(chunk):
+                    yield output
+            chat_stream.finish()
+            finished = True
+        except BudgetExhaustedException:
+            raise
         except Exception as e:
+            failed = True
             print(f"Error in ChatStreamCompletion: {e}")
             raise e
+        finally:
+            # The call failed, or the consumer stopped reading the stream
+            if not finished and stream is not None:
+                await stream.close()
+            if not finished and reservation is not None:
+                if failed or chat_stream is None:
+                    budget.release(reservation)
+                else:
+                    # The tokens generated before the stream was closed are billed
+                    budget.settle(reservation, None, None)
+
+        if rate_limiter is not None:
+            rate_limiter.reconcile(estimated_tokens, chat_stream.total_tokens)
+        costs = self._token_costs(chat_stream.usage, model)
+        cost_usd = sum(costs) if costs is not None else None
+        if reservation is not None:
+            budget.settle(reservation, cost_usd, chat_stream.total_tokens)
+        yield chat_stream.final_chunk(cost_usd)
+
+    @staticmethod
+    def _json_response(chat_completion_result) -> dict:
+        """
+        Extracts the JSON object and metadata from a chat completion result.
+        """
+        chat_completion_response = chat_completion_result["value"]
+        # Extract JSON object from LLM response
+        eval_response = JsonHelper.extract_json_from_text(chat_completion_response)
+        if "metadata" in chat_completion_result:
+            metadata = json.loads(chat_completion_result["metadata"])
+            eval_response["metadata"] = metadata
+        return eval_response
 
     def json_completion(self, messages, model, **kwargs):
         """
@@ -172,14 +398,198 @@ class OpenAiService(AbstractLlmService):
                     messages=messages,
                     **kwargs,
                 )
-            chat_completion_response = chat_completion_result["value"]
-            # Extract JSON object from LLM response
-            eval_response = JsonHelper.extract_json_from_text(chat_completion_response)
-            if "metadata" in chat_completion_result:
-                metadata = json.loads(chat_completion_result["metadata"])
-                eval_response["metadata"] = metadata
-            return eval_response
+            return self._json_response(chat_completion_result)
+
+        except Exception as e:
+            print(f"Error in ChatCompletion: {e}")
+            raise e
+
+    async def _acreate_with_retry(self, model, messages, **kwargs):
+        """
+        Calls the async ChatCompletion API, with the same rate limiting and retries as the sync methods.
+        """
+        budget = Budget.current()
+        for attempt in range(RETRY_ATTEMPTS):
+            reservation = None
+            try:
+                if budget is not None:
+                    model, reservation = budget.reserve(
+                        model, messages, kwargs.get("max_tokens")
+                    )
+                rate_limiter = RateLimiter.get(RATE_LIMITER_PROVIDER, model)
+                estimated_tokens = 0
+                if rate_limiter is not None:
+                    estimated_tokens = RateLimiter.estimate_tokens(
+                        messages, model, kwargs.get("max_tokens")
+                    )
+                    await rate_limiter.aacquire(estimated_tokens)
+                EvalTrace.record_attempt()
+                start_time = time.time()
+                response = await self.async_openai.chat.completions.create(
+                    model=model, messages=messages, **kwargs
+                )
+                if rate_limiter is not None:
+                    rate_limiter.reconcile(
+                        estimated_tokens,
+                        response.usage.total_tokens if response.usage else None,
+                    )
+                if reservation is not None:
+                    self._settle_budget(budget, reservation, response.usage, model)
+                    reservation = None
+                return self._process_response(response, start_time, model)
+            except BudgetExhaustedException:
+                raise
+            except Exception:
+                if reservation is not None:
+                    budget.release(reservation)
+                if attempt == RETRY_ATTEMPTS - 1:
+                    raise
+                wait_ms = min(
+                    RETRY_WAIT_MULTIPLIER_MS * 2 ** (attempt + 1), RETRY_WAIT_MAX_MS
+                ) + random.uniform(0, RETRY_JITTER_MAX_MS)
+                await asyncio.sleep(wait_ms / 1000)
+
+    async def achat_completion(self, messages, model, **kwargs):
+        """
+        Fetches response from OpenAI's ChatCompletion API without blocking the event loop.
+        """
+        if "temperature" not in kwargs:
+            kwargs["temperature"] = DEFAULT_TEMPERATURE
+        try:
+            return await self._acreate_with_retry(
+                model=model, messages=messages, **kwargs
+            )
+        except Exception as e:
+            print(f"Error in ChatCompletion: {e}")
+            raise e
+
+    async def achat_completion_json(self, messages, model, **kwargs):
+        """
+        Fetches response from OpenAI's ChatCompletion API using JSON mode without blocking the event loop.
+        """
+        if "temperature" not in kwargs:
+            kwargs["temperature"] = DEFAULT_TEMPERATURE
+        try:
+            return await self._acreate_with_retry(
+                model=model,
+                messages=messages,
+                response_format={"type": "json_object"},
+                **kwargs,
+            )
+        except Exception as e:
+            print(f"Error in JSON ChatCompletion: {e}")
+            raise e
+
+    async def ajson_completion(self, messages, model, **kwargs):
+        """
+        Async variant of json_completion.
+        """
+        if "temperature" not in kwargs:
+            kwargs["temperature"] = DEFAULT_TEMPERATURE
+        try:
+            if Model.supports_json_mode(model):
+                chat_completion_result = await self.achat_completion_json(
+                    model=model,
+                    messages=messages,
+                    **kwargs,
+                )
+            else:
+                chat_completion_result = await self.achat_completion(
+                    model=model,
+                    messages=messages,
+                    **kwargs,
+                )
+            return self._json_response(chat_completion_result)
 
         except Exception as e:
             print(f"Error in ChatCompletion: {e}")
             raise e
+
+    @property
+    def supports_batch(self) -> bool:
+        return True
+
+    def submit_batch(self, requests, path: str) -> str:
+        """
+        Uploads the requests as a JSONL file, and creates a job on OpenAI's Batch API.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            for request in requests:
+                body = {
+                    "model": request["model"],
+                    "messages": request["messages"],
+                    "temperature": request.get("temperature", DEFAULT_TEMPERATURE),
+                }
+                if Model.supports_json_mode(request["model"]):
+                    body["response_format"] = {"type": "json_object"}
+                line = {
+                    "custom_id": request["custom_id"],
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": body,
+                }
+                f.write(json.dumps(line) + "\n")
+        with open(path, "rb") as f:
+            input_file = self.openai.files.create(file=f, purpose="batch")
+        batch = self.openai.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW,
+        )
+        return batch.id
+
+    def batch_status(self, batch_id: str) -> str:
+        status = self.openai.batches.retrieve(batch_id).status
+        if status == "completed":
+            return BATCH_COMPLETED
+        if status in ("validating", "in_progress", "finalizing"):
+            return BATCH_IN_PROGRESS
+        return BATCH_FAILED
+
+    def batch_results(self, batch_id: str):
+        batch = self.openai.batches.retrieve(batch_id)
+        results = {}
+        if batch.output_file_id is None:
+            return results
+        content = self.openai.files.content(batch.output_file_id).text
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                results[record["custom_id"]] = None
+                continue
+            results[record["custom_id"]] = self._batch_response(response["body"])
+        return results
+
+    def _batch_response(self, body: dict) -> Optional[dict]:
+        """
+        Converts a chat completion from a batch job to the format of `json_completion`.
+        """
+        usage = body.get("usage") or {}
+        prompt_cost, completion_cost = self._token_costs(
+            CompletionUsage.model_construct(**usage) if usage else None,
+            body.get("model"),
+        ) or (0.0, 0.0)
+        prompt_cost *= BATCH_PRICE_MULTIPLIER
+        completion_cost *= BATCH_PRICE_MULTIPLIER
+        metadata = {
+            "usage": usage,
+            "cost": {
+                "prompt_tokens_cost_usd_dollar": prompt_cost,
+                "completion_tokens_cost_usd_dollar": completion_cost,
+                "total_cost_usd_dollar": prompt_cost + completion_cost,
+            },
+            "response_time": 0,
+        }
+        try:
+            return self._json_response(
+                {
+                    "value": body["choices"][0]["message"]["content"],
+                    "metadata": json.dumps(metadata),
+                }
+            )
+        except Exception as e:
+            print(f"Error parsing batch response: {e}")
+            return None
@@ -38,16 +38,18 @@ class EmbeddingBasedContextFinder(ContextFinderStrategy):
     def find_relevant_context_indices(
         self, question_embedding, context_embeddings, num_relevant=5
     ):
-        # Ensure context_embeddings is a list of numpy arrays
-        context_embeddings = [np.asarray(embedding) for embedding in context_embeddings]
-
-        # Compute cosine similarities
-        similarities = [
-            EmbeddingBasedContextFinder.cosine_similarity(
-                question_embedding, context_embedding
-            )
-            for context_embedding in context_embeddings
-        ]
+        # Compute cosine similarities against all context embeddings at once
+        context_embeddings = np.asarray(context_embeddings, dtype=np.float32)
+        question_embedding = np.asarray(question_embedding, dtype=np.float32)
+        magnitudes = np.linalg.norm(context_embeddings, axis=1) * np.linalg.norm(
+            question_embedding
+        )
+        similarities = np.divide(
+            context_embeddings @ question_embedding,
+            magnitudes,
+            out=np.zeros(len(context_embeddings), dtype=np.float32),
+            where=magnitudes > 0,
+        )
 
         # Find the indices of the top 'num_relevant' most similar context chunks
         relevant_indices = np.argsort(similarities)[-num_relevant:][::-1]
@@ -103,15 +105,14 @@ class QuestionAnswererWithRetrieval(QuestionAnswerer):
             context[i : i + chunk_size] for i in range(0, len(context), chunk_size)
         ]
 
-        # Generate embeddings for each context chunk
-        context_embeddings = [
-            self._llm_service.embeddings(chunk) for chunk in context_chunks
-        ]
+        # Generate embeddings for all context chunks in batched requests
+        context_embeddings = self._llm_service.embeddings_batch(context_chunks)
         return context_chunks, context_embeddings
 
-    def _get_relevant_chunks(self, question):
+    def _get_relevant_chunks(self, question, question_embedding=None):
         ADJACENT_CHUNKS = 1
-        question_embedding = self._llm_service.embeddings(question)
+        if question_embedding is None:
+            question_embedding = self._llm_service.embeddings_batch([question])[0]
         relevant_context_indices = self.context_finder.find_relevant_context_indices(
             question_embedding, self.context_embeddings, num_relevant=3
         )
@@ -125,8 +126,12 @@ class QuestionAnswererWithRetrieval(QuestionAnswerer):
 
         return relevant_context_chunks
 
-    def _answer_question(self, question) -> QuestionAnswererResponse:
-        relevant_context_chunks = self._get_relevant_chunks(question)
+    def _answer_question(
+        self, question, question_embedding=None
+    ) -> QuestionAnswererResponse:
+        relevant_context_chunks = self._get_relevant_chunks(
+            question, question_embedding
+        )
         relevant_context = "\n".join(relevant_context_chunks)
 
         user_message = self.USER_MESSAGE_TEMPLATE.format(question, relevant_context)
@@ -161,10 +166,15 @@ class QuestionAnswererWithRetrieval(QuestionAnswerer):
     def answer(self, questions: List[str], **kwargs) -> Tuple[dict, dict]:
         results = {}
         simple_result = {}
+        question_embeddings = self._llm_service.embeddings_batch(questions)
         with ThreadPoolExecutor() as executor:
             futures = {
-                executor.submit(self._answer_question, question): question
-                for question in questions
+                executor.submit(
+                    self._answer_question, question, question_embedding
+                ): question
+                for question, question_embedding in zip(
+                    questions, question_embeddings
+                )
             }
 
             for future in as_completed(futures):
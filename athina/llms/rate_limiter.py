@@ -0,0 +1,199 @@
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import tiktoken
+
+# Tokens added per message by the chat format
+TOKENS_PER_MESSAGE = 4
+
+
+class TokenBucket:
+    """
+    A token bucket that refills continuously up to its capacity.
+    The level may go negative when a reservation is reconciled upwards.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._level = capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._level = min(
+            self.capacity,
+            self._level + (now - self._updated_at) * self.refill_per_second,
+        )
+        self._updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Returns how long to wait before `amount` can be taken (0 if it can be taken now).
+        """
+        self._refill()
+        # A single request larger than the bucket is let through once the bucket is full
+        amount = min(amount, self.capacity)
+        if self._level >= amount:
+            return 0.0
+        return (amount - self._level) / self.refill_per_second
+
+    def take(self, amount: float):
+        self._refill()
+        self._level -= amount
+
+
+class RateLimiter:
+    """
+    A process-wide requests-per-minute and tokens-per-minute limiter, keyed by
+    provider and model.
+
+    Limits are configured once, e.g.
+    `RateLimiter.configure("openai", "gpt-4o", requests_per_minute=500, tokens_per_minute=30000)`.
+    A limit configured without a model applies to every model of that provider
+    that has no limit of its own. Calls to unconfigured models are not limited.
+    """
+
+    _limits: Dict[Tuple[str, Optional[str]], Tuple[Optional[int], Optional[int]]] = {}
+    _limiters: Dict[Tuple[str, str], "RateLimiter"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        self._lock = threading.Lock()
+        self._requests = (
+            TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+            if requests_per_minute
+            else None
+        )
+        self._tokens = (
+            TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+            if tokens_per_minute
+            else None
+        )
+
+    @classmethod
+    def configure(
+        cls,
+        provider: str,
+        model: Optional[str] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        with cls._registry_lock:
+            cls._limits[(provider, model)] = (requests_per_minute, tokens_per_minute)
+            # Rebuild limiters lazily with the new limits
+            for key in list(cls._limiters.keys()):
+                if key[0] == provider and (model is None or key[1] == model):
+                    del cls._limiters[key]
+
+    @classmethod
+    def reset(cls):
+        with cls._registry_lock:
+            cls._limits.clear()
+            cls._limiters.clear()
+
+    @classmethod
+    def get(cls, provider: str, model: str) -> Optional["RateLimiter"]:
+        """
+        Returns the limiter for a provider and model, or None if no limit is configured.
+        """
+        with cls._registry_lock:
+            limiter = cls._limiters.get((provider, model))
+            if limiter is not None:
+                return limiter
+            limits = cls._limits.get((provider, model)) or cls._limits.get(
+                (provider, None)
+            )
+            if limits is None:
+                return None
+            limiter = RateLimiter(*limits)
+            cls._limiters[(provider, model)] = limiter
+            return limiter
+
+    @staticmethod
+    def estimate_tokens(
+        messages: List[dict], model: str, max_tokens: Optional[int] = None
+    ) -> int:
+        """
+        Estimates the tokens a chat completion will use, before making the call.
+        """
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        num_tokens = 0
+        for message in messages:
+            num_tokens += TOKENS_PER_MESSAGE
+            content = message.get("content")
+            if isinstance(content, str):
+                num_tokens += len(encoding.encode(content))
+            elif isinstance(content, list):
+                for part in content:
+                    if isinstance(part, dict) and isinstance(part.get("text"), str):
+                        num_tokens += len(encoding.encode(part["text"]))
+        return num_tokens + (max_tokens or 0)
+
+    def _reserve(self, tokens: int) -> float:
+        """
+        Takes from both buckets if possible. Otherwise returns how long to wait.
+        """
+        with self._lock:
+            wait = 0.0
+            if self._requests is not None:
+                wait = max(wait, self._requests.wait_time(1))
+            if self._tokens is not None:
+                wait = max(wait, self._tokens.wait_time(tokens))
+            if wait > 0:
+                return wait
+            if self._requests is not None:
+                self._requests.take(1)
+            if self._tokens is not None:
+                self._tokens.take(tokens)
+            return 0.0
+
+    def headroom(self) -> float:
+        """
+        Returns the fraction of the limits currently available, from 0 to 1
+        (the lower of the request and token buckets).
+        """
+        with self._lock:
+            headroom = 1.0
+            for bucket in (self._requests, self._tokens):
+                if bucket is not None:
+                    bucket._refill()
+                    headroom = min(headroom, max(bucket._level, 0) / bucket.capacity)
+            return headroom
+
+    def acquire(self, tokens: int):
+        """
+        Blocks until a request using `tokens` tokens can be sent.
+        """
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int):
+        """
+        Waits, without blocking the event loop, until a request using `tokens` tokens can be sent.
+        """
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """
+        Corrects the token bucket once the actual usage of a request is known.
+        """
+        if self._tokens is None or actual_tokens is None:
+            return
+        with self._lock:
+            self._tokens.take(actual_tokens - estimated_tokens)
@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+from athina.cache.eval_cache import EvalCache
+from athina.errors.exceptions import CassetteMissException
+from athina.helpers.run_stats import EvalTrace
+from .abstract_llm_service import AbstractLlmService
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+MODE_AUTO = "auto"
+MODES = (MODE_RECORD, MODE_REPLAY, MODE_AUTO)
+
+
+class RecordingLlmService(AbstractLlmService):
+    """
+    Wraps an LLM service, recording its requests and responses to a cassette file
+    so that runs can be replayed later without network access or cost.
+
+    Modes:
+        "record": Always calls the wrapped service, and records the response.
+        "replay": Only serves recorded responses; a request that was not recorded
+            raises CassetteMissException. No wrapped service is needed.
+        "auto": Serves recorded responses, and records the requests that were not.
+
+    The cassette is an append-only JSONL file with one interaction per line, keyed
+    by a hash of the method, model, messages and arguments. Responses are replayed
+    exactly as recorded, including their usage metadata. Replayed responses are
+    reported to the EvalTrace as cache hits, so run stats attribute all of the
+    evaluation time to the framework itself.
+    """
+
+    def __init__(
+        self,
+        cassette_path: str,
+        llm_service: Optional[AbstractLlmService] = None,
+        mode: str = MODE_AUTO,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        if llm_service is None and mode != MODE_REPLAY:
+            raise ValueError(f"An llm_service is required in {mode!r} mode")
+        self.cassette_path = cassette_path
+        self.llm_service = llm_service
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, str] = {}
+        self._load()
+        self._file = None
+        if mode != MODE_REPLAY:
+            directory = os.path.dirname(cassette_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(cassette_path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not os.path.exists(self.cassette_path):
+            if self.mode == MODE_REPLAY:
+                raise FileNotFoundError(f"Cassette not found: {self.cassette_path}")
+            return
+        with open(self.cassette_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    interaction = json.loads(line)
+                except json.JSONDecodeError:
+                    # A partially written line from an interrupted run
+                    continue
+                self._interactions[interaction["key"]] = json.dumps(
+                    interaction["response"]
+                )
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def request_key(method: str, model: Optional[str], messages: Any, **kwargs) -> str:
+        """
+        Returns the key of a request in the cassette.
+        """
+        return EvalCache.make_key(method, model, messages, kwargs)
+
+    def _replay(self, key: str) -> Optional[Any]:
+        """
+        Returns a copy of the recorded response for a key, or None if it should
+        be fetched from the wrapped service.
+        """
+        if self.mode == MODE_RECORD:
+            return None
+        with self._lock:
+            response = self._interactions.get(key)
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if response is None:
+            if self.mode == MODE_REPLAY:
+                raise CassetteMissException(extra_info={"key": key})
+            return None
+        EvalTrace.record_cache_hit()
+        return json.loads(response)
+
+    def _record(self, key: str, method: str, model, messages, kwargs, response):
+        interaction = {
+            "key": key,
+            "method": method,
+            "model": model,
+            "request": {"messages": messages, "kwargs": kwargs},
+            "response": response,
+        }
+        line = json.dumps(interaction, default=str)
+        with self._lock:
+            self._interactions[key] = json.dumps(interaction["response"], default=str)
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def _call(self, method: str, messages, model, **kwargs):
+        key = self.request_key(method, model, messages, **kwargs)
+        response = self._replay(key)
+        if response is None:
+            response = getattr(self.llm_service, method)(
+                messages=messages, model=model, **kwargs
+            )
+            self._record(key, method, model, messages, kwargs, response)
+        return response
+
+    async def _acall(self, method: str, messages, model, **kwargs):
+        # Shares recordings with the sync method
+        key = self.request_key(method, model, messages, **kwargs)
+        response = self._replay(key)
+        if response is None:
+            response = await getattr(self.llm_service, f"a{method}")(
+                messages=messages, model=model, **kwargs
+            )
+            self._record(key, method, model, messages, kwargs, response)
+        return response
+
+    def embeddings(self, text: str, model: Optional[str] = None) -> list:
+        key = self.request_key("embeddings", model, text)
+        response = self._replay(key)
+        if response is None:
+            response = self.llm_service.embeddings(text, model)
+            self._record(key, "embeddings", model, text, {}, response)
+        return response
+
+    def chat_completion(self, messages, model, **kwargs):
+        return self._call("chat_completion", messages, model, **kwargs)
+
+    def chat_completion_json(self, messages, model, **kwargs):
+        return self._call("chat_completion_json", messages, model, **kwargs)
+
+    def json_completion(self, messages, model, **kwargs):
+        return self._call("json_completion", messages, model, **kwargs)
+
+    async def achat_completion(self, messages, model, **kwargs):
+        return await self._acall("chat_completion", messages, model, **kwargs)
+
+    async def ajson_completion(self, messages, model, **kwargs):
+        return await self._acall("json_completion", messages, model, **kwargs)
+
+    async def chat_stream_completion(self, messages, model, **kwargs):
+        """
+        Streams the wrapped service's chunks, recording them once the stream ends.
+        Replayed streams yield the recorded chunks.
+        """
+        key = self.request_key("chat_stream_completion", model, messages, **kwargs)
+        chunks = self._replay(key)
+        if chunks is not None:
+            for chunk in chunks:
+                yield chunk
+            return
+        chunks = []
+        async for chunk in self.llm_service.chat_stream_completion(
+            messages=messages, model=model, **kwargs
+        ):
+            chunks.append(chunk)
+            yield chunk
+        self._record(key, "chat_stream_completion", model, messages, kwargs, chunks)
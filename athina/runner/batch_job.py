@@ -0,0 +1,190 @@
+import json
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Union
+from athina.cache.eval_cache import EvalCache
+from athina.evals.base_evaluator import BaseEvaluator
+from athina.evals.llm.llm_evaluator import LlmEvaluator
+from athina.interfaces.data import DataPoint
+from athina.llms.abstract_llm_service import (
+    AbstractLlmService,
+    BATCH_COMPLETED,
+    BATCH_IN_PROGRESS,
+)
+from athina.llms.batch_responses import BatchResponses
+from athina.runner.cascade import Cascade
+
+STATE_FILE = "state.json"
+
+
+class BatchJob:
+    """
+    Runs the judge calls of a suite's LLM evaluators as offline batch jobs, for
+    runs where cost and throughput matter more than latency.
+
+    Every judge prompt is rendered up front, and the prompts of each LLM service
+    are submitted as one batch job (see `AbstractLlmService.submit_batch`). Once
+    the jobs complete, their responses are parsed by the evaluators as usual.
+
+    Progress is kept in `work_dir`: the id of each submitted job, and its responses
+    once they are collected. If the process dies after submitting, running the
+    suite again with the same work directory resumes waiting on the same jobs
+    instead of submitting them again.
+
+    Only LLM evaluators whose service supports batch jobs, and that are not gated
+    by a cascade, are batched. Requests that fail in the batch are made live.
+    """
+
+    def __init__(
+        self,
+        work_dir: str,
+        poll_interval: float = 60.0,
+        timeout: Optional[float] = None,
+    ):
+        self.work_dir = work_dir
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        os.makedirs(work_dir, exist_ok=True)
+
+    @staticmethod
+    def open(batch_job: Union[str, "BatchJob", None]) -> Optional["BatchJob"]:
+        """
+        Returns a BatchJob for a work directory, or the job itself if one is passed.
+        """
+        if batch_job is None or isinstance(batch_job, BatchJob):
+            return batch_job
+        return BatchJob(batch_job)
+
+    @staticmethod
+    def is_batchable(
+        eval: BaseEvaluator, eval_index: int, cascade: Optional[Cascade] = None
+    ) -> bool:
+        return (
+            isinstance(eval, LlmEvaluator)
+            # Subclasses with their own _evaluate may not make one judge call per row
+            and type(eval)._evaluate is LlmEvaluator._evaluate
+            and eval.llm_service.supports_batch
+            and not (cascade is not None and cascade.gates[eval_index])
+        )
+
+    def _render(
+        self,
+        evals: List[BaseEvaluator],
+        data: Sequence[DataPoint],
+        row_indices: List[Sequence[int]],
+        cascade: Optional[Cascade],
+    ) -> List[tuple]:
+        """
+        Returns `(llm_service, requests by key)` for each LLM service, with one
+        request per unique judge prompt.
+        """
+        groups: Dict[int, tuple] = {}
+        for eval_index, eval in enumerate(evals):
+            if not self.is_batchable(eval, eval_index, cascade):
+                continue
+            service = eval.llm_service
+            _, requests = groups.setdefault(id(service), (service, {}))
+            for row_index in row_indices[eval_index]:
+                try:
+                    eval.validate_args(**data[row_index])
+                    messages = eval._prompt_messages(**data[row_index])
+                except Exception:
+                    # The row fails the same way when it is evaluated
+                    continue
+                key = BatchResponses.request_key(
+                    eval._model, messages, eval.TEMPERATURE
+                )
+                requests[key] = {
+                    "custom_id": key,
+                    "model": eval._model,
+                    "messages": messages,
+                    "temperature": eval.TEMPERATURE,
+                }
+        return [group for group in groups.values() if group[1]]
+
+    def _load_state(self) -> Dict:
+        path = os.path.join(self.work_dir, STATE_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_state(self, state: Dict):
+        path = os.path.join(self.work_dir, STATE_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _wait(self, llm_service: AbstractLlmService, batch_id: str) -> str:
+        started_at = time.time()
+        while True:
+            status = llm_service.batch_status(batch_id)
+            if status != BATCH_IN_PROGRESS:
+                return status
+            if self.timeout is not None and time.time() - started_at > self.timeout:
+                raise TimeoutError(
+                    f"Batch job {batch_id} did not complete in {self.timeout}s. "
+                    f"Run the suite again with the work directory {self.work_dir} "
+                    "to resume waiting on it."
+                )
+            time.sleep(self.poll_interval)
+
+    def _run_group(
+        self, name: str, llm_service: AbstractLlmService, requests: Dict[str, dict]
+    ) -> Dict[str, Optional[dict]]:
+        responses_path = os.path.join(self.work_dir, f"{name}.responses.json")
+        fingerprint = EvalCache.make_key(sorted(requests))
+        state = self._load_state()
+        job = state.get(name)
+        if job is not None and job["fingerprint"] == fingerprint:
+            if os.path.exists(responses_path):
+                with open(responses_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            print(f"Resuming batch job {job['batch_id']}")
+        else:
+            batch_id = llm_service.submit_batch(
+                list(requests.values()),
+                os.path.join(self.work_dir, f"{name}.requests.jsonl"),
+            )
+            job = {"batch_id": batch_id, "fingerprint": fingerprint}
+            state[name] = job
+            self._save_state(state)
+            print(f"Submitted batch job {batch_id} with {len(requests)} requests")
+
+        status = self._wait(llm_service, job["batch_id"])
+        if status != BATCH_COMPLETED:
+            print(
+                f"Batch job {job['batch_id']} {status}; its requests will be made live"
+            )
+            del state[name]
+            self._save_state(state)
+            return {}
+        responses = llm_service.batch_results(job["batch_id"])
+        with open(responses_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(responses, f)
+        os.replace(responses_path + ".tmp", responses_path)
+        return responses
+
+    def collect(
+        self,
+        evals: List[BaseEvaluator],
+        data: Sequence[DataPoint],
+        row_indices: Optional[List[Sequence[int]]] = None,
+        cascade: Optional[Cascade] = None,
+    ) -> BatchResponses:
+        """
+        Submits (or resumes) a batch job for the rows to run of each batchable
+        evaluator, waits for them to complete, and returns their responses.
+        """
+        if row_indices is None:
+            row_indices = [range(len(data)) for _ in evals]
+        responses = {}
+        for group_index, (llm_service, requests) in enumerate(
+            self._render(evals, data, row_indices, cascade)
+        ):
+            name = f"{llm_service.__class__.__name__}-{group_index}"
+            responses.update(self._run_group(name, llm_service, requests))
+        failed = sum(1 for response in responses.values() if response is None)
+        if failed:
+            print(f"{failed} batch requests failed; they will be made live")
+        return BatchResponses(responses)
@@ -0,0 +1,131 @@
+from typing import Dict, List, Optional, Union
+from athina.evals.base_evaluator import BaseEvaluator
+from athina.helpers.early_stopping import passed_value
+from athina.interfaces.data import DataPoint
+from athina.interfaces.result import EvalResult
+
+
+class Cascade:
+    """
+    Dependencies between the evaluators of a suite: an evaluator only runs on
+    the rows where all of its gates passed, e.g.
+
+        Cascade(evals, {"Groundedness": ["ContainsJson", "LengthLessThan"]})
+
+    Evaluators are referred to by display name or name. A row is skipped for an
+    evaluator if any of its gates failed or was itself skipped for that row; a
+    gate that errored or has no pass/fail result does not skip the row.
+    """
+
+    def __init__(
+        self,
+        evals: List[BaseEvaluator],
+        dependencies: Dict[str, Union[str, List[str]]],
+    ):
+        self.evals = evals
+        self.gates: List[List[int]] = [[] for _ in evals]
+        self.dependents: List[List[int]] = [[] for _ in evals]
+        for dependent, gates in dependencies.items():
+            dependent_index = self._index_of(dependent)
+            for gate in [gates] if isinstance(gates, str) else gates:
+                gate_index = self._index_of(gate)
+                if gate_index == dependent_index:
+                    raise ValueError(f"{dependent} cannot depend on itself")
+                if gate_index not in self.gates[dependent_index]:
+                    self.gates[dependent_index].append(gate_index)
+                    self.dependents[gate_index].append(dependent_index)
+        self.order = self._topological_order()
+        self.representatives: Optional[List[List[int]]] = None
+
+    def _index_of(self, name: str) -> int:
+        matches = [
+            eval_index
+            for eval_index, eval in enumerate(self.evals)
+            if name in (eval.display_name, eval.name)
+        ]
+        if not matches:
+            raise ValueError(f"Unknown evaluator in cascade: {name}")
+        if len(matches) > 1:
+            raise ValueError(
+                f"Ambiguous evaluator in cascade: {name} matches {len(matches)} evaluators"
+            )
+        return matches[0]
+
+    def _topological_order(self) -> List[int]:
+        """
+        Returns the evaluator indices with every gate before its dependents.
+        """
+        unresolved = [len(gates) for gates in self.gates]
+        order = [eval_index for eval_index, n in enumerate(unresolved) if n == 0]
+        for eval_index in order:
+            for dependent_index in self.dependents[eval_index]:
+                unresolved[dependent_index] -= 1
+                if unresolved[dependent_index] == 0:
+                    order.append(dependent_index)
+        if len(order) < len(self.evals):
+            raise ValueError("The cascade has a cycle")
+        return order
+
+    def refine_representatives(
+        self, representatives: List[List[int]]
+    ) -> List[List[int]]:
+        """
+        Refines the duplicate groups of each evaluator, so that rows only share a
+        result if they also share the results of the evaluator's gates.
+        The refined groups are kept to look up gate results with `gate_row()`.
+        """
+        representatives = [list(reps) for reps in representatives]
+        for eval_index in self.order:
+            gates = self.gates[eval_index]
+            if not gates:
+                continue
+            first_row = {}
+            for row_index, rep in enumerate(representatives[eval_index]):
+                key = (rep, *(representatives[gate][row_index] for gate in gates))
+                representatives[eval_index][row_index] = first_row.setdefault(
+                    key, row_index
+                )
+        self.representatives = representatives
+        return representatives
+
+    @staticmethod
+    def gate_passed(eval_result: Optional[EvalResult]) -> bool:
+        """
+        Whether the rows waiting on a gate result may run.
+        """
+        if Cascade.is_skipped_result(eval_result):
+            return False
+        return passed_value(eval_result) is not False
+
+    @staticmethod
+    def skipped_result(
+        evaluator: BaseEvaluator, entry: DataPoint, gate: BaseEvaluator
+    ) -> EvalResult:
+        """
+        The result recorded for a row that was skipped because a gate did not pass.
+        """
+        return {
+            "name": evaluator.name,
+            "display_name": evaluator.display_name,
+            "data": entry,
+            "reason": f"Skipped: {gate.display_name} did not pass",
+            "runtime": 0,
+            "metrics": [],
+            "metadata": {"skipped": True, "skipped_by": gate.display_name},
+        }
+
+    @staticmethod
+    def is_skipped_result(eval_result: Optional[EvalResult]) -> bool:
+        return bool(
+            eval_result
+            and isinstance(eval_result.get("metadata"), dict)
+            and eval_result["metadata"].get("skipped")
+        )
+
+    def gate_row(self, gate_index: int, row_index: int) -> int:
+        """
+        Returns the row whose result of the gate applies to a row.
+        """
+        if self.representatives is None:
+            return row_index
+        return self.representatives[gate_index][row_index]
@@ -0,0 +1,340 @@
+import json
+import math
+import numbers
+from typing import Any, Dict, List, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from athina.evals.base_evaluator import BaseEvaluator
+from athina.interfaces.data import DataPoint
+from athina.interfaces.result import EvalResult
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Keys of an EvalResult that are stored in typed columns
+_COLUMN_KEYS = (
+    "name",
+    "display_name",
+    "data",
+    "failure",
+    "reason",
+    "runtime",
+    "model",
+    "metrics",
+)
+# Extra key for results whose data is a subset of the fields of their row
+_DATA_KEYS = "_data_keys"
+
+
+def _require_pyarrow():
+    if not HAS_PYARROW:
+        raise ImportError(
+            "pyarrow is required to export eval results to Arrow or Parquet. "
+            "Install it with `pip install pyarrow`."
+        )
+
+
+class _EvalResultsView(Sequence):
+    """The results of one evaluator, as a list-like view of the store."""
+
+    def __init__(self, store: "EvalResultStore", eval_index: int):
+        self._store = store
+        self._eval_index = eval_index
+
+    def __len__(self) -> int:
+        return len(self._store.data)
+
+    def __getitem__(self, row_index):
+        if isinstance(row_index, slice):
+            return [
+                self._store.get(self._eval_index, index)
+                for index in range(len(self))[row_index]
+            ]
+        return self._store.get(self._eval_index, row_index)
+
+    def __setitem__(self, row_index: int, eval_result: Optional[EvalResult]):
+        self._store.set(self._eval_index, row_index, eval_result)
+
+
+class EvalResultStore:
+    """
+    Columnar store for the results of a suite of evaluators over a dataset.
+
+    Results reference their row in one shared list of datapoints instead of
+    holding a copy of it, and failure, runtime, reason and each metric are held
+    in one typed column per evaluator. Memory grows with the number of rows plus
+    evaluators x metrics, rather than evaluators x rows x row size.
+
+    `store[eval_index][row_index]` reads and writes results as EvalResult
+    dicts, which are built on access. Keys that have no column (such as
+    metadata) are kept as they are, for the rows that have them.
+    """
+
+    def __init__(self, data: List[DataPoint], evals: List[BaseEvaluator]):
+        self.data = data
+        self.names = [eval.name for eval in evals]
+        self.display_names = [eval.display_name for eval in evals]
+        self.attrs: Dict[str, Any] = {}
+        num_rows = len(data)
+        self._present = [np.zeros(num_rows, dtype=bool) for _ in evals]
+        # 1 if failed, 0 if passed, -1 if unknown
+        self._failure = [np.full(num_rows, -1, dtype=np.int8) for _ in evals]
+        self._runtime = [np.full(num_rows, np.nan) for _ in evals]
+        self._reason = [np.full(num_rows, None, dtype=object) for _ in evals]
+        self._model = [np.full(num_rows, None, dtype=object) for _ in evals]
+        self._metrics: List[Dict[str, np.ndarray]] = [{} for _ in evals]
+        self._extra: List[Dict[int, Dict[str, Any]]] = [{} for _ in evals]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, eval_index: int) -> _EvalResultsView:
+        return _EvalResultsView(self, eval_index)
+
+    def _metric_column(self, eval_index: int, metric_id: str, value) -> np.ndarray:
+        """
+        Returns the column of a metric, creating it on first use. Columns are
+        float64 (NaN if missing), or object (None if missing) once they hold a
+        value that is not a float, so that bool and int metrics keep their type.
+        """
+        metrics = self._metrics[eval_index]
+        column = metrics.get(metric_id)
+        if column is None:
+            column = np.full(len(self.data), np.nan)
+            metrics[metric_id] = column
+        if column.dtype != object and (
+            not isinstance(value, numbers.Real) or isinstance(value, numbers.Integral)
+        ):
+            column = column.astype(object)
+            column[pd.isna(column)] = None
+            metrics[metric_id] = column
+        return column
+
+    def set(self, eval_index: int, row_index: int, eval_result: Optional[EvalResult]):
+        if eval_result is None:
+            self._present[eval_index][row_index] = False
+            self._failure[eval_index][row_index] = -1
+            self._runtime[eval_index][row_index] = np.nan
+            self._reason[eval_index][row_index] = None
+            self._model[eval_index][row_index] = None
+            self._extra[eval_index].pop(row_index, None)
+            for column in self._metrics[eval_index].values():
+                column[row_index] = None if column.dtype == object else np.nan
+            return
+        self._present[eval_index][row_index] = True
+        failure = eval_result.get("failure")
+        self._failure[eval_index][row_index] = -1 if failure is None else int(failure)
+        runtime = eval_result.get("runtime")
+        self._runtime[eval_index][row_index] = np.nan if runtime is None else runtime
+        self._reason[eval_index][row_index] = eval_result.get("reason")
+        self._model[eval_index][row_index] = eval_result.get("model")
+        seen = set()
+        for metric in eval_result.get("metrics") or []:
+            value = metric["value"]
+            if value is None:
+                continue
+            column = self._metric_column(eval_index, metric["id"], value)
+            column[row_index] = value
+            seen.add(metric["id"])
+        for metric_id, column in self._metrics[eval_index].items():
+            if metric_id not in seen:
+                column[row_index] = None if column.dtype == object else np.nan
+
+        extra = {
+            key: value for key, value in eval_result.items() if key not in _COLUMN_KEYS
+        }
+        if eval_result.get("name", self.names[eval_index]) != self.names[eval_index]:
+            extra["name"] = eval_result["name"]
+        if (
+            eval_result.get("display_name", self.display_names[eval_index])
+            != self.display_names[eval_index]
+        ):
+            extra["display_name"] = eval_result["display_name"]
+        entry = eval_result.get("data")
+        row = self.data[row_index]
+        if entry is not row and entry != row:
+            if isinstance(entry, dict) and all(
+                key in row and row[key] == value for key, value in entry.items()
+            ):
+                # Evaluators that only keep the fields they use
+                extra[_DATA_KEYS] = tuple(entry)
+            else:
+                extra["data"] = entry
+        if extra:
+            self._extra[eval_index][row_index] = extra
+        else:
+            self._extra[eval_index].pop(row_index, None)
+
+    def get(self, eval_index: int, row_index: int) -> Optional[EvalResult]:
+        if not self._present[eval_index][row_index]:
+            return None
+        failure = self._failure[eval_index][row_index]
+        runtime = float(self._runtime[eval_index][row_index])
+        if math.isnan(runtime):
+            runtime = None
+        elif runtime.is_integer():
+            runtime = int(runtime)
+        metrics = []
+        for metric_id, column in self._metrics[eval_index].items():
+            value = column[row_index]
+            if column.dtype == object:
+                if value is not None:
+                    metrics.append({"id": metric_id, "value": value})
+            elif not math.isnan(value):
+                metrics.append({"id": metric_id, "value": float(value)})
+        eval_result = {
+            "name": self.names[eval_index],
+            "display_name": self.display_names[eval_index],
+            "data": self.data[row_index],
+            "failure": None if failure < 0 else bool(failure),
+            "reason": self._reason[eval_index][row_index],
+            "runtime": runtime,
+            "model": self._model[eval_index][row_index],
+            "metrics": metrics,
+        }
+        extra = self._extra[eval_index].get(row_index)
+        if extra:
+            eval_result.update(extra)
+            data_keys = eval_result.pop(_DATA_KEYS, None)
+            if data_keys is not None:
+                row = self.data[row_index]
+                eval_result["data"] = {key: row[key] for key in data_keys}
+        return eval_result
+
+    def eval_results(self, eval_index: int) -> List[Optional[EvalResult]]:
+        """Returns the results of one evaluator as a list of EvalResult dicts."""
+        return [self.get(eval_index, index) for index in range(len(self.data))]
+
+    def to_lists(self) -> List[List[Optional[EvalResult]]]:
+        """Returns the results of every evaluator, as returned by `run_suite`."""
+        return [self.eval_results(eval_index) for eval_index in range(len(self))]
+
+    def share(self, eval_index: int, representatives: Sequence[int]):
+        """
+        Gives every row the result of its representative row, for rows that were
+        deduplicated. Representatives must map to themselves.
+        """
+        reps = np.asarray(representatives, dtype=np.intp)
+        if len(reps) == 0:
+            return
+        columns = [
+            self._present,
+            self._failure,
+            self._runtime,
+            self._reason,
+            self._model,
+        ]
+        for column in columns:
+            column[eval_index][:] = column[eval_index][reps]
+        for metric_id, column in self._metrics[eval_index].items():
+            self._metrics[eval_index][metric_id] = column[reps]
+        extra = self._extra[eval_index]
+        for row_index in np.flatnonzero(reps != np.arange(len(reps))):
+            rep_extra = extra.get(int(reps[row_index]))
+            if rep_extra is None:
+                extra.pop(int(row_index), None)
+            else:
+                extra[int(row_index)] = rep_extra
+
+    def has_results(self) -> np.ndarray:
+        """Returns a boolean mask of the rows with a result from any evaluator."""
+        has_results = np.zeros(len(self.data), dtype=bool)
+        for present in self._present:
+            has_results |= present
+        return has_results
+
+    def metric_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Returns each evaluator's metric columns, named "<display name> <metric id>".
+        """
+        return {
+            f"{display_name} {metric_id}": column
+            for display_name, metrics in zip(self.display_names, self._metrics)
+            for metric_id, column in metrics.items()
+        }
+
+    def _columns(self) -> Dict[str, np.ndarray]:
+        """
+        Returns the result columns, named "<display name> <column>", as numpy arrays.
+        Failure is a float column (1.0, 0.0, or NaN if unknown), so that it can be
+        shared without copying.
+        """
+        columns = {}
+        for eval_index, display_name in enumerate(self.display_names):
+            missing = ~self._present[eval_index]
+            has_missing = missing.any()
+
+            def masked(column: np.ndarray) -> np.ndarray:
+                # Rows without a result are empty, whatever the column holds
+                if not has_missing:
+                    return column
+                column = column.copy()
+                column[missing] = None if column.dtype == object else np.nan
+                return column
+
+            for metric_id, column in self._metrics[eval_index].items():
+                columns[f"{display_name} {metric_id}"] = masked(column)
+            failed = self._failure[eval_index].astype(np.float64)
+            failed[failed < 0] = np.nan
+            failed[missing] = np.nan
+            columns[f"{display_name} failed"] = failed
+            columns[f"{display_name} reason"] = masked(self._reason[eval_index])
+            columns[f"{display_name} runtime"] = masked(self._runtime[eval_index])
+        return columns
+
+    @staticmethod
+    def df_column(
+        column: np.ndarray, index: pd.Index
+    ) -> Union[np.ndarray, pd.Series]:
+        """
+        Returns a column for a DataFrame. Object columns (such as bool and int
+        metrics) get the dtype pandas would infer for their values; numeric
+        columns are passed through without copying.
+        """
+        if column.dtype != object:
+            return column
+        return pd.Series(column, index=index, copy=False).infer_objects()
+
+    def to_df(self) -> pd.DataFrame:
+        """
+        Returns a DataFrame with one row per datapoint: the datapoint's fields,
+        then each evaluator's metrics, failed, reason and runtime. The numeric
+        result columns share memory with the store.
+        """
+        inputs = pd.DataFrame(self.data)
+        columns = {name: inputs[name] for name in inputs.columns}
+        for name, column in self._columns().items():
+            columns[name] = self.df_column(column, inputs.index)
+        df = pd.DataFrame(columns, index=inputs.index, copy=False)
+        df.attrs.update(self.attrs)
+        return df
+
+    def to_arrow(self) -> "pa.Table":
+        """
+        Returns an Arrow table with the same columns as `to_df()`, with missing
+        values as nulls. `attrs` (such as eval_stats) are kept in the schema metadata.
+        """
+        _require_pyarrow()
+        table = pa.Table.from_pylist(self.data) if self.data else pa.table({})
+        for name, column in self._columns().items():
+            if column.dtype == object:
+                array = pa.array(column.tolist())
+            elif name.endswith(" failed"):
+                array = pa.array(column == 1.0, mask=np.isnan(column))
+            else:
+                array = pa.array(column, from_pandas=True)
+            table = table.append_column(name, array)
+        if self.attrs:
+            table = table.replace_schema_metadata(
+                {"athina": json.dumps(self.attrs, default=str)}
+            )
+        return table
+
+    def to_parquet(self, path: str, **kwargs):
+        """Writes the results to a Parquet file (see `to_arrow()`)."""
+        pq.write_table(self.to_arrow(), path, **kwargs)
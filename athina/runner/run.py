@@ -1,4 +1,4 @@
-from typing import List, TypedDict, Optional, Union
+from typing import Dict, Iterator, List, Sequence, Tuple, TypedDict, Optional, Union
 from athina.datasets.dataset import Dataset
 from athina.helpers.athina_logging_helper import AthinaLoggingHelper
 from athina.evals.llm.llm_evaluator import LlmEvaluator
@@ -6,14 +6,26 @@ from athina.evals.base_evaluator import BaseEvaluator
 from athina.helpers.dataset_helper import (
     generate_unique_dataset_name,
     generate_eval_display_name,
+    hash_datapoint,
+    shard_for_datapoint,
 )
 from athina.interfaces.result import EvalResult, BatchRunResult
 from athina.interfaces.data import DataPoint
 from athina.interfaces.athina import AthinaExperiment
 from athina.services.athina_api_service import AthinaApiService
+from athina.runner.scheduler import EvalScheduler
+from athina.runner.cascade import Cascade
+from athina.runner.batch_job import BatchJob
+from athina.runner.result_store import EvalResultStore
+from athina.helpers.checkpoint import CheckpointStore
+from athina.helpers.process_helper import EXECUTOR_THREAD
+from athina.helpers.run_stats import EvalRunStats
+from athina.helpers.early_stopping import EarlyStopping, PassRateMonitor
+from collections import Counter
+from contextlib import nullcontext
+from athina.llms.budget import Budget
+import numpy as np
 import pandas as pd
-import json
-import hashlib
 
 
 class DataPointWithEvalResults(TypedDict):
@@ -93,40 +105,109 @@ class EvalRunner:
                 pass
 
     @staticmethod
-    def to_df(batch_eval_results):
-        # Initialize a dictionary to hold the aggregated data
-        aggregated_data = {}
+    def _results_by_row(
+        batch_eval_results: Union[List[List[Optional[EvalResult]]], EvalResultStore],
+    ) -> Tuple[List[Optional[DataPoint]], Dict[str, Sequence]]:
+        """
+        Returns the datapoint of each row (None for rows without results), and a
+        column of values for each "<display name> <metric>", indexed by row.
+        """
+        if isinstance(batch_eval_results, EvalResultStore):
+            rows = [
+                row if has_results else None
+                for row, has_results in zip(
+                    batch_eval_results.data, batch_eval_results.has_results()
+                )
+            ]
+            return rows, batch_eval_results.metric_columns()
 
-        flattened_results = EvalRunner.flatten_eval_results(
-            batch_eval_results=batch_eval_results
+        num_rows = max(
+            (len(eval_results) for eval_results in batch_eval_results if eval_results),
+            default=0,
         )
-        # Process each evaluation result
-        for eval_result in flattened_results:
-            if eval_result is not None:
-                # Serialize and hash the datapoint dictionary to create a unique identifier
-                datapoint_hash = hashlib.md5(
-                    json.dumps(eval_result["data"], sort_keys=True).encode()
-                ).hexdigest()
-
-                # Initialize the datapoint in the aggregated data if not already present
-                if datapoint_hash not in aggregated_data:
-                    aggregated_data[datapoint_hash] = eval_result[
-                        "data"
-                    ]  # Include datapoint details
-
-                # Update the aggregated data with metrics from this evaluation
+        rows: List[Optional[DataPoint]] = [None] * num_rows
+        columns: Dict[str, List] = {}
+        for eval_results in batch_eval_results:
+            for row_index, eval_result in enumerate(eval_results or []):
+                if eval_result is None:
+                    continue
+                entry = eval_result["data"]
+                row = rows[row_index]
+                if row is None:
+                    rows[row_index] = entry
+                elif entry is not row and not entry.keys() <= row.keys():
+                    # Evaluators that only keep some of the row's fields
+                    rows[row_index] = {**row, **entry}
+                display_name = eval_result["display_name"]
                 for metric in eval_result["metrics"]:
-                    metric_name = metric["id"]
-                    metric_value = metric["value"]
-                    aggregated_data[datapoint_hash][
-                        eval_result["display_name"] + " " + metric_name
-                    ] = metric_value
+                    name = f"{display_name} {metric['id']}"
+                    column = columns.get(name)
+                    if column is None:
+                        column = columns[name] = [None] * num_rows
+                    column[row_index] = metric["value"]
+        return rows, columns
 
-        # Convert the aggregated data into a DataFrame
-        df = pd.DataFrame(list(aggregated_data.values()))
+    @staticmethod
+    def _rows_to_df(
+        rows: List[Optional[DataPoint]],
+        columns: Dict[str, Sequence],
+        row_indices: List[int],
+        start: int = 0,
+    ) -> pd.DataFrame:
+        inputs = pd.DataFrame(
+            [rows[row_index] for row_index in row_indices],
+            index=pd.RangeIndex(start, start + len(row_indices)),
+        )
+        df_columns = {name: inputs[name] for name in inputs.columns}
+        all_rows = len(row_indices) == len(rows)
+        for name, column in columns.items():
+            if not isinstance(column, np.ndarray):
+                df_columns[name] = [column[row_index] for row_index in row_indices]
+                continue
+            if not all_rows:
+                column = column[row_indices]
+            df_columns[name] = EvalResultStore.df_column(column, inputs.index)
+        return pd.DataFrame(df_columns, index=inputs.index, copy=False)
 
+    @staticmethod
+    def to_df(
+        batch_eval_results: Union[List[List[Optional[EvalResult]]], EvalResultStore],
+    ) -> pd.DataFrame:
+        """
+        Converts the results of a suite run (a list of results per evaluator, or an
+        EvalResultStore) to a DataFrame with one row per datapoint: the datapoint's
+        fields, then "<display name> <metric>" for each evaluator's metrics.
+
+        Results are matched to their datapoint by row index. Rows without any
+        result are left out.
+        """
+        rows, columns = EvalRunner._results_by_row(batch_eval_results)
+        row_indices = [
+            row_index for row_index, row in enumerate(rows) if row is not None
+        ]
+        df = EvalRunner._rows_to_df(rows, columns, row_indices)
+        if isinstance(batch_eval_results, EvalResultStore):
+            df.attrs.update(batch_eval_results.attrs)
         return df
 
+    @staticmethod
+    def iter_df(
+        batch_eval_results: Union[List[List[Optional[EvalResult]]], EvalResultStore],
+        chunk_size: int = 10000,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Yields the DataFrame of `to_df()` in chunks of rows, so that large results
+        can be written out without building the whole DataFrame at once.
+        """
+        rows, columns = EvalRunner._results_by_row(batch_eval_results)
+        row_indices = [
+            row_index for row_index, row in enumerate(rows) if row is not None
+        ]
+        for start in range(0, len(row_indices), chunk_size):
+            yield EvalRunner._rows_to_df(
+                rows, columns, row_indices[start : start + chunk_size], start
+            )
+
     @staticmethod
     def _log_eval_results_with_config(
         eval_results: List[dict], eval: BaseEvaluator, dataset_id: str
@@ -191,51 +272,222 @@ class EvalRunner:
         dataset_id: Optional[str] = None,
         number_of_rows: Optional[int] = None,
         return_format: str = "dataframe",
-    ) -> Union[List[LlmBatchEvalResult], pd.DataFrame]:
+        resource_limits: Optional[Dict[str, int]] = None,
+        checkpoint: Optional[Union[str, CheckpointStore]] = None,
+        deduplicate: bool = True,
+        executor: str = EXECUTOR_THREAD,
+        early_stopping: Optional[EarlyStopping] = None,
+        budget: Optional[Budget] = None,
+        cascade: Optional[Dict[str, Union[str, List[str]]]] = None,
+        shard: Optional[int] = None,
+        num_shards: Optional[int] = None,
+        batch_job: Optional[Union[str, BatchJob]] = None,
+    ) -> Union[List[LlmBatchEvalResult], pd.DataFrame, EvalResultStore]:
         """
         Run a suite of LLM evaluations against a dataset.
 
+        All (evaluator, datapoint) pairs are run from one shared task queue, so cheap
+        evaluators are not held up behind slow LLM evaluators.
+
         Args:
             evals: A list of LlmEvaluator objects.
             data: A list of data points.
-            return_format: The format of the returned object. Can be "dataframe" or "list".
+            max_parallel_evals: The default concurrency limit for LLM and HTTP resources.
+            return_format: The format of the returned object. Can be "dataframe", "list"
+                or "columnar" (an EvalResultStore, which can be exported with `to_df()`,
+                `to_arrow()` or `to_parquet()`).
+            resource_limits: Optional concurrency limits keyed by resource key
+                (e.g. "llm:OpenAiService:gpt-4o") or resource kind ("llm", "http", "cpu").
+            checkpoint: Optional path to a JSONL checkpoint file (or a CheckpointStore).
+                Completed results are written to it as they arrive, and results that are
+                already in it are reused, so an interrupted suite can be resumed.
+            deduplicate: If True, each evaluator runs once per unique set of its required
+                arguments and the result is shared between duplicate rows.
+            executor: "thread", "process" or "auto". With "process" or "auto", CPU-bound
+                evaluators that support it run in a process pool with one worker per core,
+                while the other evaluators keep running in threads.
+            early_stopping: Optional EarlyStopping settings. Rows are then evaluated in
+                random order, and each evaluator stops once its pass rate is known precisely
+                enough. Rows that were not evaluated get no result for that evaluator, and
+                the estimates are in the DataFrame's `attrs["early_stopping"]`.
+            budget: Optional Budget limiting the cost of the suite's LLM calls. Once it is
+                exhausted, LLM evaluators record a "budget exhausted" result for their
+                remaining rows, and the ledger is in the DataFrame's `attrs["budget"]`.
+            cascade: Optional gates for evaluators, mapping an evaluator's display name
+                (or name) to the evaluators that must pass on a row before it runs on
+                that row, e.g. {"Groundedness": ["ContainsJson"]}. Rows where a gate did
+                not pass get a "skipped" result for the dependent evaluator.
+            shard: Optionally, run only the rows assigned to this shard (0 to num_shards - 1),
+                by the hash of each row. Sharded runs are not logged to Athina; give each
+                shard a checkpoint and combine them with `ShardedEvalRunner.merge`.
+            num_shards: The number of shards, when `shard` is set.
+            batch_job: Optional work directory (or a BatchJob) to run the judge calls
+                of LLM evaluators as offline batch jobs, for services that support
+                them. The call blocks until the jobs complete; if it is interrupted,
+                calling it again with the same directory resumes the submitted jobs.
+                Can't be combined with early_stopping or budget.
 
         Returns:
-            A list of LlmBatchEvalResult objects or a Pandas DataFrame.
+            A list of LlmBatchEvalResult objects or a Pandas DataFrame. The DataFrame's
+            `attrs["eval_stats"]` holds performance and cost statistics for each evaluator.
         """
         eval_suite_name = "llm_eval_suite" + "_" + ",".join(eval.name for eval in evals)
+        cascade = Cascade(evals, cascade) if cascade else None
         AthinaApiService.log_usage(eval_name=eval_suite_name, run_type="suite")
 
-        if data:
+        if batch_job is not None and (early_stopping is not None or budget is not None):
+            raise ValueError(
+                "batch_job can't be combined with early_stopping or budget"
+            )
+
+        sharded = shard is not None or num_shards is not None
+        if sharded and (
+            shard is None or num_shards is None or not 0 <= shard < num_shards
+        ):
+            raise ValueError("shard must be between 0 and num_shards - 1")
+
+        if data and sharded:
+            # The coordinator logs the merged results
+            dataset = None
+        elif data:
             # Log Dataset to Athina
             dataset = EvalRunner._log_dataset_to_athina(data)
-            dataset_id = dataset.id
+            dataset_id = dataset.id if dataset else None
         elif dataset_id is not None:
             dataset = EvalRunner._fetch_dataset_rows(dataset_id, number_of_rows)
             data = dataset
         else:
             raise Exception("No data or dataset_id provided.")
 
-        batch_results = []
-        for eval in evals:
-            # Run the evaluations
-            if max_parallel_evals > 1:
-                eval_results = eval._run_batch_generator_async(data, max_parallel_evals)
-            else:
-                eval_results = list(eval._run_batch_generator(data))
-
-            if dataset:
-                EvalRunner._log_eval_results_with_config(
-                    eval_results=eval_results, eval=eval, dataset_id=dataset_id
+        if sharded:
+            data = [
+                entry
+                for entry in data
+                if shard_for_datapoint(entry, num_shards) == shard
+            ]
+            dataset = None
+
+        # Run the evaluations, once per unique set of required arguments
+        batch_results = EvalResultStore(data, evals)
+        representatives = [
+            eval._deduplicate(data) if deduplicate else list(range(len(data)))
+            for eval in evals
+        ]
+        if cascade is not None:
+            representatives = cascade.refine_representatives(representatives)
+        row_indices = [
+            [row_index for row_index, rep in enumerate(reps) if rep == row_index]
+            for reps in representatives
+        ]
+        with CheckpointStore.open(checkpoint) as checkpoint_store:
+            if checkpoint_store is not None:
+                eval_keys = [CheckpointStore.eval_key(eval) for eval in evals]
+                row_hashes = [hash_datapoint(entry) for entry in data]
+                for eval_index, eval_key in enumerate(eval_keys):
+                    for row_index in row_indices[eval_index]:
+                        batch_results[eval_index][row_index] = checkpoint_store.get(
+                            eval_key, row_hashes[row_index]
+                        )
+                row_indices = [
+                    [
+                        row_index
+                        for row_index in indices
+                        if batch_results[eval_index][row_index] is None
+                    ]
+                    for eval_index, indices in enumerate(row_indices)
+                ]
+
+            monitors = None
+            if early_stopping is not None:
+                monitors = [PassRateMonitor(early_stopping) for _ in evals]
+                # Each unique row stands for all of its duplicates
+                weights = [Counter(reps) for reps in representatives]
+                for eval_index, reps in enumerate(representatives):
+                    for row_index in set(reps):
+                        monitors[eval_index].add(
+                            batch_results[eval_index][row_index],
+                            weights[eval_index][row_index],
+                        )
+                row_indices = [
+                    early_stopping.shuffled(indices) for indices in row_indices
+                ]
+
+            def finish_eval(eval_index: int):
+                # Share results between duplicate rows
+                batch_results.share(eval_index, representatives[eval_index])
+                # Queue the results for upload while the other evaluators keep running
+                if dataset:
+                    EvalRunner._log_eval_results_with_config(
+                        eval_results=batch_results.eval_results(eval_index),
+                        eval=evals[eval_index],
+                        dataset_id=dataset_id,
+                    )
+
+            scheduler = EvalScheduler(
+                evals=evals,
+                max_parallel_evals=max_parallel_evals,
+                resource_limits=resource_limits,
+                executor=executor,
+            )
+            remaining = [len(indices) for indices in row_indices]
+            for eval_index in range(len(evals)):
+                if monitors is not None and monitors[eval_index].should_stop():
+                    remaining[eval_index] = 0
+                    row_indices[eval_index] = []
+                if remaining[eval_index] == 0:
+                    finish_eval(eval_index)
+
+            batch_responses = None
+            if batch_job is not None:
+                batch_responses = BatchJob.open(batch_job).collect(
+                    evals, data, row_indices, cascade
                 )
-            batch_results.append(eval_results)
+
+            stats = [EvalRunStats(eval.display_name) for eval in evals]
+            budget_context = budget.activate() if budget is not None else nullcontext()
+            batch_context = (
+                batch_responses.activate()
+                if batch_responses is not None
+                else nullcontext()
+            )
+            with budget_context, batch_context:
+                for eval_index, row_index, eval_result in scheduler.run(
+                    data, row_indices, stats, cascade, batch_results
+                ):
+                    batch_results[eval_index][row_index] = eval_result
+                    if checkpoint_store is not None:
+                        checkpoint_store.put(
+                            eval_keys[eval_index], row_hashes[row_index], eval_result
+                        )
+                    remaining[eval_index] -= 1
+                    if monitors is not None:
+                        monitors[eval_index].add(
+                            eval_result, weights[eval_index][row_index]
+                        )
+                        if monitors[eval_index].should_stop():
+                            remaining[eval_index] -= scheduler.stop(eval_index)
+                    if remaining[eval_index] == 0:
+                        finish_eval(eval_index)
 
         if dataset:
             print(f"You can view your dataset at: {Dataset.dataset_link(dataset_id)}")
 
+        batch_results.attrs["eval_stats"] = {
+            eval_stats.evaluator: eval_stats.summary() for eval_stats in stats
+        }
+        if monitors is not None:
+            batch_results.attrs["early_stopping"] = {
+                eval.display_name: monitor.summary()
+                for eval, monitor in zip(evals, monitors)
+            }
+        if budget is not None:
+            batch_results.attrs["budget"] = budget.summary()
+
         if return_format == "dataframe":
             return EvalRunner.to_df(batch_results)
         elif return_format == "list":
+            return batch_results.to_lists()
+        elif return_format == "columnar":
             return batch_results
         else:
             raise ValueError("Invalid return_format")
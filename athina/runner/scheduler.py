@@ -0,0 +1,307 @@
+import contextvars
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import ExitStack
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+from athina.evals.base_evaluator import BaseEvaluator
+from athina.helpers.process_helper import (
+    DEFAULT_CHUNK_SIZE,
+    EXECUTOR_THREAD,
+    create_process_pool,
+    default_process_workers,
+    evaluate_chunk,
+    use_process_pool,
+)
+from athina.interfaces.data import DataPoint
+from athina.interfaces.result import EvalResult
+from athina.helpers.run_stats import EvalRunStats
+from athina.runner.cascade import Cascade
+
+
+class EvalScheduler:
+    """
+    Runs a suite of evaluators over a dataset from a single task queue.
+
+    Every (evaluator, datapoint) pair is a task. Tasks are dispatched
+    round-robin across evaluators, cheapest first (see `BaseEvaluator.cost_class`),
+    subject to a concurrency limit per resource (see `BaseEvaluator.resource_key`),
+    so cheap evaluators keep running while expensive ones are waiting on their provider.
+
+    Resource limits are looked up by the full resource key first
+    (e.g. "llm:OpenAiService:gpt-4o"), then by its kind ("llm", "http" or "cpu").
+
+    With `executor="process"` or `"auto"`, CPU-bound evaluators that support it
+    run in a shared process pool instead, as chunks of rows, with one worker
+    per core (the "process" resource).
+    """
+
+    DEFAULT_CPU_LIMIT = 2
+    PROCESS_RESOURCE_KEY = "process"
+
+    def __init__(
+        self,
+        evals: List[BaseEvaluator],
+        max_parallel_evals: int = 5,
+        resource_limits: Optional[Dict[str, int]] = None,
+        executor: str = EXECUTOR_THREAD,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self.evals = evals
+        self.executor = executor
+        self.chunk_size = chunk_size
+        self.resource_limits = {
+            "llm": max_parallel_evals,
+            "http": max_parallel_evals,
+            "cpu": min(max_parallel_evals, self.DEFAULT_CPU_LIMIT),
+            self.PROCESS_RESOURCE_KEY: default_process_workers(),
+        }
+        if resource_limits:
+            self.resource_limits.update(resource_limits)
+        self._stopped = set()
+        self._queues: List[Deque[int]] = []
+        self._blocked: List[Dict[int, int]] = []
+        self._waiters: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        self._cascade: Optional[Cascade] = None
+
+    def limit_for(self, resource_key: str) -> int:
+        """
+        Returns the concurrency limit for a resource key.
+        """
+        if resource_key in self.resource_limits:
+            return max(1, self.resource_limits[resource_key])
+        kind = resource_key.split(":", 1)[0]
+        return max(1, self.resource_limits.get(kind, 1))
+
+    def stop(self, eval_index: int) -> int:
+        """
+        Stops dispatching rows for an evaluator; rows already in flight still complete.
+        Returns the number of rows that will not be evaluated.
+        """
+        if eval_index in self._stopped:
+            return 0
+        self._stopped.add(eval_index)
+        dropped = list(self._queues[eval_index]) + list(self._blocked[eval_index])
+        self._queues[eval_index].clear()
+        self._blocked[eval_index].clear()
+        # Rows waiting on the dropped rows run as if the gate had passed
+        for row_index in dropped:
+            self._resolve(eval_index, row_index, None)
+        return len(dropped)
+
+    def _resolve(
+        self, eval_index: int, row_index: int, eval_result: Optional[EvalResult]
+    ) -> List[Tuple[int, int, EvalResult]]:
+        """
+        Releases or skips the rows waiting on a result.
+        Returns the skipped results, as `(eval_index, row_index, eval_result)`.
+        """
+        skipped = []
+        resolved = [(eval_index, row_index, eval_result)]
+        while resolved:
+            gate_index, gate_row, gate_result = resolved.pop()
+            gate_passed = Cascade.gate_passed(gate_result)
+            for dependent_index, dependent_row in self._waiters.pop(
+                (gate_index, gate_row), []
+            ):
+                blocked = self._blocked[dependent_index]
+                if dependent_row not in blocked:
+                    # Already skipped by another gate, or stopped
+                    continue
+                if gate_passed:
+                    blocked[dependent_row] -= 1
+                    if blocked[dependent_row] == 0:
+                        del blocked[dependent_row]
+                        self._queues[dependent_index].append(dependent_row)
+                else:
+                    del blocked[dependent_row]
+                    result = Cascade.skipped_result(
+                        self.evals[dependent_index],
+                        self._data[dependent_row],
+                        self.evals[gate_index],
+                    )
+                    skipped.append((dependent_index, dependent_row, result))
+                    resolved.append((dependent_index, dependent_row, result))
+        return skipped
+
+    def _block_gated_rows(
+        self,
+        row_indices: List[Sequence[int]],
+        results: Optional[List[List[Optional[EvalResult]]]],
+    ) -> List[Tuple[int, int, EvalResult]]:
+        """
+        Holds back the rows of dependent evaluators until their gates have results.
+        Returns the results of rows skipped by gate results that are already known.
+        """
+        cascade = self._cascade
+        skipped = []
+        known: Dict[Tuple[int, int], EvalResult] = {}
+        scheduled = [set(indices) for indices in row_indices]
+        for eval_index in cascade.order:
+            gates = cascade.gates[eval_index]
+            if not gates:
+                continue
+            queue = self._queues[eval_index]
+            blocked = self._blocked[eval_index]
+            for row_index in list(queue):
+                waiting_on = []
+                skipped_by = None
+                for gate_index in gates:
+                    gate_row = cascade.gate_row(gate_index, row_index)
+                    if (gate_index, gate_row) in known:
+                        gate_result = known[(gate_index, gate_row)]
+                    elif gate_row in scheduled[gate_index]:
+                        waiting_on.append((gate_index, gate_row))
+                        continue
+                    else:
+                        gate_result = results[gate_index][gate_row] if results else None
+                    if not Cascade.gate_passed(gate_result):
+                        skipped_by = gate_index
+                        break
+                if skipped_by is not None:
+                    result = Cascade.skipped_result(
+                        self.evals[eval_index],
+                        self._data[row_index],
+                        self.evals[skipped_by],
+                    )
+                    known[(eval_index, row_index)] = result
+                    skipped.append((eval_index, row_index, result))
+                elif waiting_on:
+                    blocked[row_index] = len(waiting_on)
+                    for gate in waiting_on:
+                        self._waiters.setdefault(gate, []).append(
+                            (eval_index, row_index)
+                        )
+            self._queues[eval_index] = deque(
+                row_index
+                for row_index in queue
+                if row_index not in blocked and (eval_index, row_index) not in known
+            )
+        return skipped
+
+    def run(
+        self,
+        data: Sequence[DataPoint],
+        row_indices: Optional[List[Sequence[int]]] = None,
+        stats: Optional[List[EvalRunStats]] = None,
+        cascade: Optional[Cascade] = None,
+        results: Optional[List[List[Optional[EvalResult]]]] = None,
+    ) -> Iterator[Tuple[int, int, Optional[EvalResult]]]:
+        """
+        Runs every evaluator on every datapoint, and yields
+        `(eval_index, row_index, eval_result)` as tasks complete.
+
+        Args:
+            data: The datapoints to evaluate.
+            row_indices: Optionally, the row indices to run for each evaluator.
+                Defaults to every row.
+            stats: Optionally, an EvalRunStats for each evaluator to record evaluations in.
+            cascade: Optionally, the gates of each evaluator. A row of a dependent
+                evaluator is dispatched once its gates have passed on that row, and
+                yields a "skipped" result if one of them did not.
+            results: Results that are already known (e.g. from a checkpoint) for the
+                rows not in `row_indices`, used to look up gate results.
+        """
+        if row_indices is None:
+            row_indices = [range(len(data)) for _ in self.evals]
+        in_process = [
+            use_process_pool(eval, self.executor, strict=False) for eval in self.evals
+        ]
+        resource_keys = [
+            self.PROCESS_RESOURCE_KEY if in_process[eval_index] else eval.resource_key
+            for eval_index, eval in enumerate(self.evals)
+        ]
+        worker_specs = [
+            eval._worker_spec() if in_process[eval_index] else None
+            for eval_index, eval in enumerate(self.evals)
+        ]
+        limits = {key: self.limit_for(key) for key in set(resource_keys)}
+        in_flight = {key: 0 for key in limits}
+        self._stopped = set()
+        self._data = data
+        self._queues = [deque(indices) for indices in row_indices]
+        self._blocked = [{} for _ in self.evals]
+        self._waiters = {}
+        self._cascade = cascade
+        skipped = self._block_gated_rows(row_indices, results) if cascade else []
+        # Cheaper evaluators are dispatched first, so gates resolve early
+        dispatch_order = sorted(
+            range(len(self.evals)),
+            key=lambda eval_index: self.evals[eval_index].cost_class,
+        )
+        max_workers = max(
+            1,
+            sum(
+                limit
+                for key, limit in limits.items()
+                if key != self.PROCESS_RESOURCE_KEY
+            ),
+        )
+
+        yield from skipped
+        with ExitStack() as stack:
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=max_workers))
+            process_pool = None
+            if self.PROCESS_RESOURCE_KEY in limits:
+                process_pool = stack.enter_context(
+                    create_process_pool(limits[self.PROCESS_RESOURCE_KEY])
+                )
+            pending = {}
+            while True:
+                # Dispatch one task per evaluator per pass, cheapest first,
+                # while resources are free
+                dispatched = True
+                while dispatched:
+                    dispatched = False
+                    for eval_index in dispatch_order:
+                        key = resource_keys[eval_index]
+                        queue = self._queues[eval_index]
+                        if (
+                            not queue
+                            or in_flight[key] >= limits[key]
+                            or eval_index in self._stopped
+                        ):
+                            continue
+                        eval = self.evals[eval_index]
+                        if in_process[eval_index]:
+                            rows = [
+                                queue.popleft()
+                                for _ in range(min(self.chunk_size, len(queue)))
+                            ]
+                            future = process_pool.submit(
+                                evaluate_chunk,
+                                worker_specs[eval_index],
+                                [data[row_index] for row_index in rows],
+                            )
+                        else:
+                            rows = [queue.popleft()]
+                            # Run in the caller's context, so an active Budget is visible
+                            future = executor.submit(
+                                contextvars.copy_context().run,
+                                eval._evaluate_batch_entry,
+                                data[rows[0]],
+                                stats[eval_index] if stats else None,
+                                time.perf_counter(),
+                            )
+                        pending[future] = (eval_index, rows)
+                        in_flight[key] += 1
+                        dispatched = True
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    eval_index, rows = pending.pop(future)
+                    in_flight[resource_keys[eval_index]] -= 1
+                    if in_process[eval_index]:
+                        eval_results = future.result()
+                        if stats:
+                            for eval_result in eval_results:
+                                stats[eval_index].record(eval_result)
+                    else:
+                        eval_results = [future.result()]
+                    for row_index, eval_result in zip(rows, eval_results):
+                        yield eval_index, row_index, eval_result
+                        if cascade is not None:
+                            yield from self._resolve(eval_index, row_index, eval_result)
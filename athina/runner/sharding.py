@@ -0,0 +1,474 @@
+import multiprocessing
+import os
+import pickle
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Union
+import pandas as pd
+from athina.evals.base_evaluator import BaseEvaluator
+from athina.helpers.checkpoint import CheckpointStore
+from athina.helpers.dataset_helper import hash_datapoint
+from athina.interfaces.data import DataPoint
+from athina.interfaces.result import EvalResult
+from athina.keys import AthinaApiKey, OpenAiApiKey
+from athina.runner.cascade import Cascade
+from athina.runner.result_store import EvalResultStore
+from athina.runner.run import EvalRunner
+
+JOB_FILE = "job.pkl"
+QUEUE_FILE = "queue.sqlite"
+
+# Options that the sharded runner sets itself, or that can't be shared between processes
+UNSUPPORTED_RUN_OPTIONS = (
+    "checkpoint",
+    "shard",
+    "num_shards",
+    "return_format",
+    "budget",
+    "batch_job",
+)
+
+
+class ShardQueue:
+    """
+    A queue of shards in a SQLite file, shared by the workers of a sharded run.
+
+    Workers claim a shard, send heartbeats while running it, and mark it done.
+    A shard whose worker stopped sending heartbeats for `lease_seconds` is
+    claimed again by another worker; a shard that failed `max_attempts` times
+    is marked failed. SQLite locking requires a filesystem with working file
+    locks (a local disk, or a network filesystem that supports them).
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS shards (
+                    shard INTEGER PRIMARY KEY,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    heartbeat_at REAL,
+                    error TEXT
+                )
+                """
+            )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def create(self, num_shards: int):
+        """Adds the shards of a run. Shards that already exist are kept."""
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO shards (shard) VALUES (?)",
+                [(shard,) for shard in range(num_shards)],
+            )
+
+    def _expire(self, conn: sqlite3.Connection):
+        """Fails the shards whose worker stopped responding on their last attempt."""
+        conn.execute(
+            """
+            UPDATE shards SET status = 'failed', error = 'Worker stopped responding'
+            WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?
+            """,
+            (time.time() - self.lease_seconds, self.max_attempts),
+        )
+
+    def claim(self, worker_id: str) -> Optional[int]:
+        """
+        Claims a pending or abandoned shard. Returns None if there is none left.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire(conn)
+            row = conn.execute(
+                """
+                SELECT shard FROM shards
+                WHERE status = 'pending'
+                    OR (status = 'running' AND heartbeat_at < ? AND attempts < ?)
+                ORDER BY shard LIMIT 1
+                """,
+                (now - self.lease_seconds, self.max_attempts),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                """
+                UPDATE shards SET status = 'running', worker = ?,
+                    attempts = attempts + 1, heartbeat_at = ?
+                WHERE shard = ?
+                """,
+                (worker_id, now, row[0]),
+            )
+            return row[0]
+
+    def heartbeat(self, shard: int, worker_id: str):
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE shards SET heartbeat_at = ? WHERE shard = ? AND worker = ?",
+                (time.time(), shard, worker_id),
+            )
+
+    def complete(self, shard: int):
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE shards SET status = 'done', error = NULL WHERE shard = ?",
+                (shard,),
+            )
+
+    def fail(self, shard: int, error: str):
+        """Puts a failed shard back in the queue, unless it has no attempts left."""
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                UPDATE shards
+                SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    error = ?
+                WHERE shard = ?
+                """,
+                (self.max_attempts, error, shard),
+            )
+
+    def status(self) -> Dict[str, List[int]]:
+        """Returns the shards by status ("pending", "running", "done" or "failed")."""
+        with self._transaction() as conn:
+            self._expire(conn)
+            rows = conn.execute(
+                "SELECT shard, status FROM shards ORDER BY shard"
+            ).fetchall()
+        status = {"pending": [], "running": [], "done": [], "failed": []}
+        for shard, shard_status in rows:
+            status[shard_status].append(shard)
+        return status
+
+    def errors(self) -> Dict[int, str]:
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT shard, error FROM shards WHERE error IS NOT NULL"
+            ).fetchall()
+        return dict(rows)
+
+
+class ShardedEvalRunner:
+    """
+    Runs a suite over many processes or machines, by splitting the rows into
+    shards (by the hash of each row) and merging the results.
+
+    A run lives in a work directory, which holds the job (evaluators, data and
+    run_suite options), a ShardQueue, and one checkpoint file per shard.
+    `run()` starts local worker processes; workers on other machines that share
+    the directory can join with `athina worker <work_dir>`. A worker that dies
+    is replaced by the next worker to claim its shard, which resumes from the
+    shard's checkpoint.
+
+    Evaluators are pickled into the job file, and worker processes are started
+    with the "spawn" method, so scripts using the runner need an
+    `if __name__ == "__main__":` guard. API keys are not written to the work
+    directory: local workers inherit them, and external workers use their own
+    `athina init` configuration.
+    """
+
+    POLL_SECONDS = 1.0
+
+    @staticmethod
+    def checkpoint_path(work_dir: str, shard: int) -> str:
+        return os.path.join(work_dir, f"shard-{shard}.jsonl")
+
+    @staticmethod
+    def prepare(
+        work_dir: str,
+        evals: List[BaseEvaluator],
+        data: List[DataPoint],
+        num_shards: int,
+        **run_options,
+    ) -> ShardQueue:
+        """
+        Writes the job and the shard queue to a work directory.
+        Preparing a directory again keeps the progress of the shards.
+        """
+        unsupported = [key for key in run_options if key in UNSUPPORTED_RUN_OPTIONS]
+        if unsupported:
+            raise ValueError(
+                f"Not supported by the sharded runner: {', '.join(unsupported)}"
+            )
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        os.makedirs(work_dir, exist_ok=True)
+        job = {
+            "evals": evals,
+            "data": data,
+            "num_shards": num_shards,
+            "run_options": run_options,
+        }
+        job_path = os.path.join(work_dir, JOB_FILE)
+        with open(job_path + ".tmp", "wb") as f:
+            pickle.dump(job, f)
+        os.replace(job_path + ".tmp", job_path)
+        queue = ShardQueue(os.path.join(work_dir, QUEUE_FILE))
+        queue.create(num_shards)
+        return queue
+
+    @staticmethod
+    def load_job(work_dir: str) -> Dict:
+        with open(os.path.join(work_dir, JOB_FILE), "rb") as f:
+            return pickle.load(f)
+
+    @staticmethod
+    def run_worker(work_dir: str, worker_id: Optional[str] = None) -> int:
+        """
+        Runs shards from a work directory until none are left.
+        Returns the number of shards this worker completed.
+        """
+        worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        job = ShardedEvalRunner.load_job(work_dir)
+        queue = ShardQueue(os.path.join(work_dir, QUEUE_FILE))
+        completed = 0
+        while True:
+            shard = queue.claim(worker_id)
+            if shard is None:
+                return completed
+            stop_heartbeat = threading.Event()
+
+            def send_heartbeats(shard=shard):
+                while not stop_heartbeat.wait(queue.lease_seconds / 3):
+                    try:
+                        queue.heartbeat(shard, worker_id)
+                    except sqlite3.Error as e:
+                        print(f"Failed to send heartbeat for shard {shard}: {e}")
+
+            heartbeat = threading.Thread(target=send_heartbeats, daemon=True)
+            heartbeat.start()
+            try:
+                EvalRunner.run_suite(
+                    evals=job["evals"],
+                    data=job["data"],
+                    shard=shard,
+                    num_shards=job["num_shards"],
+                    checkpoint=ShardedEvalRunner.checkpoint_path(work_dir, shard),
+                    return_format="list",
+                    **job["run_options"],
+                )
+                queue.complete(shard)
+                completed += 1
+            except Exception as e:
+                print(f"Shard {shard} failed: {e}")
+                queue.fail(shard, str(e))
+            finally:
+                stop_heartbeat.set()
+                heartbeat.join()
+
+    @staticmethod
+    def run(
+        evals: List[BaseEvaluator],
+        data: List[DataPoint],
+        num_shards: Optional[int] = None,
+        local_workers: Optional[int] = None,
+        work_dir: Optional[str] = None,
+        return_format: str = "dataframe",
+        timeout: Optional[float] = None,
+        **run_options,
+    ) -> Union[List[List[Optional[EvalResult]]], pd.DataFrame, EvalResultStore]:
+        """
+        Runs a suite in shards, and returns the merged results in the same format
+        as `EvalRunner.run_suite`.
+
+        Args:
+            evals: A list of evaluators.
+            data: A list of data points.
+            num_shards: The number of shards. Defaults to the number of CPUs.
+            local_workers: The number of worker processes to start on this machine.
+                Defaults to num_shards. With 0, the shards are left to external workers.
+            work_dir: A directory shared with external workers, e.g. on a network
+                filesystem. Defaults to a new temporary directory. Using an existing
+                work directory resumes its run.
+            return_format: "dataframe", "list" or "columnar".
+            timeout: Optionally, the number of seconds to wait for the shards to finish.
+            **run_options: Other options for `EvalRunner.run_suite`, such as
+                max_parallel_evals, resource_limits or cascade.
+        """
+        num_shards = num_shards or os.cpu_count() or 1
+        local_workers = num_shards if local_workers is None else local_workers
+        work_dir = work_dir or tempfile.mkdtemp(prefix="athina-shards-")
+        queue = ShardedEvalRunner.prepare(
+            work_dir, evals, data, num_shards, **run_options
+        )
+        print(
+            f"Running {num_shards} shards in {work_dir}. "
+            f"More workers can join with: athina worker {work_dir}"
+        )
+
+        context = multiprocessing.get_context("spawn")
+        # Not daemonic, so that workers can start processes of their own
+        # (e.g. with executor="process")
+        workers = [
+            context.Process(
+                target=_run_local_worker,
+                args=(
+                    work_dir,
+                    f"{socket.gethostname()}-local-{index}-{uuid.uuid4().hex[:6]}",
+                    OpenAiApiKey.get_key(),
+                    AthinaApiKey.get_key(),
+                ),
+            )
+            for index in range(min(local_workers, num_shards))
+        ]
+        for worker in workers:
+            worker.start()
+
+        finished = False
+        try:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                status = queue.status()
+                if not status["pending"] and not status["running"]:
+                    finished = True
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    print(f"Timed out waiting for shards: {status}")
+                    break
+                if workers and status["pending"] and not any(
+                    worker.is_alive() for worker in workers
+                ):
+                    # The local workers exited early, so finish the shards here
+                    ShardedEvalRunner.run_worker(work_dir)
+                    continue
+                time.sleep(ShardedEvalRunner.POLL_SECONDS)
+        finally:
+            for worker in workers:
+                if finished:
+                    # No shards are left to claim, so the workers are exiting
+                    worker.join()
+                elif worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+
+        status = queue.status()
+        if status["failed"]:
+            errors = queue.errors()
+            for shard in status["failed"]:
+                print(f"Shard {shard} failed: {errors.get(shard)}")
+
+        return ShardedEvalRunner.merge(
+            evals=evals,
+            data=data,
+            checkpoints=[
+                ShardedEvalRunner.checkpoint_path(work_dir, shard)
+                for shard in range(num_shards)
+            ],
+            return_format=return_format,
+            deduplicate=run_options.get("deduplicate", True),
+            cascade=run_options.get("cascade"),
+        )
+
+    @staticmethod
+    def merge(
+        evals: List[BaseEvaluator],
+        data: List[DataPoint],
+        checkpoints: List[str],
+        return_format: str = "dataframe",
+        deduplicate: bool = True,
+        cascade: Optional[Dict[str, Union[str, List[str]]]] = None,
+        log_to_athina: bool = True,
+    ) -> Union[List[List[Optional[EvalResult]]], pd.DataFrame, EvalResultStore]:
+        """
+        Merges the checkpoints of sharded runs into the results of the whole suite,
+        in the order of `data`, and logs them to Athina.
+
+        Rows without a result (failed evaluations, or shards that did not finish)
+        get None.
+        """
+        stores = [CheckpointStore(path) for path in checkpoints if os.path.exists(path)]
+        eval_keys = [CheckpointStore.eval_key(eval) for eval in evals]
+        row_hashes = [hash_datapoint(entry) for entry in data]
+        representatives = [
+            eval._deduplicate(data) if deduplicate else list(range(len(data)))
+            for eval in evals
+        ]
+        if cascade:
+            representatives = Cascade(evals, cascade).refine_representatives(
+                representatives
+            )
+
+        def find(eval_index: int, row_index: int) -> Optional[EvalResult]:
+            for store in stores:
+                eval_result = store.get(eval_keys[eval_index], row_hashes[row_index])
+                if eval_result is not None:
+                    return eval_result
+            return None
+
+        batch_results = EvalResultStore(data, evals)
+        for eval_index in range(len(evals)):
+            found = [find(eval_index, row_index) for row_index in range(len(data))]
+            # Duplicate rows may have been evaluated in another shard
+            found_in_group = {}
+            for row_index, rep in enumerate(representatives[eval_index]):
+                if found[row_index] is not None:
+                    found_in_group.setdefault(rep, row_index)
+            for row_index, rep in enumerate(representatives[eval_index]):
+                source = (
+                    row_index
+                    if found[row_index] is not None
+                    else found_in_group.get(rep)
+                )
+                if source is not None:
+                    batch_results[eval_index][row_index] = (
+                        BaseEvaluator._fan_out_result(
+                            found[source], data[row_index], data[source]
+                        )
+                    )
+        for store in stores:
+            store.close()
+
+        if log_to_athina:
+            dataset = EvalRunner._log_dataset_to_athina(data)
+            if dataset:
+                for eval_index, eval in enumerate(evals):
+                    EvalRunner._log_eval_results_with_config(
+                        eval_results=batch_results.eval_results(eval_index),
+                        eval=eval,
+                        dataset_id=dataset.id,
+                    )
+
+        if return_format == "dataframe":
+            return EvalRunner.to_df(batch_results)
+        elif return_format == "list":
+            return batch_results.to_lists()
+        elif return_format == "columnar":
+            return batch_results
+        else:
+            raise ValueError("Invalid return_format")
+
+
+def _run_local_worker(
+    work_dir: str,
+    worker_id: str,
+    openai_api_key: Optional[str],
+    athina_api_key: Optional[str],
+):
+    # Spawned processes don't inherit the keys set in the parent
+    if openai_api_key is not None:
+        OpenAiApiKey.set_key(openai_api_key)
+    if athina_api_key is not None:
+        AthinaApiKey.set_key(athina_api_key)
+    ShardedEvalRunner.run_worker(work_dir, worker_id)
@@ -15,6 +15,7 @@ from athina.interfaces.result import EvalPerformanceReport
 from athina.keys import AthinaApiKey
 from athina.helpers.constants import API_BASE_URL
 from athina.errors.exceptions import CustomException
+from athina.services.background_uploader import BackgroundUploader
 
 SDK_VERSION = pkg_resources.get_distribution("athina").version
 
@@ -74,10 +75,9 @@ class AthinaApiService:
             return
         try:
             endpoint = f"{API_BASE_URL}/api/v1/sdk/log-usage"
-            requests.post(
+            BackgroundUploader.get().submit(
                 endpoint,
-                headers=AthinaApiService._headers(),
-                json={
+                {
                     "sdkVersion": SDK_VERSION,
                     "evalName": eval_name,
                     "run_type": run_type,
@@ -123,6 +123,18 @@ class AthinaApiService:
             )
             raise
 
+    @staticmethod
+    def enqueue_eval_results(
+        athina_eval_result_create_many_request: List[AthinaEvalResultCreateRequest],
+    ):
+        """
+        Queues eval results to be logged to Athina by the background uploader.
+        """
+        endpoint = f"{API_BASE_URL}/api/v1/eval_result"
+        BackgroundUploader.get().submit_batched(
+            endpoint, athina_eval_result_create_many_request
+        )
+
     @staticmethod
     def create_dataset(dataset: Dict):
         """
@@ -179,13 +191,18 @@ class AthinaApiService:
             raise
 
     @staticmethod
-    def add_dataset_rows(dataset_id: str, rows: List[Dict]):
+    def add_dataset_rows(
+        dataset_id: str,
+        rows: List[Dict],
+        idempotency_key: Optional[str] = None,
+    ):
         """
         Adds rows to a dataset by calling the Athina API.
 
         Parameters:
         - dataset_id (str): The ID of the dataset to which rows are added.
         - rows (List[Dict]): A list of rows to add to the dataset, where each row is represented as a dictionary.
+        - idempotency_key (Optional[str]): A key identifying this request, so that a retried request is not applied twice.
 
         Returns:
         The API response data for the dataset after adding the rows.
@@ -195,9 +212,12 @@ class AthinaApiService:
         """
         try:
             endpoint = f"{API_BASE_URL}/api/v1/dataset_v2/{dataset_id}/add-rows"
+            headers = AthinaApiService._headers()
+            if idempotency_key is not None:
+                headers["Idempotency-Key"] = idempotency_key
             response = requests.post(
                 endpoint,
-                headers=AthinaApiService._headers(),
+                headers=headers,
                 json={"dataset_rows": rows},
             )
             if response.status_code == 401:
@@ -339,6 +359,24 @@ class AthinaApiService:
             )
             raise
 
+    @staticmethod
+    def enqueue_eval_results_with_config(
+        chunks: List[dict], idempotency_keys: Optional[List[str]] = None
+    ):
+        """
+        Queues chunks of eval results with their config to be logged to Athina by the
+        background uploader. The chunks are sent one after another, in order.
+        """
+        endpoint = f"{API_BASE_URL}/api/v1/eval_run/log-eval-results-sdk"
+        keys = idempotency_keys or [None] * len(chunks)
+        BackgroundUploader.get().submit_ordered(
+            endpoint,
+            [
+                (chunk, {"Idempotency-Key": key} if key is not None else None)
+                for chunk, key in zip(chunks, keys)
+            ],
+        )
+
     @staticmethod
     def log_eval_results_with_config(eval_results_with_config: dict):
         try:
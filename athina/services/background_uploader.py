@@ -0,0 +1,316 @@
+import atexit
+import gzip
+import json
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import requests
+from athina.keys import AthinaApiKey
+
+
+@dataclass
+class _Upload:
+    """A request body (or, for batched endpoints, one item of a request body) waiting to be sent."""
+
+    endpoint: str
+    payload: Any
+    api_key: Optional[str]
+    size: int
+    batched: bool
+    headers: Optional[Dict[str, str]] = None
+    # The payload is a list of (body, headers) pairs, to be sent one at a time
+    ordered: bool = False
+
+
+class BackgroundUploader:
+    """
+    Sends logging requests to Athina from a background thread, so that uploads
+    are off the critical path of evaluation.
+
+    Uploads are held in a bounded queue (submitting blocks when it is full).
+    Items submitted to batched endpoints are coalesced into one request, up to
+    `max_batch_size` items and `max_batch_bytes` bytes. Up to `max_connections`
+    requests are sent concurrently, except uploads submitted with
+    `submit_ordered`, which are sent one after another. Request bodies are gzipped,
+    and failed requests are retried with exponential backoff.
+    Pending uploads are drained at interpreter exit, or explicitly with `flush()`.
+    """
+
+    DRAIN_TIMEOUT_SECONDS = 30
+    COMPRESS_MIN_BYTES = 1024
+    REQUEST_TIMEOUT_SECONDS = 30
+
+    _instance: Optional["BackgroundUploader"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        max_batch_size: int = 500,
+        max_batch_bytes: int = 4 * 1024 * 1024,
+        linger_seconds: float = 0.5,
+        compress: bool = True,
+        max_attempts: int = 5,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 30.0,
+        max_connections: int = 4,
+    ):
+        self.max_batch_size = max_batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.linger_seconds = linger_seconds
+        self.compress = compress
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._queue: "queue.Queue[Optional[_Upload]]" = queue.Queue(max_queue_size)
+        self._pending = 0
+        self._pending_condition = threading.Condition()
+        self._session = requests.Session()
+        self._senders = ThreadPoolExecutor(
+            max_workers=max(1, max_connections), thread_name_prefix="athina-upload"
+        )
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._registered_atexit = False
+
+    @classmethod
+    def get(cls) -> "BackgroundUploader":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = BackgroundUploader()
+            return cls._instance
+
+    @classmethod
+    def configure(cls, **kwargs):
+        """
+        Replaces the shared uploader with one using the given settings.
+        Uploads pending on the previous uploader are drained first.
+        """
+        with cls._instance_lock:
+            previous = cls._instance
+            cls._instance = BackgroundUploader(**kwargs)
+        if previous is not None:
+            previous.shutdown()
+
+    def submit(
+        self, endpoint: str, payload: Any, headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        Queues a request body to be posted to `endpoint`, with optional extra headers.
+        """
+        self._put(
+            _Upload(endpoint, payload, AthinaApiKey.get_key(), 0, False, headers)
+        )
+
+    def submit_batched(self, endpoint: str, items: List[Any]):
+        """
+        Queues items for an endpoint that accepts a JSON array. Items from
+        different calls are coalesced into as few requests as possible.
+        """
+        api_key = AthinaApiKey.get_key()
+        for item in items:
+            size = len(json.dumps(item, default=str))
+            self._put(_Upload(endpoint, item, api_key, size, True))
+
+    def submit_ordered(
+        self, endpoint: str, payloads: List[Tuple[Any, Optional[Dict[str, str]]]]
+    ):
+        """
+        Queues request bodies, with optional extra headers, to be posted to
+        `endpoint` one after another, in order. If one fails, the rest are not sent.
+        """
+        self._put(
+            _Upload(endpoint, payloads, AthinaApiKey.get_key(), 0, False, ordered=True)
+        )
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until every queued upload has been sent (or dropped after retries).
+        Returns False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._pending_condition:
+            while self._pending > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._pending_condition.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = DRAIN_TIMEOUT_SECONDS):
+        """
+        Drains pending uploads and stops the worker thread.
+        """
+        with self._worker_lock:
+            worker = self._worker
+            self._worker = None
+        if worker is None:
+            return
+        self.flush(timeout)
+        self._queue.put(None)
+        worker.join(timeout)
+
+    def _put(self, upload: _Upload):
+        self._ensure_worker()
+        with self._pending_condition:
+            self._pending += 1
+        self._queue.put(upload)
+
+    def _done(self, count: int):
+        with self._pending_condition:
+            self._pending -= count
+            self._pending_condition.notify_all()
+
+    def _ensure_worker(self):
+        with self._worker_lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._run, name="athina-uploader", daemon=True
+            )
+            self._worker.start()
+            if not self._registered_atexit:
+                atexit.register(self.shutdown)
+                self._registered_atexit = True
+
+    def _run(self):
+        while True:
+            upload = self._queue.get()
+            if upload is None:
+                return
+            batch, stop = self._collect_batch(upload)
+            try:
+                self._send_batch(batch)
+            except Exception as e:
+                print(f"An error occurred while uploading to Athina: {e}")
+            finally:
+                self._done(len(batch))
+            if stop:
+                return
+
+    def _collect_batch(self, first: _Upload) -> Tuple[List[_Upload], bool]:
+        """
+        Collects uploads that arrive within the linger window, up to the batch limits.
+        """
+        batch = [first]
+        batch_bytes = first.size
+        deadline = time.monotonic() + self.linger_seconds
+        while len(batch) < self.max_batch_size and batch_bytes < self.max_batch_bytes:
+            remaining = deadline - time.monotonic()
+            try:
+                upload = (
+                    self._queue.get(timeout=remaining)
+                    if remaining > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if upload is None:
+                return batch, True
+            batch.append(upload)
+            batch_bytes += upload.size
+        return batch, False
+
+    def _send_batch(self, batch: List[_Upload]):
+        groups: Dict[Tuple[str, Optional[str]], List[Any]] = {}
+        sends = []
+        for upload in batch:
+            if upload.batched:
+                groups.setdefault((upload.endpoint, upload.api_key), []).append(
+                    upload.payload
+                )
+            elif upload.ordered:
+                sends.append(
+                    (
+                        self._send_in_order,
+                        upload.endpoint,
+                        upload.api_key,
+                        upload.payload,
+                    )
+                )
+            else:
+                sends.append(
+                    (
+                        self._send,
+                        upload.endpoint,
+                        upload.api_key,
+                        upload.payload,
+                        upload.headers,
+                    )
+                )
+        for (endpoint, api_key), items in groups.items():
+            sends.append((self._send, endpoint, api_key, items))
+        futures = []
+        for send, *args in sends:
+            try:
+                futures.append(self._senders.submit(send, *args))
+            except RuntimeError:
+                # The executor takes no new work once the interpreter is exiting,
+                # so the drain at exit sends from this thread instead
+                send(*args)
+        for future in futures:
+            future.result()
+
+    def _send_in_order(
+        self,
+        endpoint: str,
+        api_key: Optional[str],
+        payloads: List[Tuple[Any, Optional[Dict[str, str]]]],
+    ):
+        for index, (payload, extra_headers) in enumerate(payloads):
+            if not self._send(endpoint, api_key, payload, extra_headers):
+                remaining = len(payloads) - index - 1
+                if remaining:
+                    print(f"Skipped the {remaining} uploads after it to {endpoint}")
+                return
+
+    def _send(
+        self,
+        endpoint: str,
+        api_key: Optional[str],
+        payload: Any,
+        extra_headers: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """Posts a request body, with retries. Returns whether it was accepted."""
+        body = json.dumps(payload, default=str).encode("utf-8")
+        headers = {
+            "athina-api-key": api_key,
+            "Content-Type": "application/json",
+            **(extra_headers or {}),
+        }
+        if self.compress and len(body) >= self.COMPRESS_MIN_BYTES:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+
+        for attempt in range(self.max_attempts):
+            try:
+                response = self._session.post(
+                    endpoint,
+                    data=body,
+                    headers=headers,
+                    timeout=self.REQUEST_TIMEOUT_SECONDS,
+                )
+                if response.status_code < 400:
+                    return True
+                # Client errors other than rate limiting will not succeed on retry
+                if response.status_code < 500 and response.status_code != 429:
+                    print(
+                        f"Athina rejected the upload to {endpoint}: {response.status_code} {response.text}"
+                    )
+                    return False
+                error = f"{response.status_code} {response.text}"
+            except requests.RequestException as e:
+                error = str(e)
+            if attempt < self.max_attempts - 1:
+                backoff = min(
+                    self.backoff_max_seconds, self.backoff_base_seconds * 2**attempt
+                )
+                time.sleep(backoff * (0.5 + random.random() / 2))
+        print(
+            f"Failed to upload to Athina after {self.max_attempts} attempts: {error}"
+        )
+        return False
@@ -355,11 +355,10 @@ class PromptExecution(Step):
         try:
             messages = self.template.resolve(**input_data)
             # Convert messages to API format
-            # TODO: Why is api_formatted_messages not used?
             api_formatted_messages = [msg.to_api_format() for msg in messages]
 
-            llm_service_response = await self.llm_service.chat_completion_async(
-                messages,
+            llm_service_response = await self.llm_service.achat_completion(
+                api_formatted_messages,
                 model=self.model,
                 **self.model_options.model_dump(),
                 **(self.tool_config.model_dump() if self.tool_config else {}),
@@ -468,7 +467,12 @@ class PromptExecution(Step):
                             metadata={},
                         )
                     )
-                elif stream_response.get("usage"):
+                elif "tool_call_delta" in stream_response:
+                    # Tool calls are returned whole in the final chunk
+                    continue
+                elif "usage" in stream_response:
+                    if not final_response and stream_response.get("tool_calls"):
+                        final_response = json.dumps(stream_response["tool_calls"])
                     output_type = kwargs.get("output_type", None)
                     error = None
                     response = None
@@ -522,6 +526,7 @@ class PromptExecution(Step):
                         usage = stream_response.get("usage", {})
                         citations = stream_response.get("citations", None)
                         prompt_sent = stream_response.get("prompt_sent", None)
+                        latency = stream_response.get("latency", None)
                         yield json.dumps(
                             self._create_step_result(
                                 status="success",
@@ -531,6 +536,7 @@ class PromptExecution(Step):
                                     **usage,
                                     "citations": citations,
                                     "prompt_sent": prompt_sent,
+                                    "latency": latency,
                                 },
                             )
                         )
@@ -1,7 +1,7 @@
 # Step to chat with OpenAI's Assistant API.
 from typing import Union, Dict, Any
 from athina.steps import Step
-from openai import OpenAI
+from athina.llms.client_registry import ClientRegistry
 import os
 import time
 
@@ -30,7 +30,7 @@ class OpenAiAssistant(Step):
             openai_api_key=openai_api_key,
             input_column=input_column,
         )
-        self.client = OpenAI(api_key=openai_api_key)
+        self.client = ClientRegistry.openai(openai_api_key)
 
     def execute(self, input_data: Any) -> Union[Dict[str, Any], None]:
         """Calls OpenAI's Assistant API and returns the response."""
@@ -55,6 +55,9 @@ class OpenAiAssistant(Step):
                 start_time=start_time,
             )
         try:
+            # The shared client is looked up on each call, in case the registry
+            # was reset since the last one
+            self.client = ClientRegistry.openai(self.openai_api_key)
             # Create a thread
             thread = self.client.beta.threads.create()
 
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import List, Optional
+from athina.helpers.run_stats import EvalTrace
+from athina.llms.abstract_llm_service import AbstractLlmService
+
+
+class FakeLlmError(Exception):
+    """A simulated provider error."""
+
+
+class FakeLlmService(AbstractLlmService):
+    """
+    An offline stand-in for an LLM provider, for benchmarking the framework itself.
+
+    Each call sleeps for a latency drawn from a log-normal distribution with the
+    given median, fails with probability `error_rate`, and returns a judge
+    response ("Pass" with probability `pass_rate`) with simulated token usage.
+    Calls are reported to the EvalTrace like a real provider call, so the
+    provider time can be told apart from the framework's own overhead.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 200,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        pass_rate: float = 0.8,
+        completion_tokens: int = 40,
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.pass_rate = pass_rate
+        self.completion_tokens = completion_tokens
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.provider_seconds = 0.0
+
+    def _draw(self):
+        """Returns the latency in seconds, whether the call fails, and whether it passes."""
+        with self._lock:
+            self.calls += 1
+            latency = self.latency_ms / 1000
+            if self.latency_sigma > 0:
+                latency *= self._random.lognormvariate(0, self.latency_sigma)
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            passed = self._random.random() < self.pass_rate
+            self.provider_seconds += latency
+        return latency, failed, passed
+
+    def _response(self, messages: List[dict], latency: float, passed: bool) -> dict:
+        # Roughly 4 characters per token
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+        EvalTrace.record_llm_call(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            cost_usd=0.0,
+            provider_seconds=latency,
+        )
+        value = json.dumps(
+            {
+                "result": "Pass" if passed else "Fail",
+                "explanation": "Simulated judge response.",
+            }
+        )
+        metadata = json.dumps(
+            {
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": self.completion_tokens,
+                    "total_tokens": prompt_tokens + self.completion_tokens,
+                },
+                "response_time": latency * 1000,
+            }
+        )
+        return {"value": value, "metadata": metadata}
+
+    def embeddings(self, text: str, model: Optional[str] = None) -> list:
+        return [0.0] * 8
+
+    def chat_completion(self, messages, model, **kwargs):
+        EvalTrace.record_attempt()
+        latency, failed, passed = self._draw()
+        time.sleep(latency)
+        if failed:
+            raise FakeLlmError("Simulated provider error")
+        return self._response(messages, latency, passed)
+
+    def chat_completion_json(self, messages, model, **kwargs):
+        return self.chat_completion(messages, model, **kwargs)
+
+    @staticmethod
+    def _json_response(chat_completion_result: dict) -> dict:
+        response = json.loads(chat_completion_result["value"])
+        response["metadata"] = json.loads(chat_completion_result["metadata"])
+        return response
+
+    def json_completion(self, messages, model, **kwargs):
+        return self._json_response(self.chat_completion(messages, model, **kwargs))
+
+    async def achat_completion(self, messages, model, **kwargs):
+        EvalTrace.record_attempt()
+        latency, failed, passed = self._draw()
+        await asyncio.sleep(latency)
+        if failed:
+            raise FakeLlmError("Simulated provider error")
+        return self._response(messages, latency, passed)
+
+    async def ajson_completion(self, messages, model, **kwargs):
+        return self._json_response(await self.achat_completion(messages, model, **kwargs))
+
+    async def chat_stream_completion(self, messages, model, **kwargs):
+        """Streams the response word by word, in the same chunks as OpenAiService."""
+        start_time = time.perf_counter()
+        response = await self.achat_completion(messages, model, **kwargs)
+        ttft_ms = (time.perf_counter() - start_time) * 1000
+        for word in response["value"].split(" "):
+            yield json.dumps({"current_response": word + " "})
+        metadata = json.loads(response["metadata"])
+        yield json.dumps(
+            {
+                "usage": metadata["usage"],
+                "cost": {"total_cost_usd_dollar": 0.0},
+                "finish_reason": "stop",
+                "tool_calls": [],
+                "latency": {
+                    "ttft_ms": ttft_ms,
+                    "inter_token_ms": None,
+                    "total_ms": (time.perf_counter() - start_time) * 1000,
+                },
+            }
+        )
@@ -0,0 +1,291 @@
+"""
+Offline benchmarks of the evaluation framework's own overhead.
+
+Every LLM call goes to a FakeLlmService with a simulated latency distribution,
+error rate and token usage, so results are reproducible and need no API keys
+or network access. Each case runs in a fresh process, so peak RSS is per case.
+
+    python -m benchmarks.run --sizes 100 1000 --concurrency 1 8 32 --latency-ms 50
+
+Reports rows/sec, p50/p99 per-row overhead (evaluation time minus simulated
+provider time) and peak RSS for each case.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+try:
+    import resource
+
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+CASES = ["run_batch", "run_suite", "to_df", "guard"]
+# Cases that do not depend on the concurrency level
+SEQUENTIAL_CASES = {"to_df", "guard"}
+
+
+def peak_rss_mb() -> Optional[float]:
+    if not HAS_RESOURCE:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(max_rss / divisor, 1)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, int(round(q / 100 * len(values))) - 1))
+    return round(values[index], 3)
+
+
+def disable_athina_logging():
+    """Stops the runners from logging datasets, results and usage to Athina."""
+    from athina.evals.base_evaluator import BaseEvaluator
+    from athina.runner.run import EvalRunner
+    from athina.services.athina_api_service import AthinaApiService
+
+    BaseEvaluator._log_dataset_to_athina = lambda self, data: None
+    EvalRunner._log_dataset_to_athina = staticmethod(lambda data: None)
+    AthinaApiService.log_usage = staticmethod(lambda eval_name, run_type: None)
+
+
+def make_data(size: int) -> List[Dict]:
+    # Unique rows, so that deduplication does not skip any evaluations
+    return [
+        {
+            "query": f"What is the capital of country {i}?",
+            "response": f"The capital of country {i} is city {i}.",
+            "text": f'{{"row": {i}, "answer": "city {i}"}}',
+        }
+        for i in range(size)
+    ]
+
+
+def make_llm_eval(config: Dict):
+    from athina.evals import DoesResponseAnswerQuery
+    from benchmarks.fake_llm_service import FakeLlmService
+
+    llm_service = FakeLlmService(
+        latency_ms=config["latency_ms"],
+        latency_sigma=config["latency_sigma"],
+        error_rate=config["error_rate"],
+        seed=config["seed"],
+    )
+    return DoesResponseAnswerQuery(model="gpt-4o", llm_service=llm_service)
+
+
+def make_function_evals():
+    from athina.evals import ContainsJson, LengthLessThan
+
+    return [ContainsJson(), LengthLessThan(max_length=200)]
+
+
+def overhead_summary(eval_stats: Dict) -> Dict:
+    parse = eval_stats["latency_ms"]["parse"] or {}
+    return {
+        "overhead_p50_ms": parse.get("p50"),
+        "overhead_p99_ms": parse.get("p99"),
+        "errors": eval_stats["errors"],
+    }
+
+
+def bench_run_batch(size: int, concurrency: int, config: Dict) -> Dict:
+    evaluator = make_llm_eval(config)
+    data = make_data(size)
+    start = time.perf_counter()
+    batch_result = evaluator.run_batch(data, max_parallel_evals=concurrency)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        **overhead_summary(batch_result.stats.summary()),
+    }
+
+
+def bench_run_suite(size: int, concurrency: int, config: Dict) -> Dict:
+    from athina.runner.run import EvalRunner
+
+    llm_eval = make_llm_eval(config)
+    data = make_data(size)
+    start = time.perf_counter()
+    df = EvalRunner.run_suite(
+        evals=[llm_eval, *make_function_evals()],
+        data=data,
+        max_parallel_evals=concurrency,
+    )
+    elapsed = time.perf_counter() - start
+    eval_stats = df.attrs["eval_stats"]
+    result = overhead_summary(eval_stats[llm_eval.display_name])
+    result["seconds"] = elapsed
+    result["errors"] = sum(stats["errors"] for stats in eval_stats.values())
+    return result
+
+
+def bench_to_df(size: int, concurrency: int, config: Dict) -> Dict:
+    from athina.interfaces.result import BatchRunResult
+    from athina.runner.run import EvalRunner
+
+    data = make_data(size)
+    evals = [make_llm_eval({**config, "latency_ms": 0}), *make_function_evals()]
+    results = EvalRunner.run_suite(
+        evals=evals, data=data, max_parallel_evals=8, return_format="list"
+    )
+    timings = []
+    start = time.perf_counter()
+    for eval_results in results:
+        row_start = time.perf_counter()
+        BatchRunResult(eval_results=eval_results).to_df()
+        timings.append((time.perf_counter() - row_start) * 1000 / size)
+    row_start = time.perf_counter()
+    EvalRunner.to_df(results)
+    timings.append((time.perf_counter() - row_start) * 1000 / size)
+    elapsed = time.perf_counter() - start
+    # Per-row overhead of each conversion
+    return {
+        "seconds": elapsed,
+        "overhead_p50_ms": percentile(timings, 50),
+        "overhead_p99_ms": percentile(timings, 99),
+        "errors": 0,
+    }
+
+
+def bench_guard(size: int, concurrency: int, config: Dict) -> Dict:
+    from athina.guard.exception import AthinaGuardException
+    from athina.guard.guard import guard
+
+    llm_eval = make_llm_eval(config)
+    llm_service = llm_eval.llm_service
+    suite = [llm_eval, *make_function_evals()]
+    overheads = []
+    errors = 0
+    start = time.perf_counter()
+    for row in make_data(size):
+        provider_seconds = llm_service.provider_seconds
+        call_start = time.perf_counter()
+        try:
+            guard(suite, **row)
+        except AthinaGuardException:
+            pass
+        except Exception:
+            errors += 1
+        call_seconds = time.perf_counter() - call_start
+        provider_seconds = llm_service.provider_seconds - provider_seconds
+        overheads.append((call_seconds - provider_seconds) * 1000)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "overhead_p50_ms": percentile(overheads, 50),
+        "overhead_p99_ms": percentile(overheads, 99),
+        "errors": errors,
+    }
+
+
+BENCHMARKS = {
+    "run_batch": bench_run_batch,
+    "run_suite": bench_run_suite,
+    "to_df": bench_to_df,
+    "guard": bench_guard,
+}
+
+
+def run_case(case: str, size: int, concurrency: int, config: Dict) -> Dict:
+    """Runs one benchmark case. Called in a fresh process."""
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    disable_athina_logging()
+    rss_start_mb = peak_rss_mb()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = BENCHMARKS[case](size, concurrency, config)
+    seconds = result.pop("seconds")
+    return {
+        "case": case,
+        "size": size,
+        "concurrency": concurrency,
+        "rows_per_second": round(size / seconds, 1) if seconds > 0 else None,
+        **result,
+        "rss_start_mb": rss_start_mb,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_in_subprocess(case: str, size: int, concurrency: int, config: Dict) -> Dict:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_case, case, size, concurrency, config).result()
+
+
+def print_table(results: List[Dict]):
+    columns = [
+        ("case", "case"),
+        ("size", "rows"),
+        ("concurrency", "conc"),
+        ("rows_per_second", "rows/s"),
+        ("overhead_p50_ms", "p50 ms"),
+        ("overhead_p99_ms", "p99 ms"),
+        ("peak_rss_mb", "peak MB"),
+        ("errors", "errors"),
+    ]
+    rows = [[header for _, header in columns]]
+    rows += [
+        ["-" if result.get(key) is None else str(result[key]) for key, _ in columns]
+        for result in results
+    ]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    for row in rows:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument(
+        "--latency-ms", type=float, default=50, help="Median simulated LLM latency"
+    )
+    parser.add_argument(
+        "--latency-sigma",
+        type=float,
+        default=0.5,
+        help="Sigma of the log-normal latency distribution (0 for a fixed latency)",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to a JSON file")
+    args = parser.parse_args(argv)
+
+    config = {
+        "latency_ms": args.latency_ms,
+        "latency_sigma": args.latency_sigma,
+        "error_rate": args.error_rate,
+        "seed": args.seed,
+    }
+    results = []
+    for case in args.cases:
+        concurrency_levels = [1] if case in SEQUENTIAL_CASES else args.concurrency
+        for size in args.sizes:
+            for concurrency in concurrency_levels:
+                print(f"Running {case} (rows={size}, concurrency={concurrency})")
+                results.append(run_in_subprocess(case, size, concurrency, config))
+
+    print()
+    print_table(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()